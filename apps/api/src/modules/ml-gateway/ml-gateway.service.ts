@@ -3,6 +3,9 @@ import axios, { AxiosInstance } from 'axios';
 
 export interface TextAnalysisRequest {
   text: string;
+  // Releases for a user are charged to their privacy budget; once it is spent,
+  // repeated texts get their earlier answer and new ones 429 (Retry-After).
+  // Without user_id each distinct text is answered once per window, uncapped.
   user_id?: string;
   context?: Record<string, any>;
 }
@@ -16,6 +19,18 @@ export interface TextAnalysisResponse {
   processing_time_ms: number;
 }
 
+export interface BatchTextAnalysisRequest {
+  texts: string[];
+  user_id?: string;
+  context?: Record<string, any>;
+}
+
+export interface BatchTextAnalysisResponse {
+  results: (Omit<TextAnalysisResponse, 'processing_time_ms'> | null)[];
+  errors: { index: number; error: string }[];
+  processing_time_ms: number;
+}
+
 export interface BehaviorAnalysisRequest {
   user_id: string;
   activity_data: Record<string, any>;
@@ -30,6 +45,19 @@ export interface BehaviorAnalysisResponse {
   processing_time_ms: number;
 }
 
+export interface BehaviorEvent {
+  user_id: string;
+  event_type: 'login' | 'post' | 'comment' | 'reaction' | 'message' | 'session_end';
+  timestamp: string;
+  duration_minutes?: number;
+}
+
+export interface BehaviorEventResponse {
+  accepted: number;
+  dropped: number;
+  errors: { index: number; error: string }[];
+}
+
 export interface StressScoreRequest {
   user_id: string;
   text_features?: Record<string, number>;
@@ -44,6 +72,21 @@ export interface StressScoreResponse {
   processing_time_ms: number;
 }
 
+export interface AssessmentRequest {
+  user_id: string;
+  text?: string;
+  activity_data?: Record<string, any>;
+  time_window_days?: number;
+  context?: Record<string, any>;
+}
+
+export interface AssessmentResponse {
+  text_analysis: Omit<TextAnalysisResponse, 'processing_time_ms'> | null;
+  behavior_analysis: Omit<BehaviorAnalysisResponse, 'processing_time_ms'> | null;
+  stress: Omit<StressScoreResponse, 'processing_time_ms'>;
+  processing_time_ms: number;
+}
+
 @Injectable()
 export class MlGatewayService {
   private readonly mlClient: AxiosInstance;
@@ -89,6 +132,16 @@ export class MlGatewayService {
     }
   }
 
+  async analyzeTextBatch(request: BatchTextAnalysisRequest): Promise<BatchTextAnalysisResponse> {
+    try {
+      const response = await this.mlClient.post<BatchTextAnalysisResponse>('/analyze-text/batch', request);
+      return response.data;
+    } catch (error) {
+      console.error('Batch text analysis failed:', error);
+      throw error;
+    }
+  }
+
   async analyzeBehavior(request: BehaviorAnalysisRequest): Promise<BehaviorAnalysisResponse> {
     try {
       const response = await this.mlClient.post<BehaviorAnalysisResponse>('/analyze-behavior', request);
@@ -99,6 +152,29 @@ export class MlGatewayService {
     }
   }
 
+  async recordBehaviorEvents(events: BehaviorEvent[]): Promise<BehaviorEventResponse> {
+    try {
+      const response = await this.mlClient.post<BehaviorEventResponse>('/behavior/events', { events });
+      return response.data;
+    } catch (error) {
+      console.error('Behavior event ingestion failed:', error);
+      throw error;
+    }
+  }
+
+  async analyzeBehaviorIncremental(userId: string, timeWindowDays = 7): Promise<BehaviorAnalysisResponse> {
+    try {
+      const response = await this.mlClient.post<BehaviorAnalysisResponse>('/analyze-behavior/incremental', {
+        user_id: userId,
+        time_window_days: timeWindowDays,
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Incremental behavior analysis failed:', error);
+      throw error;
+    }
+  }
+
   async calculateStressScore(request: StressScoreRequest): Promise<StressScoreResponse> {
     try {
       const response = await this.mlClient.post<StressScoreResponse>('/stress-score', request);
@@ -109,6 +185,16 @@ export class MlGatewayService {
     }
   }
 
+  async assess(request: AssessmentRequest): Promise<AssessmentResponse> {
+    try {
+      const response = await this.mlClient.post<AssessmentResponse>('/assess', request);
+      return response.data;
+    } catch (error) {
+      console.error('Assessment failed:', error);
+      throw error;
+    }
+  }
+
   async getModelInfo(): Promise<any> {
     try {
       const response = await this.mlClient.get('/model-info');
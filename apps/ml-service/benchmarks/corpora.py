@@ -0,0 +1,208 @@
+"""
+Reproducible synthetic inputs for benchmarks and load tests.
+
+Every generator takes a seed, so two runs (or two machines) measure exactly
+the same inputs. Nothing here is real user data.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterable
+
+# Text corpora by kind, see text_corpus
+TEXT_KINDS = ['short', 'long', 'pii', 'keyword']
+
+# Everyday filler vocabulary without lexicon hits
+FILLER_WORDS = [
+    'the', 'a', 'today', 'class', 'library', 'lecture', 'notes', 'friends',
+    'coffee', 'campus', 'week', 'morning', 'evening', 'group', 'study', 'chapter',
+    'professor', 'room', 'bus', 'lunch', 'after', 'before', 'with', 'about',
+    'really', 'just', 'some', 'more', 'again', 'still', 'maybe', 'soon',
+]
+
+def keyword_vocabulary(text_analyzer: Any) -> List[str]:
+    """
+    Collect every lexicon term and phrase of a TextAnalyzer, sorted.
+
+    Args:
+        text_analyzer: Analyzer whose keyword sets are used
+
+    Returns:
+        Sorted list of terms, so corpora built from it are reproducible
+    """
+    terms = set()
+    for words in (
+        text_analyzer.positive_words, text_analyzer.negative_words,
+        text_analyzer.stress_indicators, text_analyzer.toxic_words,
+        text_analyzer.stress_patterns
+    ):
+        terms.update(words)
+    for groups in (text_analyzer.emotion_keywords, text_analyzer.safety_keywords):
+        for words in groups.values():
+            terms.update(words)
+    return sorted(terms)
+
+def text_corpus(
+    kind: str,
+    size: int,
+    max_length: int,
+    vocabulary: Iterable[str] = (),
+    seed: int = 0
+) -> List[str]:
+    """
+    Generate distinct posts of one kind.
+
+    Kinds:
+        short: 5-25 filler words, the typical post
+        long: posts of exactly ``max_length`` characters
+        pii: posts embedding emails, phone numbers, SSNs and card numbers
+        keyword: posts where about half the words are lexicon terms
+
+    Args:
+        kind: One of ``TEXT_KINDS``
+        size: Number of posts
+        max_length: Longest accepted post (``settings.max_text_length``)
+        vocabulary: Lexicon terms for keyword-dense posts
+        seed: Random seed
+
+    Returns:
+        List of ``size`` posts; each is unique so result caches never hit
+    """
+    if kind not in TEXT_KINDS:
+        raise ValueError(f"Unknown corpus kind: {kind}")
+    rng = random.Random(f"{kind}:{seed}")
+    vocabulary = sorted(vocabulary) or FILLER_WORDS
+
+    posts = []
+    for n in range(size):
+        if kind == 'short':
+            words = rng.choices(FILLER_WORDS, k=rng.randint(5, 25))
+        elif kind == 'long':
+            words = rng.choices(FILLER_WORDS + vocabulary, k=max_length // 3)
+        elif kind == 'pii':
+            words = rng.choices(FILLER_WORDS, k=rng.randint(10, 30))
+            for _ in range(rng.randint(1, 3)):
+                words.insert(rng.randrange(len(words) + 1), _fake_pii(rng))
+        else:
+            words = [
+                rng.choice(vocabulary) if rng.random() < 0.5 else rng.choice(FILLER_WORDS)
+                for _ in range(rng.randint(10, 40))
+            ]
+        # A numbered suffix keeps every post distinct
+        suffix = f" #{n}"
+        body = ' '.join(words)
+        if kind == 'long':
+            body = body[:max_length - len(suffix)].ljust(max_length - len(suffix))
+        posts.append(body + suffix)
+    return posts
+
+def activity_profiles(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate aggregated activity data in the ``/analyze-behavior`` format.
+
+    Profiles mix steady, declining, night-owl and spiking users so every
+    anomaly branch of the analyzer is exercised.
+
+    Args:
+        size: Number of profiles
+        seed: Random seed
+
+    Returns:
+        List of ``activity_data`` dictionaries
+    """
+    rng = random.Random(f"activity:{seed}")
+    profiles = []
+    for n in range(size):
+        pattern = ('steady', 'declining', 'night_owl', 'spiking')[n % 4]
+        base = rng.uniform(2, 12)
+        days = 14
+        if pattern == 'declining':
+            recent = [max(0.0, base * (1 - day / days) + rng.gauss(0, 1)) for day in range(days)]
+        elif pattern == 'spiking':
+            recent = [base + (base * 3 if day >= days - 2 else 0) + rng.gauss(0, 1) for day in range(days)]
+        else:
+            recent = [max(0.0, base + rng.gauss(0, 1.5)) for day in range(days)]
+
+        peak_hours = range(22, 28) if pattern == 'night_owl' else range(9, 18)
+        hourly = {str(hour % 24): rng.randint(1, 8) for hour in peak_hours}
+        profiles.append({
+            'posts_count': rng.randint(0, 30),
+            'comments_count': rng.randint(0, 60),
+            'reactions_count': rng.randint(0, 120),
+            'messages_count': rng.randint(0, 40),
+            'login_frequency': rng.randint(1, 20),
+            'avg_session_duration': rng.uniform(5, 150),
+            'hourly_activity': hourly,
+            'daily_activity': {str(day): rng.randint(0, 15) for day in range(7)},
+            'recent_activity': [round(value, 2) for value in recent],
+            'daily_posts': [rng.randint(0, 6) for _ in range(days)],
+            'session_durations': [round(rng.uniform(5, 150), 1) for _ in range(days)],
+        })
+    return profiles
+
+def stress_features(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate ``/stress-score`` request features.
+
+    Args:
+        size: Number of feature sets
+        seed: Random seed
+
+    Returns:
+        List of dictionaries with flat numeric ``text_features`` and
+        ``behavior_features``, as the route accepts them
+    """
+    rng = random.Random(f"stress:{seed}")
+    return [
+        {
+            'text_features': {
+                'toxicity_score': round(rng.uniform(0, 0.4), 3),
+                'negative_sentiment': round(rng.random(), 3),
+                'stress_indicator_count': float(rng.randint(0, 5)),
+            },
+            'behavior_features': {
+                'activity_score': round(rng.random(), 3),
+                'late_night_ratio': round(rng.uniform(0, 0.5), 3),
+            },
+        }
+        for _ in range(size)
+    ]
+
+def behavior_events(size: int, seed: int = 0, users: int = 20) -> List[Dict[str, Any]]:
+    """
+    Generate ``/behavior/events`` activity events, as they arrive in JSON.
+
+    Args:
+        size: Number of events
+        seed: Random seed
+        users: Number of distinct users the events are spread over
+
+    Returns:
+        List of event dictionaries with ISO 8601 timestamps spread over
+        two weeks from a fixed date
+    """
+    rng = random.Random(f"events:{seed}")
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(users)]
+    start = datetime(2024, 3, 1)
+    events = []
+    for _ in range(size):
+        event_type = rng.choice(['login', 'post', 'comment', 'reaction', 'message', 'session_end'])
+        event = {
+            'user_id': rng.choice(user_ids),
+            'event_type': event_type,
+            'timestamp': (start + timedelta(minutes=rng.randint(0, 14 * 24 * 60))).isoformat(),
+        }
+        if event_type == 'session_end':
+            event['duration_minutes'] = round(rng.uniform(1, 120), 1)
+        events.append(event)
+    return events
+
+def _fake_pii(rng: random.Random) -> str:
+    kind = rng.choice(['email', 'phone', 'ssn', 'credit_card'])
+    if kind == 'email':
+        return f"student{rng.randint(0, 99999)}@example.edu"
+    if kind == 'phone':
+        return f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+    if kind == 'ssn':
+        return f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(0, 9999):04d}"
+    return ' '.join(f"{rng.randint(0, 9999):04d}" for _ in range(4))
@@ -0,0 +1,310 @@
+"""
+Load test one ML service replica and find where it saturates.
+
+Closed-loop clients send a weighted mix of requests at each step of a
+concurrency ramp. Each step reports throughput, error rate and latency
+percentiles; the saturation knee is the lowest concurrency that reaches
+(nearly) peak throughput within the error budget. Adding clients past the
+knee only adds queueing latency, so the knee concurrency is a starting point
+for ``max_concurrent_requests`` and the knee throughput for replica sizing.
+
+By default the FastAPI app from ``main.py`` is driven in-process over ASGI
+(with its lifespan), so the load generator shares the CPU with the service;
+use ``--url`` against a local uvicorn for absolute numbers. Text requests
+carry no user ID; in-process runs release every one afresh, and a server
+under test needs ``PRIVACY_ANONYMOUS_POLICY=unaccounted`` so repeated texts
+are analyzed instead of getting their first answer again.
+
+Usage (from apps/ml-service):
+    python -m benchmarks.load_test --concurrency 1,2,4,8,16,32 --stage-seconds 5
+    python -m benchmarks.load_test --url http://127.0.0.1:8001 --target-rps 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import settings
+from utils.logging import setup_logging
+from benchmarks.corpora import text_corpus, activity_profiles, stress_features, keyword_vocabulary
+
+# Request kinds: method and path under /api/v1
+ROUTES = {
+    'analyze-text': ('POST', '/analyze-text'),
+    'analyze-behavior': ('POST', '/analyze-behavior'),
+    'stress-score': ('POST', '/stress-score'),
+    'health': ('GET', '/health'),
+}
+
+DEFAULT_MIX = 'analyze-text=6,analyze-behavior=2,stress-score=1,health=1'
+DEFAULT_RAMP = '1,2,4,8,16,32,64'
+
+LOAD_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse a request mix such as ``analyze-text=6,health=1``.
+
+    Raises:
+        ValueError: For unknown request kinds or non-positive weights
+    """
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown request kind: {name} (expected one of {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+    return mix
+
+def build_payloads(size: int, seed: int = 0) -> Dict[str, List[Optional[Dict[str, Any]]]]:
+    """Build request bodies for every request kind from the synthetic corpora."""
+    from pipelines.nlp.analyzer import TextAnalyzer
+
+    vocabulary = keyword_vocabulary(TextAnalyzer())
+    texts = (
+        text_corpus('short', size, settings.max_text_length, vocabulary, seed)
+        + text_corpus('keyword', size // 4, settings.max_text_length, vocabulary, seed)
+        + text_corpus('long', size // 20, settings.max_text_length, vocabulary, seed)
+    )
+    random.Random(seed).shuffle(texts)
+    return {
+        'analyze-text': [{"text": text} for text in texts],
+        'analyze-behavior': [
+            {"user_id": LOAD_USER_ID, "activity_data": profile}
+            for profile in activity_profiles(size, seed)
+        ],
+        'stress-score': [{"user_id": LOAD_USER_ID, **features} for features in stress_features(size, seed)],
+        'health': [None],
+    }
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    payloads: Dict[str, List[Optional[Dict[str, Any]]]],
+    concurrency: int,
+    duration: float,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Run ``concurrency`` closed-loop clients for ``duration`` seconds.
+
+    Returns:
+        Stage statistics: throughput, error rate, latency percentiles, and
+        the same per request kind
+    """
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    samples: Dict[str, List[float]] = {kind: [] for kind in kinds}
+    failures: Dict[str, int] = {}
+    errors = {kind: 0 for kind in kinds}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def client_loop(client_id: int) -> None:
+        rng = random.Random(f"{seed}:{concurrency}:{client_id}")
+        while loop.time() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            method, path = ROUTES[kind]
+            body = rng.choice(payloads[kind])
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, f"/api/v1{path}", json=body)
+                outcome = str(response.status_code)
+                failed = response.status_code >= 500 or response.status_code == 429
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+                failed = True
+            samples[kind].append(time.perf_counter() - start)
+            if failed:
+                errors[kind] += 1
+                failures[outcome] = failures.get(outcome, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total_errors = sum(errors.values())
+    stage = _summarize(np.concatenate([np.array(values) for values in samples.values()]), total_errors, elapsed)
+    stage['concurrency'] = concurrency
+    stage['failures'] = failures
+    stage['routes'] = {
+        kind: _summarize(np.array(values), errors[kind], elapsed)
+        for kind, values in samples.items() if values
+    }
+    return stage
+
+def find_knee(
+    stages: List[Dict[str, Any]],
+    max_error_rate: float = 0.01,
+    tolerance: float = 0.1
+) -> Optional[Dict[str, Any]]:
+    """
+    Find the saturation knee of a concurrency ramp.
+
+    Args:
+        stages: Stage statistics in ramp order
+        max_error_rate: Stages with more errors than this are over capacity
+        tolerance: Fraction below peak throughput still counted as saturated
+
+    Returns:
+        The first stage within the error budget reaching
+        ``(1 - tolerance)`` of the peak good throughput, or None when no
+        stage stayed within the error budget
+    """
+    healthy = [stage for stage in stages if stage['error_rate'] <= max_error_rate]
+    if not healthy:
+        return None
+    peak = max(stage['throughput_rps'] for stage in healthy)
+    return next(stage for stage in healthy if stage['throughput_rps'] >= (1 - tolerance) * peak)
+
+async def run_load_test(
+    ramp: List[int],
+    mix: Dict[str, float],
+    stage_seconds: float,
+    url: Optional[str] = None,
+    corpus_size: int = 2000,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Run every stage of a concurrency ramp against the app or a server.
+
+    Returns:
+        Stage statistics in ramp order
+    """
+    payloads = build_payloads(corpus_size, seed)
+
+    if url:
+        client = httpx.AsyncClient(
+            base_url=url,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=max(ramp), max_keepalive_connections=max(ramp))
+        )
+        async with client:
+            return [await _run_logged_stage(client, mix, payloads, c, stage_seconds, seed) for c in ramp]
+
+    from main import app
+    from api import privacy_accountant
+    # A load test must not overwrite the service's behavior state snapshot,
+    # nor re-serve the first answer to repeated anonymous texts
+    snapshot_interval = settings.behavior_state_snapshot_interval_seconds
+    settings.behavior_state_snapshot_interval_seconds = 0
+    privacy_accountant.anonymous_policy = 'unaccounted'
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test")
+    try:
+        async with app.router.lifespan_context(app), client:
+            return [await _run_logged_stage(client, mix, payloads, c, stage_seconds, seed) for c in ramp]
+    finally:
+        settings.behavior_state_snapshot_interval_seconds = snapshot_interval
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the ML service and find its saturation knee.")
+    parser.add_argument('--url', help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument('--concurrency', default=DEFAULT_RAMP, help="Comma-separated concurrency ramp")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Weighted request mix, kind=weight,...")
+    parser.add_argument('--stage-seconds', type=float, default=10.0, help="Duration of each ramp step")
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help="Error rate above which a step counts as over capacity")
+    parser.add_argument('--admission-limit', type=int,
+                        help="Override max_concurrent_requests (in-process only)")
+    parser.add_argument('--target-rps', type=float, help="Estimate the replicas needed for this load")
+    parser.add_argument('--corpus-size', type=int, default=2000, help="Distinct payloads per request kind")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus and mix seed")
+    parser.add_argument('--output', help="Write the report JSON to this file")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.getLogger().setLevel(logging.WARNING)
+    ramp = sorted({int(value) for value in args.concurrency.split(',')})
+    mix = parse_mix(args.mix)
+    if args.admission_limit is not None:
+        if args.url:
+            parser.error("--admission-limit only applies to in-process runs")
+        from api import analysis_executor
+        analysis_executor.max_concurrent_requests = args.admission_limit
+
+    stages = asyncio.run(run_load_test(ramp, mix, args.stage_seconds, args.url, args.corpus_size, args.seed))
+    report = build_report(stages, args.max_error_rate, args.target_rps)
+    report['config'] = {
+        'target': args.url or 'in-process',
+        'mix': mix,
+        'stage_seconds': args.stage_seconds,
+        'max_concurrent_requests': settings.max_concurrent_requests
+        if args.admission_limit is None else args.admission_limit,
+    }
+
+    knee = report['knee']
+    if knee is None:
+        print("No step stayed within the error budget; lower the ramp or raise --max-error-rate", file=sys.stderr)
+    else:
+        print(
+            f"Saturation knee at concurrency {knee['concurrency']}: {knee['throughput_rps']:.0f} req/s, "
+            f"p99 {knee['p99_ms']:.1f}ms, {knee['error_rate']:.2%} errors",
+            file=sys.stderr
+        )
+        if report.get('replicas_needed') is not None:
+            print(f"Replicas for {args.target_rps:.0f} req/s: {report['replicas_needed']}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+def build_report(
+    stages: List[Dict[str, Any]],
+    max_error_rate: float = 0.01,
+    target_rps: Optional[float] = None
+) -> Dict[str, Any]:
+    """Assemble stage results, the saturation knee and the sizing estimate."""
+    knee = find_knee(stages, max_error_rate)
+    report = {'stages': stages, 'knee': knee}
+    if knee is not None:
+        report['recommended_max_concurrent_requests'] = knee['concurrency']
+        if target_rps:
+            report['replicas_needed'] = math.ceil(target_rps / knee['throughput_rps'])
+    return report
+
+async def _run_logged_stage(client, mix, payloads, concurrency, stage_seconds, seed) -> Dict[str, Any]:
+    stage = await run_stage(client, mix, payloads, concurrency, stage_seconds, seed)
+    print(
+        f"concurrency {concurrency:>4}: {stage['throughput_rps']:>8.0f} req/s  "
+        f"errors {stage['error_rate']:>6.2%}  p50 {stage['p50_ms']:.1f}ms  "
+        f"p95 {stage['p95_ms']:.1f}ms  p99 {stage['p99_ms']:.1f}ms",
+        file=sys.stderr
+    )
+    return stage
+
+def _summarize(latencies: np.ndarray, errors: int, elapsed: float) -> Dict[str, Any]:
+    requests = len(latencies)
+    if requests == 0:
+        return {'requests': 0, 'errors': 0, 'error_rate': 0.0, 'throughput_rps': 0.0,
+                'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    latencies_ms = latencies * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': errors / requests,
+        # Good requests per second: errors are not capacity
+        'throughput_rps': (requests - errors) / elapsed,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(latencies_ms.max()),
+    }
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,526 @@
+"""
+Benchmark the ML service hot paths and flag regressions against a baseline.
+
+Measures throughput and p50/p99 latency of input validation, text, behavior
+and stress analysis, privacy noise, and the API routes driven in-process
+through ASGI, on the synthetic corpora from ``benchmarks.corpora``. The
+``codec.*`` benchmarks time the routes with analysis stubbed out, leaving
+request decoding and response encoding.
+
+Usage (from apps/ml-service):
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --output new.json
+
+Exits with status 1 when any benchmark regressed by more than ``--threshold``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import settings
+from utils.logging import setup_logging
+from utils.validation import validate_text_input
+from utils.privacy import apply_differential_privacy
+from pipelines.nlp.analyzer import TextAnalyzer
+from pipelines.behavior.analyzer import BehaviorAnalyzer
+from pipelines.fusion.stress_scorer import StressScorer
+from benchmarks.corpora import (
+    TEXT_KINDS, text_corpus, activity_profiles, stress_features, keyword_vocabulary,
+    behavior_events
+)
+
+RESULTS_VERSION = 1
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {'ops_per_sec': True, 'p50_ms': False, 'p99_ms': False}
+
+BENCH_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+# Items per request of the batch route benchmarks
+ROUTE_BATCH_TEXTS = 32
+ROUTE_BATCH_EVENTS = 1000
+
+class Benchmark:
+    """
+    One measured operation.
+
+    Attributes:
+        name: Result key, e.g. ``text.analyze[short]``
+        func: Callable (or coroutine function) taking one input
+        inputs: Inputs cycled through, one per call
+        expected_errors: Exception types counted as expected outcomes (e.g.
+            PII rejections) rather than failures
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        inputs: List[Any],
+        expected_errors: tuple = ()
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.expected_errors = expected_errors
+        self.is_async = asyncio.iscoroutinefunction(func)
+
+def measure(benchmark: Benchmark, samples: int, warmup: int) -> Dict[str, Any]:
+    """
+    Time ``samples`` calls of a benchmark after ``warmup`` untimed calls.
+
+    Returns:
+        Throughput, latency percentiles in milliseconds and the error count
+    """
+    inputs = benchmark.inputs
+    latencies = np.empty(samples)
+    errors = 0
+
+    def call_sync(n: int) -> None:
+        benchmark.func(inputs[n % len(inputs)])
+
+    async def run_async() -> float:
+        nonlocal errors
+        for n in range(warmup):
+            try:
+                await benchmark.func(inputs[n % len(inputs)])
+            except benchmark.expected_errors:
+                pass
+        start = time.perf_counter()
+        for n in range(samples):
+            call_start = time.perf_counter()
+            try:
+                await benchmark.func(inputs[(warmup + n) % len(inputs)])
+            except benchmark.expected_errors:
+                errors += 1
+            latencies[n] = time.perf_counter() - call_start
+        return time.perf_counter() - start
+
+    if benchmark.is_async:
+        elapsed = asyncio.run(run_async())
+    else:
+        for n in range(warmup):
+            try:
+                call_sync(n)
+            except benchmark.expected_errors:
+                pass
+        start = time.perf_counter()
+        for n in range(samples):
+            call_start = time.perf_counter()
+            try:
+                call_sync(warmup + n)
+            except benchmark.expected_errors:
+                errors += 1
+            latencies[n] = time.perf_counter() - call_start
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = latencies * 1000
+    return {
+        'samples': samples,
+        'ops_per_sec': samples / elapsed if elapsed > 0 else 0.0,
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+        'expected_errors': errors,
+    }
+
+def build_benchmarks(corpus_size: int, seed: int = 0) -> List[Benchmark]:
+    """Build the component and route benchmarks over fresh synthetic corpora."""
+    from fastapi import HTTPException
+
+    # Fresh analyzers with result caching off, so every call does the work
+    text_analyzer = TextAnalyzer()
+    text_analyzer.cache = None
+    behavior_analyzer = BehaviorAnalyzer()
+    stress_scorer = StressScorer()
+
+    vocabulary = keyword_vocabulary(text_analyzer)
+    corpora = {
+        kind: text_corpus(kind, corpus_size, settings.max_text_length, vocabulary, seed)
+        for kind in TEXT_KINDS
+    }
+    profiles = activity_profiles(corpus_size, seed)
+    text_results = [text_analyzer._analyze_text(text) for text in corpora['keyword'][:100]]
+    behavior_results = [
+        asyncio.run(behavior_analyzer.analyze(BENCH_USER_ID, profile)) for profile in profiles[:100]
+    ]
+    feature_pairs = list(zip(text_results, behavior_results))
+
+    benchmarks = []
+    for kind, texts in corpora.items():
+        benchmarks.append(Benchmark(
+            f"validation.validate_text_input[{kind}]", validate_text_input, texts,
+            expected_errors=(HTTPException,)
+        ))
+
+    # PII posts are analyzed too, as if validation had been skipped
+    async def analyze_text(text: str) -> Dict[str, Any]:
+        return await text_analyzer.analyze(text, validated=True)
+    for kind, texts in corpora.items():
+        benchmarks.append(Benchmark(f"text.analyze[{kind}]", analyze_text, texts))
+
+    benchmarks.append(Benchmark(
+        "privacy.apply_differential_privacy", apply_differential_privacy, text_results
+    ))
+
+    async def analyze_behavior(profile: Dict[str, Any]) -> Dict[str, Any]:
+        return await behavior_analyzer.analyze(BENCH_USER_ID, profile)
+    benchmarks.append(Benchmark("behavior.analyze", analyze_behavior, profiles))
+
+    async def calculate_score(features: tuple) -> Dict[str, Any]:
+        return await stress_scorer.calculate_score(BENCH_USER_ID, features[0], features[1])
+    benchmarks.append(Benchmark("stress.calculate_score", calculate_score, feature_pairs))
+
+    benchmarks.extend(build_route_benchmarks(corpora, profiles, seed))
+    benchmarks.extend(build_codec_benchmarks(
+        text_analyzer, corpora['keyword'], text_results[0], behavior_results[0],
+        feature_pairs[0], profiles[0], seed
+    ))
+    return benchmarks
+
+def build_route_benchmarks(
+    corpora: Dict[str, List[str]],
+    profiles: List[Dict[str, Any]],
+    seed: int = 0
+) -> List[Benchmark]:
+    """
+    Build benchmarks of full API requests through the ASGI app, in-process.
+
+    Besides analysis, these include request decoding and validation and
+    response encoding, which dominate the batch and info routes.
+    """
+    import httpx
+    import api
+    from main import app
+
+    # Requests are timed for their analysis, so anonymous repeats must not re-serve answers
+    api.privacy_accountant.anonymous_policy = 'unaccounted'
+
+    def route(method: str, path: str) -> Callable[[Any], Any]:
+        async def request(body: Optional[Dict[str, Any]]) -> None:
+            # The ASGI transport opens no connections, so a client per call is cheap
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+            ) as client:
+                response = await client.request(method, f"/api/v1{path}", json=body)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        return request
+
+    return [
+        Benchmark(
+            "route.analyze_text[short]", route("POST", "/analyze-text"),
+            [{"text": text} for text in corpora['short']]
+        ),
+        Benchmark(
+            "route.analyze_text[pii]", route("POST", "/analyze-text"),
+            [{"text": text} for text in corpora['pii']]
+        ),
+        Benchmark(
+            "route.analyze_behavior", route("POST", "/analyze-behavior"),
+            [{"user_id": BENCH_USER_ID, "activity_data": profile} for profile in profiles]
+        ),
+        Benchmark(
+            "route.stress_score", route("POST", "/stress-score"),
+            [
+                {"user_id": BENCH_USER_ID, **features}
+                for features in stress_features(len(profiles), seed)
+            ]
+        ),
+        Benchmark(
+            f"route.analyze_text_batch[{ROUTE_BATCH_TEXTS}]", route("POST", "/analyze-text/batch"),
+            [
+                {"texts": corpora['short'][start:start + ROUTE_BATCH_TEXTS]}
+                for start in range(0, len(corpora['short']) - ROUTE_BATCH_TEXTS + 1, ROUTE_BATCH_TEXTS)
+            ]
+        ),
+        Benchmark(
+            "route.assess", route("POST", "/assess"),
+            [
+                {"user_id": BENCH_USER_ID, "text": text, "activity_data": profile}
+                for text, profile in zip(corpora['keyword'], profiles)
+            ]
+        ),
+        Benchmark(
+            f"route.behavior_events[{ROUTE_BATCH_EVENTS}]", route("POST", "/behavior/events"),
+            [
+                {"events": behavior_events(ROUTE_BATCH_EVENTS, seed * 10 + n)}
+                for n in range(5)
+            ]
+        ),
+        Benchmark("route.model_info", route("GET", "/model-info"), [None]),
+        Benchmark("route.health", route("GET", "/health"), [None]),
+    ]
+
+def build_codec_benchmarks(
+    text_analyzer: TextAnalyzer,
+    texts: List[str],
+    text_result: Dict[str, Any],
+    behavior_result: Dict[str, Any],
+    features: tuple,
+    profile: Dict[str, Any],
+    seed: int = 0
+) -> List[Benchmark]:
+    """
+    Build benchmarks of each route's request decoding and response encoding.
+
+    Requests are sent straight to the ASGI app (no HTTP client) while the
+    service analyzers are swapped for ones answering with precomputed
+    results, so what is timed is body parsing, validation, response
+    construction and serialization, plus the framework around them.
+    """
+    import api
+    from main import app
+
+    api.privacy_accountant.anonymous_policy = 'unaccounted'
+    stress_result = asyncio.run(StressScorer().calculate_score(BENCH_USER_ID, *features))
+    model_info = text_analyzer.get_model_info()
+
+    class CannedText:
+        async def analyze(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+            return dict(text_result)
+
+        async def analyze_batch(self, texts: List[str], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+            return {'results': [dict(text_result) for _ in texts], 'errors': []}
+
+        def get_model_info(self) -> Dict[str, Any]:
+            return model_info
+
+    class CannedBehavior:
+        async def analyze(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+            return dict(behavior_result)
+
+        async def record_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+            return {'accepted': len(events), 'dropped': 0, 'errors': []}
+
+        def get_feature_info(self) -> Dict[str, Any]:
+            return {}
+
+    class CannedStress:
+        async def calculate_score(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+            return dict(stress_result)
+
+        def get_model_type(self) -> str:
+            return "canned"
+
+    canned = {
+        "text_analyzer": CannedText(),
+        "behavior_analyzer": CannedBehavior(),
+        "stress_scorer": CannedStress(),
+    }
+
+    def route(method: str, path: str) -> Callable[[Any], Any]:
+        async def request(body: bytes) -> None:
+            analyzers, api._analyzers = api._analyzers, canned
+            try:
+                status = await call_asgi(app, method, f"/api/v1{path}", body)
+            finally:
+                api._analyzers = analyzers
+            if status >= 400:
+                raise RuntimeError(f"{path} returned {status}")
+        return request
+
+    def encode(bodies: List[Any]) -> List[bytes]:
+        return [json.dumps(body).encode() for body in bodies]
+
+    max_texts = settings.max_batch_texts
+    max_events = settings.max_batch_events
+    return [
+        Benchmark(
+            "codec.analyze_text", route("POST", "/analyze-text"),
+            encode([{"text": text} for text in texts[:50]])
+        ),
+        Benchmark(
+            f"codec.analyze_text_batch[{max_texts}]", route("POST", "/analyze-text/batch"),
+            encode([{"texts": [texts[n % len(texts)] for n in range(max_texts)]}])
+        ),
+        Benchmark(
+            "codec.analyze_behavior", route("POST", "/analyze-behavior"),
+            encode([{"user_id": BENCH_USER_ID, "activity_data": profile}])
+        ),
+        Benchmark(
+            f"codec.behavior_events[{max_events}]", route("POST", "/behavior/events"),
+            encode([{"events": behavior_events(max_events, seed)}])
+        ),
+        Benchmark(
+            "codec.stress_score", route("POST", "/stress-score"),
+            encode([{"user_id": BENCH_USER_ID, **stress_features(1, seed)[0]}])
+        ),
+        Benchmark(
+            "codec.assess", route("POST", "/assess"),
+            # A user per text, so the privacy budget lasts the whole run
+            encode([
+                {"user_id": str(uuid.UUID(int=n + 1, version=4)), "text": text, "activity_data": profile}
+                for n, text in enumerate(texts[:50])
+            ])
+        ),
+        Benchmark("codec.model_info", route("GET", "/model-info"), [b""]),
+    ]
+
+async def call_asgi(app: Any, method: str, path: str, body: bytes) -> int:
+    """
+    Send one request with a JSON body to an ASGI app and drain the response.
+
+    Returns:
+        Response status code
+    """
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        if messages:
+            return messages.pop()
+        # The request is complete; the client never disconnects early
+        await asyncio.Event().wait()
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [
+            (b'host', b'benchmark'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('benchmark', 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+def run_suite(
+    samples: int = 1000,
+    warmup: int = 100,
+    seed: int = 0,
+    name_filter: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run every benchmark (or those whose name contains ``name_filter``).
+
+    Returns:
+        Results document with run metadata and per-benchmark statistics
+    """
+    results = {}
+    for benchmark in build_benchmarks(corpus_size=samples + warmup, seed=seed):
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        results[benchmark.name] = measure(benchmark, samples, warmup)
+        print(_format_result(benchmark.name, results[benchmark.name]), file=sys.stderr)
+
+    return {
+        'version': RESULTS_VERSION,
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'samples': samples,
+            'warmup': warmup,
+            'seed': seed,
+        },
+        'benchmarks': results,
+    }
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25
+) -> List[Dict[str, Any]]:
+    """
+    Find benchmarks that got worse than the baseline by more than ``threshold``.
+
+    Args:
+        current: Results document of this run
+        baseline: Results document to compare against
+        threshold: Tolerated relative change (0.25 = 25%)
+
+    Returns:
+        One entry per regressed metric, with both values and the relative change
+    """
+    regressions = []
+    for name, result in current['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': change,
+                })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ML service hot paths.")
+    parser.add_argument('--output', help="Write results JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Relative slowdown flagged as a regression")
+    parser.add_argument('--samples', type=int, default=1000, help="Timed calls per benchmark")
+    parser.add_argument('--warmup', type=int, default=100, help="Untimed calls per benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_suite(args.samples, args.warmup, args.seed, args.filter)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+            f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['change']:+.1%})",
+            file=sys.stderr
+        )
+    return 1 if regressions else 0
+
+def _format_result(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<45} {result['ops_per_sec']:>10.0f} ops/s  "
+        f"p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms"
+    )
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Dict, Any, AsyncIterator, Optional
+from typing_extensions import Annotated, NotRequired, TypedDict
 import asyncio
+import os
+import time
 from datetime import datetime
 
-from pipelines.nlp.analyzer import TextAnalyzer
-from pipelines.behavior.analyzer import BehaviorAnalyzer
-from pipelines.fusion.stress_scorer import StressScorer
-from utils.privacy import apply_differential_privacy
-from utils.validation import validate_text_input
+from utils.privacy import apply_differential_privacy, apply_differential_privacy_batch, open_budget
+from utils.privacy_accountant import create_privacy_accountant
+from utils.ndjson import NDJSONStreamingResponse, iter_ndjson, encode_ndjson
+from utils.serialization import FastJSONResponse, parse_json_body, json_body_schema
+from utils.validation import validate_text_input, validate_user_id
+from utils.health import HealthMonitor, HEALTH_CHECK_USER_ID
+from utils.metrics import StageTimer
+from utils.executor import AnalysisExecutor
+from utils.scheduler import PeriodicTask
+from utils.logging import get_logger
 from config import settings
 
-router = APIRouter()
+logger = get_logger(__name__)
 
-# Request/Response models
+# The prefix is set here rather than when the app includes the router, so
+# every route's own path is its full template (used to label metrics)
+router = APIRouter(prefix="/api/v1")
+
+# Request/Response models. Analyzer output already has the response types, so
+# routes encode it directly with FastJSONResponse instead of validating it
+# against a response_model; the response models only document the routes
+# (``responses=``) and tests/test_serialization.py pins the shapes to them
 class TextAnalysisRequest(BaseModel):
     text: str = Field(..., max_length=settings.max_text_length)
     user_id: Optional[str] = None
@@ -27,6 +42,30 @@ class TextAnalysisResponse(BaseModel):
     safety_flags: List[str]
     processing_time_ms: float
 
+class BatchTextAnalysisRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=settings.max_batch_texts)
+    user_id: Optional[str] = None
+    context: Optional[Dict[str, Any]] = None
+
+# Batch bodies are validated straight from the request bytes
+batch_text_request_adapter = TypeAdapter(BatchTextAnalysisRequest)
+
+class TextAnalysisResult(BaseModel):
+    sentiment: Dict[str, float]
+    emotion: Dict[str, float]
+    toxicity_score: float
+    stress_indicators: List[str]
+    safety_flags: List[str]
+
+class BatchItemError(BaseModel):
+    index: int
+    error: str
+
+class BatchTextAnalysisResponse(BaseModel):
+    results: List[Optional[TextAnalysisResult]]
+    errors: List[BatchItemError]
+    processing_time_ms: float
+
 class BehaviorAnalysisRequest(BaseModel):
     user_id: str
     activity_data: Dict[str, Any]
@@ -39,6 +78,30 @@ class BehaviorAnalysisResponse(BaseModel):
     anomaly_flags: List[str]
     processing_time_ms: float
 
+# Events are validated into plain dicts, the form record_events takes
+class BehaviorEvent(TypedDict):
+    user_id: str
+    event_type: str
+    timestamp: datetime
+    duration_minutes: NotRequired[Optional[Annotated[float, Field(ge=0)]]]
+
+class BehaviorEventBatch(TypedDict):
+    events: Annotated[
+        List[BehaviorEvent],
+        Field(min_length=1, max_length=settings.max_batch_events)
+    ]
+
+behavior_event_batch_adapter = TypeAdapter(BehaviorEventBatch)
+
+class BehaviorEventResponse(BaseModel):
+    accepted: int
+    dropped: int
+    errors: List[BatchItemError]
+
+class IncrementalBehaviorRequest(BaseModel):
+    user_id: str
+    time_window_days: int = Field(default=7, ge=1, le=30)
+
 class StressScoreRequest(BaseModel):
     user_id: str
     text_features: Optional[Dict[str, float]] = None
@@ -51,146 +114,600 @@ class StressScoreResponse(BaseModel):
     recommendations: List[str]
     processing_time_ms: float
 
-# Initialize analyzers
-text_analyzer = TextAnalyzer()
-behavior_analyzer = BehaviorAnalyzer()
-stress_scorer = StressScorer()
+class AssessmentRequest(BaseModel):
+    user_id: str
+    text: Optional[str] = Field(default=None, max_length=settings.max_text_length)
+    activity_data: Optional[Dict[str, Any]] = None
+    time_window_days: int = Field(default=7, ge=1, le=30)
+    context: Optional[Dict[str, Any]] = None
+
+class BehaviorAnalysisResult(BaseModel):
+    activity_score: float
+    rhythm_changes: Dict[str, float]
+    engagement_trend: str
+    anomaly_flags: List[str]
+
+class StressScoreResult(BaseModel):
+    stress_score: float
+    confidence: float
+    contributing_factors: List[str]
+    recommendations: List[str]
+
+class AssessmentResponse(BaseModel):
+    text_analysis: Optional[TextAnalysisResult]
+    behavior_analysis: Optional[BehaviorAnalysisResult]
+    stress: StressScoreResult
+    processing_time_ms: float
+
+ANALYZER_NAMES = ("text_analyzer", "behavior_analyzer", "stress_scorer")
+
+def create_analyzers(executor: Optional[AnalysisExecutor] = None) -> Dict[str, Any]:
+    """Build the analyzers; also used to pre-warm process pool workers."""
+    # Pipelines (and their numeric dependencies) are imported on first use so
+    # importing the app stays cheap
+    from pipelines.nlp.analyzer import TextAnalyzer
+    from pipelines.behavior.analyzer import BehaviorAnalyzer
+    from pipelines.fusion.stress_scorer import StressScorer
+    
+    return {
+        "text_analyzer": TextAnalyzer(executor=executor),
+        "behavior_analyzer": BehaviorAnalyzer(executor=executor),
+        "stress_scorer": StressScorer(executor=executor),
+    }
+
+# Worker pool for CPU-bound analysis, with admission control
+analysis_executor = AnalysisExecutor(
+    mode=settings.executor_mode,
+    max_workers=settings.executor_workers or None,
+    max_concurrent_requests=settings.max_concurrent_requests,
+    retry_after_seconds=settings.admission_retry_after_seconds,
+    component_factory=create_analyzers
+)
+
+# Analyzers are built by the app's lifespan hook (or on first use)
+_analyzers: Optional[Dict[str, Any]] = None
 
-@router.post("/analyze-text", response_model=TextAnalysisResponse)
+def get_analyzers() -> Dict[str, Any]:
+    """Get the service analyzers, building them on first call."""
+    global _analyzers
+    if _analyzers is None:
+        _analyzers = create_analyzers(analysis_executor)
+    return _analyzers
+
+def get_analyzer(name: str) -> Any:
+    """Get one service analyzer by name, building the analyzers on first call."""
+    return get_analyzers()[name]
+
+def __getattr__(name: str) -> Any:
+    # Keep ``from api import text_analyzer`` working without building the
+    # analyzers at import time
+    if name in ANALYZER_NAMES:
+        return get_analyzer(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Sample inputs exercising every hot path once before the service reports ready
+WARM_UP_TEXTS = [
+    "Warm-up post: so stressed about the exam, no sleep and too much work!",
+    "Had a great day at the library with friends",
+    "",
+]
+WARM_UP_ACTIVITY = {
+    'posts_count': 5,
+    'comments_count': 10,
+    'hourly_activity': {'1': 3, '14': 6},
+    'daily_activity': {'monday': 4, 'friday': 2},
+}
+
+async def warm_up() -> Dict[str, float]:
+    """
+    Run each analyzer's hot paths once so the first real request is not the slow one.
+    
+    Loads model backends and starts pool workers without touching the result
+    cache, the privacy accountant or rolling behavior state.
+    
+    Returns:
+        Milliseconds spent warming each analyzer
+    """
+    analyzers = get_analyzers()
+    timings = {}
+    
+    start = time.perf_counter()
+    text_results = await analyzers["text_analyzer"].warm_up(WARM_UP_TEXTS[:-1])
+    timings["text_analyzer"] = round((time.perf_counter() - start) * 1000, 3)
+    
+    start = time.perf_counter()
+    behavior_results = await analyzers["behavior_analyzer"].analyze(
+        HEALTH_CHECK_USER_ID, WARM_UP_ACTIVITY, 7
+    )
+    timings["behavior_analyzer"] = round((time.perf_counter() - start) * 1000, 3)
+    
+    start = time.perf_counter()
+    await analyzers["stress_scorer"].calculate_score(
+        HEALTH_CHECK_USER_ID, text_results[0], behavior_results
+    )
+    timings["stress_scorer"] = round((time.perf_counter() - start) * 1000, 3)
+    
+    return timings
+
+# Rolling behavior state is snapshotted periodically and restored at startup
+behavior_state_dir = os.path.join(settings.model_cache_dir, "behavior_state")
+behavior_state_snapshots = PeriodicTask(
+    "behavior_state_snapshot",
+    lambda: get_analyzer("behavior_analyzer").snapshot_state(behavior_state_dir),
+    settings.behavior_state_snapshot_interval_seconds
+)
+
+async def open_privacy_budget():
+    """Give each analysis request its own epsilon budget of settings.privacy_epsilon."""
+    open_budget(settings.privacy_epsilon)
+
+# Analysis routes are rejected with 503 + Retry-After once the limit is reached,
+# and every noised release they make is charged to the request's privacy budget
+analysis_dependencies = [Depends(analysis_executor.admit), Depends(open_privacy_budget)]
+
+# Cumulative per-user epsilon; exhausted users get their cached noised answers
+privacy_accountant = create_privacy_accountant()
+
+# Documented on routes charged to the accountant
+BUDGET_EXHAUSTED_RESPONSE = {
+    "description": "The user's privacy budget is spent and the query has no earlier answer; "
+                   "retry after Retry-After seconds"
+}
+
+async def release_text_analysis(
+    text: str,
+    user_id: Optional[str],
+    context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Analyze validated text and release it with DP noise, within the user's privacy budget."""
+    async def analyze_and_protect():
+        results = await get_analyzer("text_analyzer").analyze(
+            text=text,
+            user_id=user_id,
+            context=context,
+            validated=True
+        )
+        if settings.enable_differential_privacy:
+            results = apply_differential_privacy(results, settings.privacy_epsilon)
+        return results
+    
+    if not settings.enable_differential_privacy:
+        return await analyze_and_protect()
+    return await privacy_accountant.answer(
+        user_id,
+        privacy_accountant.make_key("text", text),
+        settings.privacy_epsilon,
+        analyze_and_protect
+    )
+
+# Background self-tests backing the health endpoints
+health_monitor = HealthMonitor(
+    checks={
+        name: (lambda name=name: get_analyzer(name).health_check())
+        for name in ANALYZER_NAMES
+    },
+    interval_seconds=settings.health_check_interval_seconds,
+    latency_budget_ms=settings.health_check_latency_budget_ms
+)
+
+@router.post(
+    "/analyze-text",
+    responses={200: {"model": TextAnalysisResponse}, 429: BUDGET_EXHAUSTED_RESPONSE},
+    dependencies=analysis_dependencies
+)
 async def analyze_text(request: TextAnalysisRequest):
     """
     Analyze text content for sentiment, emotion, toxicity, and stress indicators.
     Privacy-preserving: No raw text is stored, only aggregated features.
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
-        # Validate input
+        # Validate input (including the PII scan) once per request
+        timer = StageTimer('text')
         validate_text_input(request.text)
+        timer.mark('validate')
         
-        # Perform analysis
-        results = await text_analyzer.analyze(
-            text=request.text,
-            user_id=request.user_id,
-            context=request.context
-        )
+        # Perform analysis and apply privacy protection
+        results = await release_text_analysis(request.text, request.user_id, request.context)
         
-        # Apply privacy protection
-        if settings.enable_differential_privacy:
-            results = apply_differential_privacy(results, settings.privacy_epsilon)
+        processing_time = (time.perf_counter() - start_time) * 1000
         
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        return FastJSONResponse({
+            "sentiment": results["sentiment"],
+            "emotion": results["emotion"],
+            "toxicity_score": results["toxicity_score"],
+            "stress_indicators": results["stress_indicators"],
+            "safety_flags": results["safety_flags"],
+            "processing_time_ms": processing_time
+        })
         
-        return TextAnalysisResponse(
-            sentiment=results["sentiment"],
-            emotion=results["emotion"],
-            toxicity_score=results["toxicity_score"],
-            stress_indicators=results["stress_indicators"],
-            safety_flags=results["safety_flags"],
-            processing_time_ms=processing_time
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Text analysis failed: {str(e)}")
+
+@router.post(
+    "/analyze-text/batch",
+    responses={200: {"model": BatchTextAnalysisResponse}, 429: BUDGET_EXHAUSTED_RESPONSE},
+    dependencies=analysis_dependencies,
+    openapi_extra={"requestBody": json_body_schema(batch_text_request_adapter)}
+)
+async def analyze_text_batch(request: Request):
+    """
+    Analyze many texts in one request, returning per-item results and errors.
+    Items that fail validation or analysis are reported without failing the batch.
+    """
+    start_time = time.perf_counter()
+    body = await parse_json_body(request, batch_text_request_adapter)
+    
+    async def analyze_and_protect():
+        batch = await get_analyzer("text_analyzer").analyze_batch(
+            texts=body.texts,
+            user_id=body.user_id,
+            context=body.context
         )
+        if settings.enable_differential_privacy:
+            batch["results"] = apply_differential_privacy_batch(batch["results"], settings.privacy_epsilon)
+        return batch
+    
+    try:
+        # Perform batch analysis and apply privacy protection
+        if settings.enable_differential_privacy:
+            batch = await privacy_accountant.answer(
+                body.user_id,
+                privacy_accountant.make_key("text-batch", *body.texts),
+                settings.privacy_epsilon,
+                analyze_and_protect
+            )
+        else:
+            batch = await analyze_and_protect()
+        
+        processing_time = (time.perf_counter() - start_time) * 1000
+        
+        return FastJSONResponse({
+            "results": batch["results"],
+            "errors": batch["errors"],
+            "processing_time_ms": processing_time
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Text analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch text analysis failed: {str(e)}")
 
-@router.post("/analyze-behavior", response_model=BehaviorAnalysisResponse)
+@router.post("/analyze-text/stream", dependencies=analysis_dependencies)
+async def analyze_text_stream(request: Request):
+    """
+    Analyze an NDJSON stream of texts, streaming NDJSON results back as they are ready.
+    
+    Each input line is an object with ``text`` and an optional ``id``. Each output
+    line carries the ``index`` (and ``id``) of its input with either ``result`` or
+    ``error``; a final line holds the ``summary``. Input is read and analyzed in
+    chunks of settings.batch_size, and the next chunk is only read once the previous
+    results were sent, so memory stays bounded and a slow client applies backpressure.
+    """
+    return NDJSONStreamingResponse(stream_text_analysis(request.stream()))
+
+async def stream_text_analysis(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Turn an NDJSON body of texts into NDJSON result lines, one chunk at a time."""
+    start_time = time.perf_counter()
+    total = 0
+    failed = 0
+    # Every line is a distinct input, so the first chunk released pays for the stream
+    stream_epsilon = settings.privacy_epsilon
+    chunk: List[Dict[str, Any]] = []
+    
+    async def flush() -> bytes:
+        nonlocal failed, stream_epsilon
+        valid = [item for item in chunk if 'error' not in item]
+        if valid:
+            texts = [item['text'] for item in valid]
+            
+            async def analyze_and_protect():
+                nonlocal stream_epsilon
+                batch = await get_analyzer("text_analyzer").analyze_batch(texts)
+                if settings.enable_differential_privacy:
+                    batch["results"] = apply_differential_privacy_batch(
+                        batch["results"], settings.privacy_epsilon, charge=stream_epsilon > 0
+                    )
+                    stream_epsilon = 0.0
+                return batch
+            
+            try:
+                if settings.enable_differential_privacy:
+                    batch = await privacy_accountant.answer(
+                        None,
+                        privacy_accountant.make_key("text-stream", *texts),
+                        stream_epsilon,
+                        analyze_and_protect
+                    )
+                else:
+                    batch = await analyze_and_protect()
+            except HTTPException as e:
+                # The response has started, so a refused release fails its lines instead
+                if e.status_code != 429:
+                    raise
+                batch = {"results": [None] * len(valid), "errors": [
+                    {"index": index, "error": e.detail} for index in range(len(valid))
+                ]}
+            for item, result in zip(valid, batch["results"]):
+                item['result'] = result
+            for error in batch["errors"]:
+                valid[error['index']]['error'] = error['error']
+        
+        records = []
+        for item in chunk:
+            record = {'index': item['index']}
+            if item.get('id') is not None:
+                record['id'] = item['id']
+            if 'error' in item:
+                failed += 1
+                record['error'] = item['error']
+            else:
+                record['result'] = item['result']
+            records.append(record)
+        chunk.clear()
+        return encode_ndjson(records)
+    
+    async for value, error in iter_ndjson(body, settings.max_stream_line_bytes):
+        item: Dict[str, Any] = {'index': total}
+        total += 1
+        if error is not None:
+            item['error'] = error
+        elif not isinstance(value, dict) or not isinstance(value.get('text'), str):
+            item['error'] = "Each line must be an object with a text field"
+        else:
+            item['id'] = value.get('id')
+            item['text'] = value['text']
+        chunk.append(item)
+        
+        if len(chunk) >= settings.batch_size:
+            yield await flush()
+    
+    if chunk:
+        yield await flush()
+    
+    yield encode_ndjson([{
+        'summary': {
+            'total': total,
+            'failed': failed,
+            'processing_time_ms': (time.perf_counter() - start_time) * 1000
+        }
+    }])
+
+@router.post(
+    "/analyze-behavior",
+    responses={200: {"model": BehaviorAnalysisResponse}},
+    dependencies=analysis_dependencies
+)
 async def analyze_behavior(request: BehaviorAnalysisRequest):
     """
     Analyze user behavioral patterns for stress and wellbeing indicators.
     Privacy-preserving: Only aggregated patterns, no individual activity details.
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Perform behavioral analysis
-        results = await behavior_analyzer.analyze(
+        results = await get_analyzer("behavior_analyzer").analyze(
             user_id=request.user_id,
             activity_data=request.activity_data,
             time_window_days=request.time_window_days
         )
         
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000
+        
+        return FastJSONResponse({
+            "activity_score": results["activity_score"],
+            "rhythm_changes": results["rhythm_changes"],
+            "engagement_trend": results["engagement_trend"],
+            "anomaly_flags": results["anomaly_flags"],
+            "processing_time_ms": processing_time
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Behavior analysis failed: {str(e)}")
+
+@router.post(
+    "/behavior/events",
+    responses={200: {"model": BehaviorEventResponse}},
+    dependencies=analysis_dependencies,
+    openapi_extra={"requestBody": json_body_schema(behavior_event_batch_adapter)}
+)
+async def record_behavior_events(request: Request):
+    """
+    Ingest activity events (login, post, comment, reaction, message, session_end)
+    into per-user rolling aggregates used by incremental behavior analysis.
+    Timestamps should be in the user's local time.
+    """
+    body = await parse_json_body(request, behavior_event_batch_adapter)
+    
+    try:
+        return FastJSONResponse(await get_analyzer("behavior_analyzer").record_events(body["events"]))
         
-        return BehaviorAnalysisResponse(
-            activity_score=results["activity_score"],
-            rhythm_changes=results["rhythm_changes"],
-            engagement_trend=results["engagement_trend"],
-            anomaly_flags=results["anomaly_flags"],
-            processing_time_ms=processing_time
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Behavior event ingestion failed: {str(e)}")
+
+@router.post(
+    "/analyze-behavior/incremental",
+    responses={200: {"model": BehaviorAnalysisResponse}},
+    dependencies=analysis_dependencies
+)
+async def analyze_behavior_incremental(request: IncrementalBehaviorRequest):
+    """
+    Analyze behavioral patterns from ingested events without shipping activity histories.
+    Uses the smallest tracked window (1, 7, 14 or 30 days) covering the requested one.
+    """
+    # Already imported by create_analyzers; kept local so importing the app stays cheap
+    from pipelines.behavior.analyzer import UnknownUserError
+    
+    start_time = time.perf_counter()
+    
+    try:
+        results = await get_analyzer("behavior_analyzer").analyze_incremental(
+            user_id=request.user_id,
+            time_window_days=request.time_window_days
         )
         
+        processing_time = (time.perf_counter() - start_time) * 1000
+        
+        return FastJSONResponse({
+            "activity_score": results["activity_score"],
+            "rhythm_changes": results["rhythm_changes"],
+            "engagement_trend": results["engagement_trend"],
+            "anomaly_flags": results["anomaly_flags"],
+            "processing_time_ms": processing_time
+        })
+        
+    except HTTPException:
+        raise
+    except UnknownUserError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Behavior analysis failed: {str(e)}")
 
-@router.post("/stress-score", response_model=StressScoreResponse)
+@router.post(
+    "/stress-score",
+    responses={200: {"model": StressScoreResponse}},
+    dependencies=analysis_dependencies
+)
 async def calculate_stress_score(request: StressScoreRequest):
     """
     Calculate comprehensive stress score from text and behavioral features.
     Uses transparent, interpretable model with clear contributing factors.
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Calculate stress score
-        results = await stress_scorer.calculate_score(
+        results = await get_analyzer("stress_scorer").calculate_score(
             user_id=request.user_id,
             text_features=request.text_features,
             behavior_features=request.behavior_features
         )
         
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000
         
-        return StressScoreResponse(
-            stress_score=results["stress_score"],
-            confidence=results["confidence"],
-            contributing_factors=results["contributing_factors"],
-            recommendations=results["recommendations"],
-            processing_time_ms=processing_time
-        )
+        return FastJSONResponse({
+            "stress_score": results["stress_score"],
+            "confidence": results["confidence"],
+            "contributing_factors": results["contributing_factors"],
+            "recommendations": results["recommendations"],
+            "processing_time_ms": processing_time
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stress scoring failed: {str(e)}")
 
+@router.post(
+    "/assess",
+    responses={200: {"model": AssessmentResponse}},
+    dependencies=analysis_dependencies
+)
+async def assess(request: AssessmentRequest):
+    """
+    Run text and behavior analysis concurrently and score stress from their results.
+    Replaces the analyze-text, analyze-behavior and stress-score round-trips with one call;
+    intermediate results are passed in memory and the user ID is validated once.
+    """
+    start_time = time.perf_counter()
+    
+    if request.text is None and request.activity_data is None:
+        raise HTTPException(status_code=400, detail="Either text or activity_data must be provided")
+    
+    try:
+        # Validate inputs once for the whole pipeline
+        validate_user_id(request.user_id)
+        if request.text is not None:
+            timer = StageTimer('text')
+            validate_text_input(request.text)
+            timer.mark('validate')
+        
+        # Run text and behavior analysis concurrently
+        analyses = {}
+        if request.text is not None:
+            # Privacy protection is applied before text features leave the analyzer
+            analyses["text"] = release_text_analysis(request.text, request.user_id, request.context)
+        if request.activity_data is not None:
+            analyses["behavior"] = get_analyzer("behavior_analyzer").analyze(
+                user_id=request.user_id,
+                activity_data=request.activity_data,
+                time_window_days=request.time_window_days,
+                validated=True
+            )
+        outputs = dict(zip(analyses, await asyncio.gather(*analyses.values())))
+        text_results = outputs.get("text")
+        behavior_results = outputs.get("behavior")
+        
+        # Score stress from the in-memory analysis results
+        stress_results = await get_analyzer("stress_scorer").calculate_score(
+            user_id=request.user_id,
+            text_features=text_results,
+            behavior_features=behavior_results,
+            validated=True
+        )
+        
+        processing_time = (time.perf_counter() - start_time) * 1000
+        
+        return FastJSONResponse({
+            "text_analysis": text_results,
+            "behavior_analysis": behavior_results,
+            "stress": stress_results,
+            "processing_time_ms": processing_time
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Assessment failed: {str(e)}")
+
 @router.get("/model-info")
 async def get_model_info():
     """Get information about loaded models and their capabilities."""
-    return {
+    return FastJSONResponse({
         "text_analyzer": {
-            "models": text_analyzer.get_model_info(),
+            "models": get_analyzer("text_analyzer").get_model_info(),
             "capabilities": ["sentiment", "emotion", "toxicity", "stress_detection"]
         },
         "behavior_analyzer": {
-            "features": behavior_analyzer.get_feature_info(),
+            "features": get_analyzer("behavior_analyzer").get_feature_info(),
             "capabilities": ["activity_patterns", "rhythm_analysis", "anomaly_detection"]
         },
         "stress_scorer": {
-            "model_type": stress_scorer.get_model_type(),
+            "model_type": get_analyzer("stress_scorer").get_model_type(),
             "interpretability": "high",
             "privacy_preserving": True
-        }
-    }
+        },
+        "executor": analysis_executor.get_stats(),
+        "privacy_accountant": privacy_accountant.get_stats()
+    })
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint with model status."""
-    try:
-        # Quick model health checks
-        text_healthy = await text_analyzer.health_check()
-        behavior_healthy = await behavior_analyzer.health_check()
-        scorer_healthy = await stress_scorer.health_check()
-        
-        return {
-            "status": "healthy" if all([text_healthy, behavior_healthy, scorer_healthy]) else "degraded",
-            "models": {
-                "text_analyzer": "healthy" if text_healthy else "unhealthy",
-                "behavior_analyzer": "healthy" if behavior_healthy else "unhealthy", 
-                "stress_scorer": "healthy" if scorer_healthy else "unhealthy"
-            },
-            "timestamp": datetime.now().isoformat()
+    """Health status from the most recent background self-tests (no analysis is run)."""
+    return FastJSONResponse(health_monitor.get_status())
+
+@router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop is responsive."""
+    return FastJSONResponse({"status": "alive"})
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: self-tests have run and no analyzer is failing."""
+    status = health_monitor.get_status()
+    return FastJSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={
+            "status": "ready" if status["ready"] else "not_ready",
+            "health": status["status"],
+            "last_checked": status["last_checked"],
         }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
\ No newline at end of file
+    )
@@ -0,0 +1,414 @@
+"""
+Offline batch scoring of files, without the HTTP server.
+
+Reads posts and/or activity aggregates from JSONL, CSV or Parquet, runs them
+through TextAnalyzer, BehaviorAnalyzer and StressScorer in worker processes
+(one per core by default), and writes one result row per input record.
+
+Usage:
+    python src/cli.py INPUT OUTPUT [--workers N] [--chunk-size N]
+
+Input records may carry ``id``, ``user_id``, ``text`` and ``activity_data``
+(an object in the format accepted by ``/analyze-behavior``; a JSON string in
+CSV). CSV and Parquet inputs without an ``activity_data`` column may instead
+provide its fields as columns (``posts_count``, ``hourly_activity``, ...).
+Formats are inferred from file extensions unless given explicitly.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Any, Iterator, Optional
+
+from config import settings
+from utils.logging import setup_logging
+from utils.privacy import apply_differential_privacy_batch
+from pipelines.nlp.analyzer import TextAnalyzer
+from pipelines.behavior.analyzer import BehaviorAnalyzer
+from pipelines.behavior.batch import ActivityBatch, ACTIVITY_COUNT_FIELDS, HISTORY_FIELDS, results_to_records
+from pipelines.fusion.stress_scorer import StressScorer
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+# Activity fields that may be given as separate CSV/Parquet columns
+ACTIVITY_COLUMNS = ACTIVITY_COUNT_FIELDS + ['hourly_activity', 'daily_activity'] + HISTORY_FIELDS
+
+# Flat output columns for CSV/Parquet; nested results are kept as JSON strings
+OUTPUT_COLUMNS = [
+    'index', 'id', 'user_id', 'stress_score', 'confidence', 'toxicity_score',
+    'activity_score', 'engagement_trend', 'stress_indicators', 'safety_flags',
+    'anomaly_flags', 'errors', 'text_analysis', 'behavior_analysis', 'stress',
+]
+
+# Analyzers owned by this process (built once per worker), and the event
+# loop every chunk runs on: clients bound to a loop, like the Redis tier of
+# the result cache, stay usable across chunks
+_components: Dict[str, Any] = {}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score posts and activity aggregates from a file.")
+    parser.add_argument('input', help="Input file (.jsonl/.ndjson, .csv or .parquet)")
+    parser.add_argument('output', help="Output file (.jsonl/.ndjson, .csv or .parquet)")
+    parser.add_argument('--input-format', choices=FORMATS, help="Override the input format")
+    parser.add_argument('--output-format', choices=FORMATS, help="Override the output format")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 runs in this process)")
+    parser.add_argument('--chunk-size', type=int, default=settings.batch_size * 8,
+                        help="Records per unit of work")
+    parser.add_argument('--progress-interval', type=float, default=5.0,
+                        help="Seconds between progress reports on stderr")
+    parser.add_argument('--log-level', default='WARNING', help="Analyzer log level")
+    args = parser.parse_args(argv)
+
+    _configure_logging(args.log_level)
+    input_format = args.input_format or _infer_format(args.input)
+    output_format = args.output_format or _infer_format(args.output)
+
+    summary = score_file(
+        args.input, args.output, input_format, output_format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        progress_interval=args.progress_interval,
+        log_level=args.log_level
+    )
+    print(
+        f"Scored {summary['records']} records ({summary['failed']} with errors) in "
+        f"{summary['elapsed_seconds']:.1f}s, {summary['records_per_second']:.0f} records/s",
+        file=sys.stderr
+    )
+    return 0
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    output_format: str,
+    workers: int = 1,
+    chunk_size: int = 256,
+    progress_interval: float = 5.0,
+    log_level: str = 'WARNING'
+) -> Dict[str, Any]:
+    """
+    Score every record of a file and write the results in input order.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    regardless of file size.
+
+    Returns:
+        Record and error counts, elapsed time and throughput
+    """
+    start = time.perf_counter()
+    last_report = start
+    records = 0
+    failed = 0
+
+    chunks = _read_chunks(input_path, input_format, chunk_size)
+    writer = _open_writer(output_path, output_format)
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=_configure_logging, initargs=(log_level,)
+    ) if workers > 1 else None
+
+    try:
+        pending: "deque[Future]" = deque()
+        for chunk in chunks:
+            if pool is None:
+                results = score_records(chunk)
+            else:
+                pending.append(pool.submit(score_records, chunk))
+                if len(pending) < 2 * workers:
+                    continue
+                results = pending.popleft().result()
+
+            writer.write(results)
+            records += len(results)
+            failed += sum(1 for result in results if result.get('errors'))
+            if time.perf_counter() - last_report >= progress_interval:
+                last_report = time.perf_counter()
+                _report_progress(records, failed, last_report - start)
+
+        while pending:
+            results = pending.popleft().result()
+            writer.write(results)
+            records += len(results)
+            failed += sum(1 for result in results if result.get('errors'))
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'records': records,
+        'failed': failed,
+        'elapsed_seconds': elapsed,
+        'records_per_second': records / elapsed if elapsed > 0 else 0.0,
+    }
+
+def score_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run one chunk of records through the analyzers.
+
+    Text is analyzed as a batch (with the same validation and privacy noise
+    as the API), activity aggregates with ``analyze_many``, and stress with
+    ``score_many`` from whatever features each record has.
+
+    Args:
+        records: Input records, each with an ``index`` and optionally ``id``,
+            ``user_id``, ``text``, ``activity_data`` or a read ``error``
+
+    Returns:
+        One result row per record, in order
+    """
+    if not _components:
+        _components.update(
+            loop=asyncio.new_event_loop(),
+            text_analyzer=TextAnalyzer(),
+            behavior_analyzer=BehaviorAnalyzer(),
+            stress_scorer=StressScorer()
+        )
+    text_analyzer = _components['text_analyzer']
+    behavior_analyzer = _components['behavior_analyzer']
+    stress_scorer = _components['stress_scorer']
+
+    rows = []
+    for record in records:
+        row = {'index': record['index']}
+        for key in ('id', 'user_id'):
+            if record.get(key) is not None:
+                row[key] = record[key]
+        row['errors'] = {'input': record['error']} if 'error' in record else {}
+        rows.append(row)
+
+    # Text analysis
+    text_rows = [row for row, record in zip(rows, records) if record.get('text') is not None]
+    if text_rows:
+        texts = [record['text'] for record in records if record.get('text') is not None]
+        batch = _components['loop'].run_until_complete(text_analyzer.analyze_batch(texts))
+        results = batch['results']
+        if settings.enable_differential_privacy:
+            results = apply_differential_privacy_batch(results, settings.privacy_epsilon)
+        for row, result in zip(text_rows, results):
+            if result is not None:
+                row['text_analysis'] = result
+        for error in batch['errors']:
+            text_rows[error['index']]['errors']['text'] = error['error']
+
+    # Behavior analysis
+    behavior_rows = [
+        (row, record['activity_data']) for row, record in zip(rows, records)
+        if record.get('activity_data') is not None
+    ]
+    if behavior_rows:
+        try:
+            results = _analyze_activity(behavior_analyzer, [data for _, data in behavior_rows])
+        except Exception:
+            # Isolate the malformed records by analyzing one at a time
+            results = []
+            for _, data in behavior_rows:
+                try:
+                    results.extend(_analyze_activity(behavior_analyzer, [data]))
+                except Exception as e:
+                    results.append(e)
+        for (row, _), result in zip(behavior_rows, results):
+            if isinstance(result, Exception):
+                row['errors']['behavior'] = f"Behavioral analysis failed: {result}"
+            else:
+                row['behavior_analysis'] = result
+
+    # Stress scoring from the available features
+    scored_rows = [row for row in rows if 'text_analysis' in row or 'behavior_analysis' in row]
+    if scored_rows:
+        features, confidence = stress_scorer.build_feature_matrix(
+            [row.get('text_analysis') for row in scored_rows],
+            [row.get('behavior_analysis') for row in scored_rows]
+        )
+        scores = stress_scorer.to_records(stress_scorer.score_many(features, confidence))
+        for row, score in zip(scored_rows, scores):
+            row['stress'] = score
+
+    for row in rows:
+        # Keep errors last, after whatever results were produced
+        errors = row.pop('errors')
+        if errors:
+            row['errors'] = errors
+    return rows
+
+def _analyze_activity(analyzer: BehaviorAnalyzer, activity: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return results_to_records(analyzer.analyze_many(ActivityBatch.from_records(activity)))
+
+def _read_chunks(path: str, input_format: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for index, record in enumerate(_read_records(path, input_format)):
+        record['index'] = index
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _read_records(path: str, input_format: str) -> Iterator[Dict[str, Any]]:
+    if input_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield {'error': f"Invalid JSON: {e}"}
+                    continue
+                yield record if isinstance(record, dict) else {'error': "Each line must be an object"}
+
+    elif input_format == 'csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    yield _normalize_columns({key: value for key, value in row.items() if value != ''})
+                except ValueError as e:
+                    yield {'error': f"Invalid column value: {e}"}
+
+    else:
+        parquet = _import_parquet()
+        for batch in parquet.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                try:
+                    yield _normalize_columns({key: value for key, value in row.items() if value is not None})
+                except ValueError as e:
+                    yield {'error': f"Invalid column value: {e}"}
+
+def _normalize_columns(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble ``activity_data`` from flat columns and decode JSON-encoded values."""
+    activity = row.get('activity_data')
+    if activity is None:
+        activity = {key: row.pop(key) for key in ACTIVITY_COLUMNS if key in row} or None
+    elif isinstance(activity, str):
+        activity = json.loads(activity)
+
+    if activity is not None:
+        activity = {
+            key: json.loads(value) if isinstance(value, str) and key not in ACTIVITY_COUNT_FIELDS
+            else float(value) if key in ACTIVITY_COUNT_FIELDS else value
+            for key, value in activity.items()
+        }
+        row['activity_data'] = activity
+    return row
+
+class _JSONLWriter:
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._file.write(''.join(json.dumps(row, default=_json_default) + '\n' for row in rows))
+
+    def close(self) -> None:
+        self._file.close()
+
+class _CSVWriter:
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(_flatten_row(row) for row in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        import pyarrow as pa
+        self._pa = pa
+        self._schema = pa.schema([
+            ('index', pa.int64()),
+            *[(column, pa.float64()) for column in ('stress_score', 'confidence', 'toxicity_score', 'activity_score')],
+            *[(column, pa.string()) for column in OUTPUT_COLUMNS
+              if column not in ('index', 'stress_score', 'confidence', 'toxicity_score', 'activity_score')],
+        ])
+        self._writer = _import_parquet().ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        flat = [_flatten_row(row) for row in rows]
+        for row in flat:
+            for column in ('id', 'user_id'):
+                if row.get(column) is not None:
+                    row[column] = str(row[column])
+        self._writer.write_table(self._pa.Table.from_pylist(flat, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+def _open_writer(path: str, output_format: str):
+    if output_format == 'jsonl':
+        return _JSONLWriter(path)
+    if output_format == 'csv':
+        return _CSVWriter(path)
+    return _ParquetWriter(path)
+
+def _flatten_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    text = row.get('text_analysis') or {}
+    behavior = row.get('behavior_analysis') or {}
+    stress = row.get('stress') or {}
+    flat = {
+        'index': row['index'],
+        'id': row.get('id'),
+        'user_id': row.get('user_id'),
+        'stress_score': stress.get('stress_score'),
+        'confidence': stress.get('confidence'),
+        'toxicity_score': text.get('toxicity_score'),
+        'activity_score': behavior.get('activity_score'),
+        'engagement_trend': behavior.get('engagement_trend'),
+        'stress_indicators': '|'.join(text.get('stress_indicators', [])) or None,
+        'safety_flags': '|'.join(text.get('safety_flags', [])) or None,
+        'anomaly_flags': '|'.join(behavior.get('anomaly_flags', [])) or None,
+    }
+    for column in ('errors', 'text_analysis', 'behavior_analysis', 'stress'):
+        value = row.get(column)
+        flat[column] = json.dumps(value, default=_json_default) if value else None
+    for column in ('stress_score', 'confidence', 'toxicity_score', 'activity_score'):
+        if flat[column] is not None:
+            flat[column] = float(flat[column])
+    return flat
+
+def _json_default(value: Any) -> Any:
+    # NumPy scalars from the analyzers
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as parquet
+    except ImportError:
+        raise SystemExit("Parquet support requires the pyarrow package")
+    return parquet
+
+def _infer_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    raise SystemExit(f"Cannot infer the format of {path}; pass --input-format/--output-format")
+
+def _configure_logging(level: str) -> None:
+    setup_logging()
+    logging.getLogger().setLevel(level.upper())
+
+def _report_progress(records: int, failed: int, elapsed: float) -> None:
+    print(
+        f"{records} records scored ({failed} with errors), {records / elapsed:.0f} records/s",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -12,15 +12,72 @@ class Settings(BaseSettings):
     
     # Model settings
     model_cache_dir: str = "./models"
+    # Text model backend per component: "lexicon" (default) or
+    # "hashed_linear:<model directory under model_cache_dir>"
+    text_model_backends: Dict[str, str] = {}
     max_text_length: int = 2000
     
     # Privacy settings
     enable_differential_privacy: bool = True
+    # Epsilon per released score: each numeric value gets Laplace noise of
+    # scale 1/privacy_epsilon and a release is charged privacy_epsilon.
+    # privacy_split_epsilon makes privacy_epsilon bound a whole result instead,
+    # split across its values; keep the same noise by raising privacy_epsilon
+    # (and privacy_user_budget) to about 10x, the number of values in a text result
     privacy_epsilon: float = 1.0
+    privacy_split_epsilon: bool = False
+    # Cumulative epsilon each user may spend per window (about 100 distinct
+    # texts a day at the default epsilon). Once spent, repeated queries get
+    # their earlier answer and new ones 429 with Retry-After until the window
+    # rolls over
+    privacy_user_budget: float = 100.0
+    # Requests without a user ID are not capped: "answer_once" gives each
+    # distinct query one fresh release per window, "unaccounted" every time
+    privacy_anonymous_policy: str = "answer_once"
+    privacy_budget_window_seconds: int = 86400
+    privacy_answer_cache_size: int = 10000
+    privacy_accountant_use_redis: bool = False
     
     # Performance settings
     batch_size: int = 32
+    max_batch_texts: int = 500
+    max_batch_events: int = 5000
+    max_stream_line_bytes: int = 65536
     max_concurrent_requests: int = 100
+    admission_retry_after_seconds: int = 1
+    
+    # Execution settings ("inline", "thread" or "process"; 0 workers = pool default)
+    executor_mode: str = "thread"
+    executor_workers: int = 0
+    
+    # Prefork server settings (src/serve.py; 0 workers = one per core). More
+    # than one worker needs the Redis privacy accountant (or privacy off) and
+    # server_per_worker_behavior_state acknowledging that rolling behavior
+    # state and metrics are per worker (no incremental behavior analysis, or
+    # one worker per user)
+    server_workers: int = 1
+    server_per_worker_behavior_state: bool = False
+    server_graceful_timeout_seconds: float = 30.0
+    
+    # Result cache settings
+    enable_result_cache: bool = True
+    result_cache_size: int = 10000
+    result_cache_ttl_seconds: int = 3600
+    result_cache_use_redis: bool = False
+    
+    # Behavior state settings (snapshots live under model_cache_dir; 0 disables)
+    behavior_state_capacity: int = 1024
+    behavior_state_snapshot_interval_seconds: float = 300.0
+    
+    # Logging settings: lines are written by a background thread through a
+    # queue of log_queue_size lines; sample rates (0-1) thin out high-volume
+    # events by name, e.g. {"Text analysis completed": 0.1}
+    log_queue_size: int = 10000
+    log_sample_rates: Dict[str, float] = {}
+    
+    # Health check settings
+    health_check_interval_seconds: float = 30.0
+    health_check_latency_budget_ms: float = 250.0
     
     # Thresholds
     stress_threshold_high: float = 0.7
@@ -1,28 +1,76 @@
+import time
+
+# Startup timings are reported once the service is ready
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-import uvicorn
 import os
 from dotenv import load_dotenv
 
-from api import router
+import api
+from api import (
+    router, health_monitor, analysis_executor, get_analyzers, warm_up,
+    behavior_state_snapshots
+)
 from config import settings
-from utils.logging import setup_logging
+from utils.logging import setup_logging, get_logger
+from utils.metrics import MetricsMiddleware, registry
+from utils.serialization import FastJSONResponse
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
+    start = time.perf_counter()
+    analyzers = get_analyzers()
+    analyzers_ms = (time.perf_counter() - start) * 1000
+    analysis_executor.start()
+    snapshots_enabled = settings.behavior_state_snapshot_interval_seconds > 0
+    if snapshots_enabled:
+        # Read at startup: preforked workers each get their own directory
+        analyzers["behavior_analyzer"].restore_state(api.behavior_state_dir)
+        behavior_state_snapshots.start()
+    
+    # Readiness only flips once the hot paths ran and the self-tests passed
+    warm_up_start = time.perf_counter()
+    try:
+        warm_up_ms = await warm_up()
+    except Exception as e:
+        warm_up_ms = {}
+        logger.error(f"Warm-up failed: {e}")
+    warm_up_total_ms = (time.perf_counter() - warm_up_start) * 1000
+    health_monitor.start()
+    
+    app.state.startup = {
+        'import_ms': round(IMPORT_SECONDS * 1000, 3),
+        'analyzers_ms': round(analyzers_ms, 3),
+        'warm_up_ms': round(warm_up_total_ms, 3),
+        'warm_up': warm_up_ms,
+        'startup_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
+    logger.info("Service started", **app.state.startup)
     yield
     # Shutdown
-    pass
+    await health_monitor.stop()
+    if snapshots_enabled:
+        await behavior_state_snapshots.stop()
+        await analyzers["behavior_analyzer"].snapshot_state(api.behavior_state_dir)
+    analysis_executor.shutdown()
 
 app = FastAPI(
     title="Student Community ML Service",
     description="Privacy-preserving ML service for stress analysis and content safety",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -35,17 +83,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request counts, errors and latency
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
-app.include_router(router, prefix="/api/v1")
+app.include_router(router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "ml-service"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of request and pipeline stage metrics."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
+    import uvicorn
+    
+    # Reloading needs an import string; otherwise serve the app already
+    # imported here instead of importing this module a second time
+    reload = os.getenv("NODE_ENV") == "development"
     uvicorn.run(
-        "main:app",
+        "main:app" if reload else app,
         host="0.0.0.0",
         port=int(os.getenv("ML_PORT", 8001)),
-        reload=True if os.getenv("NODE_ENV") == "development" else False
+        reload=reload
     )
\ No newline at end of file
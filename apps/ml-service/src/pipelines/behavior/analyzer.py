@@ -1,27 +1,49 @@
 import asyncio
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from datetime import datetime, timedelta
+from fastapi import HTTPException
 from utils.logging import get_logger
+from utils.health import HEALTH_CHECK_USER_ID
+from utils.metrics import StageTimer
+from utils.executor import AnalysisExecutor
 from utils.validation import validate_user_id, validate_time_window, sanitize_output
 from config import settings
+from pipelines.behavior.batch import ActivityBatch, ANOMALY_FLAGS
+from pipelines.behavior.state import (
+    BehaviorStateStore, EVENT_TYPES, RETENTION_DAYS, WINDOWS, write_snapshot
+)
 
 logger = get_logger(__name__)
 
+# Hours of day counted as late night (11 PM - 3 AM)
+LATE_NIGHT_HOURS = [23, 0, 1, 2, 3]
+
+# Events folded into state between yields to the event loop; the state is
+# only touched from the loop, so ingestion is chunked rather than offloaded
+RECORD_CHUNK_SIZE = 256
+
+class UnknownUserError(ValueError):
+    """Raised when incremental analysis is asked about a user with no recorded events."""
+
 class BehaviorAnalyzer:
     """
     Privacy-preserving behavioral pattern analyzer for stress and wellbeing indicators.
     """
     
-    def __init__(self):
+    def __init__(self, executor: Optional[AnalysisExecutor] = None):
         self.analyzer_ready = True
+        self.executor = executor if executor is not None else AnalysisExecutor(mode='inline')
+        self.state_store = BehaviorStateStore(capacity=settings.behavior_state_capacity)
         logger.info("Behavior analyzer initialized")
     
     async def analyze(
         self,
         user_id: str,
         activity_data: Dict[str, Any],
-        time_window_days: int = 7
+        time_window_days: int = 7,
+        validated: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze user behavioral patterns for stress and wellbeing indicators.
@@ -30,46 +52,31 @@ class BehaviorAnalyzer:
             user_id: User identifier (for privacy-safe logging only)
             activity_data: Aggregated activity data
             time_window_days: Analysis time window in days
+            validated: Whether the caller already validated the user ID and window
             
         Returns:
             Behavioral analysis results
         """
-        start_time = datetime.now()
+        timer = StageTimer('behavior')
         
         try:
-            # Validate inputs
-            validate_user_id(user_id)
-            validate_time_window(time_window_days)
-            
-            # Extract activity metrics
-            activity_score = self._calculate_activity_score(activity_data)
-            
-            # Analyze rhythm changes
-            rhythm_changes = self._analyze_rhythm_changes(activity_data, time_window_days)
-            
-            # Determine engagement trend
-            engagement_trend = self._calculate_engagement_trend(activity_data)
-            
-            # Detect anomalies
-            anomaly_flags = self._detect_anomalies(activity_data, time_window_days)
-            
-            results = {
-                'activity_score': activity_score,
-                'rhythm_changes': rhythm_changes,
-                'engagement_trend': engagement_trend,
-                'anomaly_flags': anomaly_flags,
-            }
+            # Validate inputs unless the caller already did
+            if not validated:
+                validate_user_id(user_id)
+                validate_time_window(time_window_days)
+                timer.mark('validate')
             
-            # Sanitize output
-            results = sanitize_output(results)
+            results = await self.executor.run(
+                'behavior_analyzer', self._analyze_activity, activity_data, time_window_days
+            )
             
             # Log analysis (privacy-safe)
             logger.info(
                 "Behavior analysis completed",
                 user_id=user_id[:8] + "..." if user_id else None,
                 time_window_days=time_window_days,
-                activity_score=activity_score,
-                anomaly_count=len(anomaly_flags)
+                activity_score=results['activity_score'],
+                anomaly_count=len(results['anomaly_flags'])
             )
             
             return results
@@ -78,6 +85,422 @@ class BehaviorAnalyzer:
             logger.error(f"Behavior analysis failed: {e}", user_id=user_id)
             raise
     
+    def _analyze_activity(
+        self,
+        activity_data: Dict[str, Any],
+        time_window_days: int
+    ) -> Dict[str, Any]:
+        """Run every behavior analysis stage on already validated input."""
+        timer = StageTimer('behavior')
+        
+        # Extract activity metrics
+        activity_score = self._calculate_activity_score(activity_data)
+        timer.mark('activity')
+        
+        # Analyze rhythm changes
+        rhythm_changes = self._analyze_rhythm_changes(activity_data, time_window_days)
+        timer.mark('rhythm')
+        
+        # Determine engagement trend
+        engagement_trend = self._calculate_engagement_trend(activity_data)
+        timer.mark('trend')
+        
+        # Detect anomalies
+        anomaly_flags = self._detect_anomalies(activity_data, time_window_days)
+        timer.mark('anomalies')
+        
+        results = {
+            'activity_score': activity_score,
+            'rhythm_changes': rhythm_changes,
+            'engagement_trend': engagement_trend,
+            'anomaly_flags': anomaly_flags,
+        }
+        
+        # Sanitize output
+        results = sanitize_output(results)
+        timer.mark('sanitize')
+        
+        return results
+    
+    async def record_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fold activity events into per-user rolling state.
+        
+        Other requests run between chunks of ``RECORD_CHUNK_SIZE`` events, so
+        a large batch does not hold the event loop.
+        
+        Args:
+            events: Events with ``user_id``, ``event_type``, ``timestamp``
+                (user-local datetime) and, for ``session_end``, ``duration_minutes``
+            
+        Returns:
+            Counts of ``accepted`` and ``dropped`` (older than the retained
+            history) events, and ``errors`` listing the index and reason of
+            each rejected event
+        """
+        accepted = 0
+        dropped = 0
+        errors: List[Dict[str, Any]] = []
+        
+        for index, event in enumerate(events):
+            if index and index % RECORD_CHUNK_SIZE == 0:
+                await asyncio.sleep(0)
+            try:
+                validate_user_id(event['user_id'])
+                recorded = self.state_store.record(
+                    event['user_id'],
+                    event['event_type'],
+                    event['timestamp'],
+                    event.get('duration_minutes')
+                )
+            except HTTPException as e:
+                errors.append({'index': index, 'error': e.detail})
+                continue
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            
+            if recorded:
+                accepted += 1
+            else:
+                dropped += 1
+        
+        logger.info(
+            "Behavior events recorded",
+            accepted=accepted,
+            dropped=dropped,
+            failed_count=len(errors),
+            tracked_users=len(self.state_store)
+        )
+        
+        return {'accepted': accepted, 'dropped': dropped, 'errors': errors}
+    
+    async def analyze_incremental(
+        self,
+        user_id: str,
+        time_window_days: int = 7,
+        as_of: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze a user from rolling state built by ``record_events``.
+        
+        Produces the same metrics as ``analyze`` in O(1) per user. The request
+        window is served by the smallest tracked window (1, 7, 14 or 30 days)
+        that covers it.
+        
+        Args:
+            user_id: User identifier
+            time_window_days: Analysis time window in days
+            as_of: Evaluation time (defaults to now); older days are expired
+            
+        Returns:
+            Behavioral analysis results
+            
+        Raises:
+            UnknownUserError: If no events were recorded for the user
+            ValueError: If the window is longer than the retained history
+        """
+        timer = StageTimer('behavior')
+        
+        validate_user_id(user_id)
+        validate_time_window(time_window_days)
+        if time_window_days > RETENTION_DAYS:
+            raise ValueError(f"Incremental analysis supports windows up to {RETENTION_DAYS} days")
+        timer.mark('validate')
+        
+        if user_id not in self.state_store:
+            raise UnknownUserError("No activity recorded for user")
+        
+        stats = self.state_store.window_stats(
+            user_id, time_window_days, (as_of or datetime.now()).toordinal()
+        )
+        results = sanitize_output(self._analyze_window(stats))
+        timer.mark('state')
+        
+        logger.info(
+            "Behavior analysis completed",
+            user_id=user_id[:8] + "...",
+            time_window_days=stats['window_days'],
+            incremental=True,
+            activity_score=results['activity_score'],
+            anomaly_count=len(results['anomaly_flags'])
+        )
+        
+        return results
+    
+    def restore_state(self, directory: str) -> bool:
+        """
+        Replace the rolling state with a snapshot written by ``snapshot_state``.
+        
+        Args:
+            directory: Snapshot directory
+            
+        Returns:
+            True if a snapshot was loaded, False if none exists or it is unusable
+        """
+        start = time.perf_counter()
+        try:
+            self.state_store = BehaviorStateStore.load_snapshot(directory)
+        except FileNotFoundError:
+            return False
+        except (ValueError, OSError) as e:
+            logger.warning("Ignoring unusable behavior state snapshot", error=str(e))
+            return False
+        
+        logger.info(
+            "Behavior state restored",
+            tracked_users=len(self.state_store),
+            load_time_ms=round((time.perf_counter() - start) * 1000, 2)
+        )
+        return True
+    
+    async def snapshot_state(self, directory: str) -> None:
+        """
+        Write the rolling state to ``directory``.
+        
+        The used rows are copied on the event loop, so the snapshot is
+        consistent, and the files are written from a worker thread.
+        """
+        start = time.perf_counter()
+        user_ids, arrays = self.state_store.export()
+        await asyncio.to_thread(write_snapshot, directory, user_ids, arrays)
+        
+        logger.info(
+            "Behavior state snapshot written",
+            tracked_users=len(user_ids),
+            snapshot_time_ms=round((time.perf_counter() - start) * 1000, 2)
+        )
+    
+    def _analyze_window(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive behavior metrics from rolling window aggregates."""
+        counts = stats['counts']
+        days = stats['days']
+        
+        # Late night activity (11 PM - 3 AM)
+        hourly = stats['hourly_activity']
+        total_activity = hourly.sum() or 1
+        late_night_ratio = float(hourly[LATE_NIGHT_HOURS].sum() / total_activity)
+        
+        # Weekend vs weekday activity
+        weekday = stats['weekday_activity']
+        week_activity = weekday.sum()
+        weekend_ratio = float(weekday[5:].sum() / week_activity) if week_activity > 0 else 0.0
+        
+        # Activity consistency over the window's days (coefficient of variation)
+        mean_activity = stats['activity_mean']
+        if days > 1 and mean_activity > 0:
+            consistency_score = 1 - stats['activity_std'] / mean_activity
+        else:
+            consistency_score = 1.0
+        
+        slope = stats['engagement_slope']
+        if slope > 0.1:
+            engagement_trend = 'increasing'
+        elif slope < -0.1:
+            engagement_trend = 'decreasing'
+        else:
+            engagement_trend = 'stable'
+        
+        anomaly_flags = []
+        
+        if days >= 3 and stats['recent_activity_mean'] < 0.3 * mean_activity and mean_activity > 0:
+            anomaly_flags.append('sudden_activity_drop')
+        
+        if late_night_ratio > 0.4:
+            anomaly_flags.append('excessive_late_night_activity')
+        
+        social_activity = counts['messages_count'] + counts['comments_count'] + counts['reactions_count']
+        if counts['posts_count'] > 5 and social_activity < counts['posts_count'] * 0.2:
+            anomaly_flags.append('low_social_interaction')
+        
+        if days >= 7:
+            baseline_posts = (stats['posts_sum'] - stats['recent_posts']) / (days - 3)
+            if stats['recent_posts'] > 3 * baseline_posts and baseline_posts > 0:
+                anomaly_flags.append('posting_frequency_spike')
+        
+        recent_sessions = stats['recent_sessions']
+        if stats['baseline_sessions'] and stats['baseline_sessions'] + len(recent_sessions) >= 5:
+            recent_avg = sum(recent_sessions) / len(recent_sessions)
+            baseline_avg = stats['baseline_session_mean']
+            if recent_avg > 2 * baseline_avg and recent_avg > 60:  # > 1 hour
+                anomaly_flags.append('extended_session_duration')
+            elif recent_avg < 0.3 * baseline_avg:
+                anomaly_flags.append('shortened_session_duration')
+        
+        return {
+            'activity_score': self._calculate_activity_score(counts),
+            'rhythm_changes': {
+                'late_night_ratio': round(late_night_ratio, 3),
+                'weekend_ratio': round(weekend_ratio, 3),
+                'consistency_score': round(consistency_score, 3),
+            },
+            'engagement_trend': engagement_trend,
+            'anomaly_flags': anomaly_flags,
+        }
+    
+    def analyze_many(self, batch: ActivityBatch) -> Dict[str, Any]:
+        """
+        Analyze a columnar batch of users with array operations.
+        
+        Produces the same metrics as ``analyze`` for every user at once, which
+        makes cohort-wide scoring practical without per-user Python loops.
+        
+        Args:
+            batch: Columnar activity data for N users
+            
+        Returns:
+            Columnar results: (N,) ``activity_score``, ``engagement_slope`` and
+            ``engagement_trend`` arrays, a ``rhythm_changes`` dict of (N,) arrays
+            and an (N, 6) boolean ``anomaly_flags`` matrix whose columns follow
+            ``ANOMALY_FLAGS``
+        """
+        counts = batch.counts
+        
+        # Activity score (same weights and caps as _calculate_activity_score)
+        activity_score = (
+            0.3 * np.minimum(counts['posts_count'] / 10, 1.0) +
+            0.25 * np.minimum(counts['comments_count'] / 20, 1.0) +
+            0.15 * np.minimum(counts['reactions_count'] / 50, 1.0) +
+            0.15 * np.minimum(counts['messages_count'] / 30, 1.0) +
+            0.1 * np.minimum(counts['login_frequency'] / 7, 1.0) +
+            0.05 * np.minimum(counts['avg_session_duration'] / 120, 1.0)
+        )
+        
+        # Late night activity (11 PM - 3 AM)
+        hourly = batch.hourly_activity
+        total_activity = hourly.sum(axis=1)
+        total_activity[total_activity == 0] = 1
+        late_night_ratio = hourly[:, LATE_NIGHT_HOURS].sum(axis=1) / total_activity
+        
+        # Weekend vs weekday activity
+        reported_days = ~np.isnan(batch.daily_activity)
+        daily = np.where(reported_days, batch.daily_activity, 0.0)
+        week_activity = daily.sum(axis=1)
+        weekend_ratio = np.zeros(batch.size)
+        np.divide(daily[:, 5:].sum(axis=1), week_activity, out=weekend_ratio, where=week_activity > 0)
+        
+        # Activity consistency over reported days (coefficient of variation)
+        days_count = reported_days.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_activity = week_activity / days_count
+            std_activity = np.sqrt(
+                np.where(reported_days, (daily - mean_activity[:, None]) ** 2, 0.0).sum(axis=1) / days_count
+            )
+            consistency_score = np.where(
+                (days_count > 1) & (mean_activity > 0),
+                1 - std_activity / mean_activity,
+                1.0
+            )
+        
+        # Engagement slope via closed-form least squares over x = 0..n-1
+        recent, recent_length = self._history_values(batch.recent_activity)
+        x = np.arange(recent.shape[1], dtype=np.float64)
+        n = recent_length.astype(np.float64)
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        sum_y = recent.sum(axis=1)
+        sum_xy = recent @ x
+        has_trend = recent_length >= 3
+        engagement_slope = np.zeros(batch.size)
+        np.divide(
+            n * sum_xy - sum_x * sum_y,
+            n * sum_xx - sum_x ** 2,
+            out=engagement_slope,
+            where=has_trend
+        )
+        engagement_trend = np.where(
+            engagement_slope > 0.1, 'increasing',
+            np.where(engagement_slope < -0.1, 'decreasing', 'stable')
+        )
+        
+        # Anomaly flags
+        anomaly_flags = np.zeros((batch.size, len(ANOMALY_FLAGS)), dtype=bool)
+        
+        overall_avg = np.zeros(batch.size)
+        np.divide(sum_y, n, out=overall_avg, where=recent_length > 0)
+        recent_avg = self._split_sums(recent, recent_length, 3)[0] / 3
+        anomaly_flags[:, 0] = has_trend & (recent_avg < 0.3 * overall_avg) & (overall_avg > 0)
+        
+        anomaly_flags[:, 1] = late_night_ratio > 0.4
+        
+        social_activity = (
+            counts['messages_count'] + counts['comments_count'] + counts['reactions_count']
+        )
+        posts_count = counts['posts_count']
+        anomaly_flags[:, 2] = (posts_count > 5) & (social_activity < posts_count * 0.2)
+        
+        daily_posts, posts_length = self._history_values(batch.daily_posts)
+        recent_posts, earlier_posts = self._split_sums(daily_posts, posts_length, 3)
+        has_posts_baseline = posts_length >= 7
+        baseline_posts = np.zeros(batch.size)
+        np.divide(
+            earlier_posts,
+            posts_length - 3,
+            out=baseline_posts,
+            where=has_posts_baseline
+        )
+        anomaly_flags[:, 3] = (
+            has_posts_baseline & (recent_posts > 3 * baseline_posts) & (baseline_posts > 0)
+        )
+        
+        sessions, sessions_length = self._history_values(batch.session_durations)
+        recent_sessions, earlier_sessions = self._split_sums(sessions, sessions_length, 3)
+        has_sessions_baseline = sessions_length >= 5
+        baseline_sessions = np.zeros(batch.size)
+        np.divide(
+            earlier_sessions,
+            sessions_length - 3,
+            out=baseline_sessions,
+            where=has_sessions_baseline
+        )
+        recent_sessions /= 3
+        extended = (recent_sessions > 2 * baseline_sessions) & (recent_sessions > 60)
+        anomaly_flags[:, 4] = has_sessions_baseline & extended
+        anomaly_flags[:, 5] = (
+            has_sessions_baseline & ~extended & (recent_sessions < 0.3 * baseline_sessions)
+        )
+        
+        logger.info(
+            "Behavior batch analysis completed",
+            batch_size=batch.size,
+            anomaly_count=int(anomaly_flags.sum())
+        )
+        
+        return {
+            'user_ids': batch.user_ids,
+            'activity_score': np.round(activity_score, 3),
+            'rhythm_changes': {
+                'late_night_ratio': np.round(late_night_ratio, 3),
+                'weekend_ratio': np.round(weekend_ratio, 3),
+                'consistency_score': np.round(consistency_score, 3),
+            },
+            'engagement_slope': engagement_slope,
+            'engagement_trend': engagement_trend,
+            'anomaly_flags': anomaly_flags,
+        }
+    
+    @staticmethod
+    def _history_values(history: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Split a NaN right-padded history into zero-filled values and lengths."""
+        present = ~np.isnan(history)
+        return np.where(present, history, 0.0), present.sum(axis=1)
+    
+    @staticmethod
+    def _split_sums(
+        values: np.ndarray,
+        lengths: np.ndarray,
+        count: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum the last ``count`` reported entries of each row and the ones before them."""
+        positions = np.arange(values.shape[1])
+        split = (lengths - count)[:, None]
+        tail = (positions >= split) & (positions < lengths[:, None])
+        head = positions < split
+        return (
+            np.where(tail, values, 0.0).sum(axis=1),
+            np.where(head, values, 0.0).sum(axis=1)
+        )
+    
     def _calculate_activity_score(self, activity_data: Dict[str, Any]) -> float:
         """Calculate overall activity score based on user engagement."""
         
@@ -277,7 +700,7 @@ s or wellbeing concerns."""
                 'avg_session_duration': 45
             }
             
-            test_result = await self.analyze("test-user-id", test_data, 7)
+            test_result = await self.analyze(HEALTH_CHECK_USER_ID, test_data, 7)
             return (
                 self.analyzer_ready and
                 'activity_score' in test_result and
@@ -311,5 +734,8 @@ s or wellbeing concerns."""
                 'session_duration_changes'
             ],
             'privacy_preserving': True,
-            'time_windows': [1, 7, 14, 30]
+            'time_windows': list(WINDOWS),
+            'incremental_event_types': list(EVENT_TYPES),
+            'tracked_users': len(self.state_store),
+            'state_memory': self.state_store.memory_stats()
         }
\ No newline at end of file
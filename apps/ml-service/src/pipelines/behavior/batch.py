@@ -0,0 +1,153 @@
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+# Scalar activity metrics, in the order used for columnar storage
+ACTIVITY_COUNT_FIELDS = [
+    'posts_count',
+    'comments_count',
+    'reactions_count',
+    'messages_count',
+    'login_frequency',
+    'avg_session_duration'
+]
+
+# Per-day histories stored as right-padded matrices
+HISTORY_FIELDS = ['recent_activity', 'daily_posts', 'session_durations']
+
+# Column order of the anomaly flag matrix returned by analyze_many
+ANOMALY_FLAGS = [
+    'sudden_activity_drop',
+    'excessive_late_night_activity',
+    'low_social_interaction',
+    'posting_frequency_spike',
+    'extended_session_duration',
+    'shortened_session_duration'
+]
+
+
+class ActivityBatch:
+    """
+    Columnar activity data for many users, laid out for vectorized analysis.
+
+    Attributes:
+        counts: Mapping of each ``ACTIVITY_COUNT_FIELDS`` name to an (N,) array
+        hourly_activity: (N, 24) activity per hour of day, 0 where absent
+        daily_activity: (N, 7) activity per weekday (0 = Monday), NaN where a
+            day was not reported
+        recent_activity: (N, T) daily activity history, right-padded with NaN
+        daily_posts: (N, T) daily post counts, right-padded with NaN
+        session_durations: (N, T) session durations, right-padded with NaN
+        user_ids: Optional list of N user identifiers
+    """
+
+    def __init__(
+        self,
+        counts: Dict[str, np.ndarray],
+        hourly_activity: np.ndarray,
+        daily_activity: np.ndarray,
+        recent_activity: np.ndarray,
+        daily_posts: np.ndarray,
+        session_durations: np.ndarray,
+        user_ids: Optional[List[str]] = None
+    ):
+        self.size = len(hourly_activity)
+        self.counts = {
+            field: np.asarray(counts.get(field, np.zeros(self.size)), dtype=np.float64)
+            for field in ACTIVITY_COUNT_FIELDS
+        }
+        self.hourly_activity = np.asarray(hourly_activity, dtype=np.float64)
+        self.daily_activity = np.asarray(daily_activity, dtype=np.float64)
+        self.recent_activity = np.asarray(recent_activity, dtype=np.float64)
+        self.daily_posts = np.asarray(daily_posts, dtype=np.float64)
+        self.session_durations = np.asarray(session_durations, dtype=np.float64)
+        self.user_ids = user_ids
+
+        if self.hourly_activity.shape != (self.size, 24):
+            raise ValueError("hourly_activity must have shape (N, 24)")
+        if self.daily_activity.shape != (self.size, 7):
+            raise ValueError("daily_activity must have shape (N, 7)")
+        for field in HISTORY_FIELDS:
+            values = getattr(self, field)
+            if values.ndim != 2 or len(values) != self.size:
+                raise ValueError(f"{field} must have shape (N, T)")
+        for field, values in self.counts.items():
+            if values.shape != (self.size,):
+                raise ValueError(f"{field} must have shape (N,)")
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[Dict[str, Any]],
+        user_ids: Optional[List[str]] = None
+    ) -> "ActivityBatch":
+        """
+        Build a columnar batch from per-user ``activity_data`` dictionaries.
+
+        Args:
+            records: Activity dictionaries in the format accepted by
+                ``BehaviorAnalyzer.analyze``
+            user_ids: Optional identifiers aligned with ``records``
+
+        Returns:
+            Columnar activity batch
+        """
+        size = len(records)
+        counts = {
+            field: np.array([record.get(field, 0) for record in records], dtype=np.float64)
+            for field in ACTIVITY_COUNT_FIELDS
+        }
+
+        hourly_activity = np.zeros((size, 24))
+        daily_activity = np.full((size, 7), np.nan)
+        for row, record in enumerate(records):
+            for hour, value in record.get('hourly_activity', {}).items():
+                hourly_activity[row, int(hour)] = value
+            for day, value in record.get('daily_activity', {}).items():
+                daily_activity[row, int(day)] = value
+
+        histories = {
+            field: _pad_histories([record.get(field, []) for record in records])
+            for field in HISTORY_FIELDS
+        }
+
+        return cls(
+            counts=counts,
+            hourly_activity=hourly_activity,
+            daily_activity=daily_activity,
+            user_ids=user_ids,
+            **histories
+        )
+
+
+def results_to_records(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convert columnar ``analyze_many`` output into per-user result dictionaries.
+
+    Args:
+        results: Output of ``BehaviorAnalyzer.analyze_many``
+
+    Returns:
+        One dictionary per user in the same format as ``BehaviorAnalyzer.analyze``
+    """
+    rhythm_changes = results['rhythm_changes']
+    flag_names = np.array(ANOMALY_FLAGS)
+    return [
+        {
+            'activity_score': float(results['activity_score'][row]),
+            'rhythm_changes': {
+                name: float(values[row]) for name, values in rhythm_changes.items()
+            },
+            'engagement_trend': str(results['engagement_trend'][row]),
+            'anomaly_flags': flag_names[results['anomaly_flags'][row]].tolist(),
+        }
+        for row in range(len(results['activity_score']))
+    ]
+
+
+def _pad_histories(histories: List[List[float]]) -> np.ndarray:
+    """Stack ragged histories into a NaN right-padded matrix."""
+    width = max((len(history) for history in histories), default=0)
+    padded = np.full((len(histories), width), np.nan)
+    for row, history in enumerate(histories):
+        padded[row, :len(history)] = history
+    return padded
@@ -0,0 +1,451 @@
+import json
+import os
+import shutil
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from utils.versioned_dir import publish_directory
+
+# Rolling windows maintained incrementally, in days (see get_feature_info)
+WINDOWS = (1, 7, 14, 30)
+RETENTION_DAYS = WINDOWS[-1]
+
+# Interaction events and the daily counter each one increments
+EVENT_COUNTERS = {
+    'post': 'posts_count',
+    'comment': 'comments_count',
+    'reaction': 'reactions_count',
+    'message': 'messages_count',
+    'login': 'login_frequency',
+}
+EVENT_TYPES = tuple(EVENT_COUNTERS) + ('session_end',)
+
+# Per-day counter layout: event counters, then activity per hour of day.
+# Window rows append activity per weekday; a day's weekday follows from its
+# ordinal, so day rows do not store it.
+COUNTER_COLUMNS = list(EVENT_COUNTERS.values()) + ['session_count', 'activity']
+COLUMN_INDEX = {name: index for index, name in enumerate(COUNTER_COLUMNS)}
+HOUR_OFFSET = len(COUNTER_COLUMNS)
+DAY_COLUMNS = HOUR_OFFSET + 24
+WEEKDAY_OFFSET = DAY_COLUMNS
+WINDOW_COLUMNS = WEEKDAY_OFFSET + 7
+
+ACTIVITY = COLUMN_INDEX['activity']
+SESSION_COUNT = COLUMN_INDEX['session_count']
+
+# Daily counters are uint16; events beyond this many per user per day are dropped
+MAX_DAY_COUNT = np.iinfo(np.uint16).max
+
+# Precomputed increments for an interaction event, by counter, hour and
+# weekday, so recording one is a single row addition per array
+_INTERACTION_DELTAS = np.zeros((len(EVENT_COUNTERS), 24, 7, WINDOW_COLUMNS), dtype=np.uint32)
+for _counter, _name in enumerate(EVENT_COUNTERS.values()):
+    _INTERACTION_DELTAS[_counter, :, :, COLUMN_INDEX[_name]] = 1
+_INTERACTION_DELTAS[..., ACTIVITY] = 1
+for _hour in range(24):
+    _INTERACTION_DELTAS[:, _hour, :, HOUR_OFFSET + _hour] = 1
+for _weekday in range(7):
+    _INTERACTION_DELTAS[:, :, _weekday, WEEKDAY_OFFSET + _weekday] = 1
+_DAY_DELTAS = _INTERACTION_DELTAS[:, :, 0, :DAY_COLUMNS].astype(np.uint16)
+_COUNTER_INDEX = {event_type: index for index, event_type in enumerate(EVENT_COUNTERS)}
+
+# Number of most recent days/sessions compared against the baseline
+RECENT_COUNT = 3
+
+# Per-user arrays: trailing shape, dtype and initial value of each row
+STATE_LAYOUT = {
+    'day_counts': ((RETENTION_DAYS, DAY_COLUMNS), np.uint16, 0),
+    'day_minutes': ((RETENTION_DAYS,), np.float64, 0),
+    'slot_day': ((RETENTION_DAYS,), np.int32, -1),
+    'window_counts': ((len(WINDOWS), WINDOW_COLUMNS), np.uint32, 0),
+    'window_minutes': ((len(WINDOWS),), np.float64, 0),
+    # Sum of squared daily activity and of activity weighted by day index
+    'window_moments': ((len(WINDOWS), 2), np.float64, 0),
+    'first_day': ((), np.int32, 0),
+    'current_day': ((), np.int32, 0),
+    'recent_sessions': ((RECENT_COUNT,), np.float64, 0),
+    'recent_count': ((), np.uint8, 0),
+    # Welford count, mean and M2 of sessions older than the recent ones
+    'baseline': ((3,), np.float64, 0),
+}
+
+SNAPSHOT_VERSION = 1
+
+
+def validate_event(event_type: str, duration_minutes: Optional[float] = None) -> None:
+    """
+    Validate an activity event before it touches any state.
+
+    Raises:
+        ValueError: If the event type is unknown or a session has no valid duration
+    """
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {event_type}")
+    if event_type == 'session_end' and (duration_minutes is None or duration_minutes < 0):
+        raise ValueError("session_end events require a non-negative duration_minutes")
+
+
+class BehaviorStateStore:
+    """
+    Rolling behavior aggregates for every user, updated one event at a time.
+
+    Users are interned to a row index, and all state lives in a handful of
+    contiguous NumPy arrays (see ``STATE_LAYOUT``) instead of per-user
+    objects, so a user costs a few kilobytes of fixed-width numbers. For each
+    user a ring buffer keeps one row of counters per day for the last
+    ``RETENTION_DAYS`` days, and running column sums are kept for every
+    window in ``WINDOWS`` together with the power sums of daily activity the
+    consistency and engagement statistics need. Expiring a day is a row
+    subtraction and reading any window costs O(1) regardless of how much
+    history has been ingested. Session durations keep the last few sessions
+    plus a Welford running mean/variance of older sessions.
+
+    The arrays can be snapshotted to ``.npy`` files and memory-mapped back,
+    so a restarted service resumes without replaying events.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._index: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        self.capacity = 0
+        for name, (shape, dtype, fill) in STATE_LAYOUT.items():
+            setattr(self, name, np.full((0,) + shape, fill, dtype=dtype))
+        self._grow(max(capacity, 1))
+
+    def record(
+        self,
+        user_id: str,
+        event_type: str,
+        timestamp: datetime,
+        duration_minutes: Optional[float] = None
+    ) -> bool:
+        """
+        Fold one event into the user's aggregates, creating them on first use.
+
+        Args:
+            user_id: User identifier
+            event_type: One of ``EVENT_TYPES``
+            timestamp: When the event happened, in the user's local time
+            duration_minutes: Session length, required for ``session_end``
+
+        Returns:
+            False if the event is older than the retained history (or exceeds
+            the daily counter range) and was dropped
+
+        Raises:
+            ValueError: If the event type is unknown or a session has no duration
+        """
+        validate_event(event_type, duration_minutes)
+        row = self._intern(user_id)
+
+        day = timestamp.toordinal()
+        current = int(self.current_day[row])
+        if current == 0:
+            self.first_day[row] = self.current_day[row] = current = day
+            self._reset_slot(row, day)
+        elif day > current:
+            self._advance(row, day)
+            current = day
+        elif day <= current - RETENTION_DAYS:
+            return False
+
+        first = int(self.first_day[row])
+        if day < first:
+            # Late event before the first tracked day: move the regression origin
+            self.window_moments[row, :, 1] += (first - day) * self.window_counts[row, :, ACTIVITY]
+            self.first_day[row] = first = day
+
+        slot = day % RETENTION_DAYS
+        if self.slot_day[row, slot] != day:
+            self._reset_slot(row, day)
+
+        counts = self.day_counts[row, slot]
+        # Windows are sorted, so the ones still covering ``day`` form a suffix
+        covering = bisect_right(WINDOWS, current - day)
+
+        if event_type == 'session_end':
+            if counts[SESSION_COUNT] == MAX_DAY_COUNT:
+                return False
+            counts[SESSION_COUNT] += 1
+            self.day_minutes[row, slot] += duration_minutes
+            self.window_counts[row, covering:, SESSION_COUNT] += 1
+            self.window_minutes[row, covering:] += duration_minutes
+            self._record_session(row, float(duration_minutes))
+        else:
+            activity = int(counts[ACTIVITY])
+            if activity == MAX_DAY_COUNT:
+                return False
+            counter = _COUNTER_INDEX[event_type]
+            counts += _DAY_DELTAS[counter, timestamp.hour]
+            self.window_counts[row, covering:] += _INTERACTION_DELTAS[counter, timestamp.hour, timestamp.weekday()]
+            moments = self.window_moments[row, covering:]
+            moments[:, 0] += 2 * activity + 1  # (a + 1)^2 - a^2
+            moments[:, 1] += day - first
+
+        return True
+
+    def window_stats(
+        self,
+        user_id: str,
+        time_window_days: int,
+        as_of: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Read a user's aggregates for the smallest tracked window covering ``time_window_days``.
+
+        Args:
+            user_id: User identifier
+            time_window_days: Requested window (1-30 days)
+            as_of: Day ordinal to evaluate at; the state is advanced to it if later
+
+        Returns:
+            Window totals and the derived statistics used by behavior analysis
+
+        Raises:
+            KeyError: If no events were recorded for the user
+        """
+        row = self._index[user_id]
+        if as_of is not None and as_of > self.current_day[row]:
+            self._advance(row, as_of)
+
+        index = next(i for i, window in enumerate(WINDOWS) if window >= time_window_days)
+        window = WINDOWS[index]
+        sums = self.window_counts[row, index].astype(np.float64)
+        squared_sum, weighted_sum = (float(value) for value in self.window_moments[row, index])
+        current = int(self.current_day[row])
+        first = int(self.first_day[row])
+        days = min(window, current - first + 1)
+
+        activity_sum = float(sums[ACTIVITY])
+        activity_mean = activity_sum / days
+        activity_variance = max(squared_sum / days - activity_mean ** 2, 0.0)
+
+        # Least-squares slope of daily activity over the window's days
+        slope = 0.0
+        if days >= 3:
+            start = current - days + 1 - first
+            centered_xy = weighted_sum - start * activity_sum
+            x_sum = days * (days - 1) / 2
+            slope = (days * centered_xy - x_sum * activity_sum) / (days * days * (days * days - 1) / 12)
+
+        recent_days = [current - offset for offset in range(min(RECENT_COUNT, days))]
+        recent_rows = [self.day_counts[row, day % RETENTION_DAYS] for day in recent_days
+                       if self.slot_day[row, day % RETENTION_DAYS] == day]
+        recent_activity = sum(float(counts[ACTIVITY]) for counts in recent_rows)
+        recent_posts = sum(float(counts[COLUMN_INDEX['posts_count']]) for counts in recent_rows)
+
+        session_count = float(sums[SESSION_COUNT])
+        baseline_sessions, baseline_mean, baseline_m2 = (float(value) for value in self.baseline[row])
+        return {
+            'window_days': window,
+            'days': days,
+            'counts': {
+                **{name: float(sums[COLUMN_INDEX[name]]) for name in EVENT_COUNTERS.values()},
+                'avg_session_duration': (
+                    max(float(self.window_minutes[row, index]), 0.0) / session_count
+                    if session_count else 0.0
+                ),
+            },
+            'hourly_activity': sums[HOUR_OFFSET:DAY_COLUMNS],
+            'weekday_activity': sums[WEEKDAY_OFFSET:WINDOW_COLUMNS],
+            'activity_mean': activity_mean,
+            'activity_std': activity_variance ** 0.5,
+            'engagement_slope': slope,
+            'recent_activity_mean': recent_activity / len(recent_days),
+            'recent_posts': recent_posts,
+            'posts_sum': float(sums[COLUMN_INDEX['posts_count']]),
+            'recent_sessions': self.recent_sessions[row, :self.recent_count[row]].tolist(),
+            'baseline_sessions': int(baseline_sessions),
+            'baseline_session_mean': baseline_mean,
+            'baseline_session_std': (
+                (baseline_m2 / baseline_sessions) ** 0.5 if baseline_sessions else 0.0
+            ),
+        }
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Report memory used by the store, for sizing deployments.
+
+        Returns:
+            Tracked users, allocated rows, fixed state bytes per user, bytes
+            held by the user ID table, and total bytes per tracked user
+        """
+        state_bytes_per_user = sum(
+            np.dtype(dtype).itemsize * int(np.prod(shape))
+            for shape, dtype, _ in STATE_LAYOUT.values()
+        )
+        allocated_bytes = state_bytes_per_user * self.capacity
+        index_bytes = (
+            sys.getsizeof(self._index) + sys.getsizeof(self._user_ids)
+            + sum(sys.getsizeof(user_id) for user_id in self._user_ids)
+        )
+        users = len(self._user_ids)
+        return {
+            'users': users,
+            'capacity': self.capacity,
+            'state_bytes_per_user': state_bytes_per_user,
+            'allocated_state_bytes': allocated_bytes,
+            'index_bytes': index_bytes,
+            'bytes_per_user': round((allocated_bytes + index_bytes) / users, 1) if users else 0.0,
+        }
+
+    def export(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Copy the user ID table and the used rows of every state array."""
+        users = len(self._user_ids)
+        return list(self._user_ids), {
+            name: getattr(self, name)[:users].copy() for name in STATE_LAYOUT
+        }
+
+    def save_snapshot(self, directory: str) -> None:
+        """Write the store to ``directory`` (see ``write_snapshot``)."""
+        write_snapshot(directory, *self.export())
+
+    @classmethod
+    def load_snapshot(cls, directory: str) -> 'BehaviorStateStore':
+        """
+        Load a snapshot written by ``write_snapshot``.
+
+        State arrays are memory-mapped copy-on-write, so loading costs the
+        user ID table only; pages are read from disk as users are touched.
+
+        Raises:
+            FileNotFoundError: If there is no snapshot in ``directory``
+            ValueError: If the snapshot was written with a different layout
+        """
+        if not os.path.exists(directory) and os.path.isdir(directory + '.old'):
+            # Left by a crash mid-swap before snapshots were versioned
+            directory = directory + '.old'
+        # Resolve the symlink once so every file comes from one version
+        directory = os.path.realpath(directory)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta != _snapshot_meta(meta.get('users', 0)):
+            raise ValueError("Behavior state snapshot layout does not match this version")
+
+        store = cls(capacity=1)
+        user_ids = np.load(os.path.join(directory, 'user_ids.npy')).tolist()
+        for name in STATE_LAYOUT:
+            setattr(store, name, np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='c'))
+        store._user_ids = user_ids
+        store._index = {user_id: row for row, user_id in enumerate(user_ids)}
+        store.capacity = len(user_ids)
+        return store
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def _intern(self, user_id: str) -> int:
+        row = self._index.get(user_id)
+        if row is None:
+            row = len(self._user_ids)
+            if row == self.capacity:
+                self._grow(max(2 * self.capacity, 1))
+            self._index[user_id] = row
+            self._user_ids.append(user_id)
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        for name, (shape, dtype, fill) in STATE_LAYOUT.items():
+            grown = np.full((capacity,) + shape, fill, dtype=dtype)
+            grown[:self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def _advance(self, row: int, day: int) -> None:
+        """Move a user's current day forward, expiring days that leave each window."""
+        current = int(self.current_day[row])
+
+        if day - current >= RETENTION_DAYS:
+            # Every retained day has expired
+            self.day_counts[row] = 0
+            self.day_minutes[row] = 0.0
+            self.slot_day[row] = -1
+            self.window_counts[row] = 0
+            self.window_minutes[row] = 0.0
+            self.window_moments[row] = 0.0
+        else:
+            first = int(self.first_day[row])
+            for new_day in range(current + 1, day + 1):
+                for index, window in enumerate(WINDOWS):
+                    leaving = new_day - window
+                    slot = leaving % RETENTION_DAYS
+                    if self.slot_day[row, slot] == leaving:
+                        counts = self.day_counts[row, slot]
+                        activity = float(counts[ACTIVITY])
+                        sums = self.window_counts[row, index]
+                        sums[:DAY_COLUMNS] -= counts
+                        # Ordinal 1 (0001-01-01) was a Monday
+                        sums[WEEKDAY_OFFSET + (leaving - 1) % 7] -= counts[ACTIVITY]
+                        self.window_minutes[row, index] -= self.day_minutes[row, slot]
+                        self.window_moments[row, index, 0] -= activity * activity
+                        self.window_moments[row, index, 1] -= (leaving - first) * activity
+                self._reset_slot(row, new_day)
+
+        self.current_day[row] = day
+        self._reset_slot(row, day)
+
+    def _record_session(self, row: int, duration: float) -> None:
+        recent = self.recent_sessions[row]
+        count = int(self.recent_count[row])
+        if count < RECENT_COUNT:
+            recent[count] = duration
+            self.recent_count[row] = count + 1
+            return
+
+        # The oldest recent session joins the baseline (Welford update)
+        older = float(recent[0])
+        baseline = self.baseline[row]
+        baseline[0] += 1
+        delta = older - baseline[1]
+        baseline[1] += delta / baseline[0]
+        baseline[2] += delta * (older - baseline[1])
+        recent[:-1] = recent[1:]
+        recent[-1] = duration
+
+    def _reset_slot(self, row: int, day: int) -> None:
+        slot = day % RETENTION_DAYS
+        self.day_counts[row, slot] = 0
+        self.day_minutes[row, slot] = 0.0
+        self.slot_day[row, slot] = day
+
+
+def write_snapshot(directory: str, user_ids: List[str], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Atomically replace the snapshot in ``directory``.
+
+    Files are written to a fresh version directory and ``directory`` is a
+    symlink switched to it in one step (see ``publish_directory``), so a
+    crash at any point leaves a complete snapshot at ``directory``.
+
+    Args:
+        directory: Snapshot directory
+        user_ids: Interned user IDs, in row order
+        arrays: Used rows of every array in ``STATE_LAYOUT`` (see ``BehaviorStateStore.export``)
+    """
+    def write(version_dir: str) -> None:
+        np.save(os.path.join(version_dir, 'user_ids.npy'), np.array(user_ids, dtype=str))
+        for name in STATE_LAYOUT:
+            np.save(os.path.join(version_dir, f'{name}.npy'), arrays[name])
+        with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+            json.dump(_snapshot_meta(len(user_ids)), f)
+
+    publish_directory(directory, write)
+    # Leftovers of the rename-based swap used before versioned snapshots
+    for leftover in (directory + '.tmp', directory + '.old'):
+        shutil.rmtree(leftover, ignore_errors=True)
+
+
+def _snapshot_meta(users: int) -> Dict[str, Any]:
+    return {
+        'version': SNAPSHOT_VERSION,
+        'users': users,
+        'windows': list(WINDOWS),
+        'layout': {
+            name: [list(shape), np.dtype(dtype).str] for name, (shape, dtype, _) in STATE_LAYOUT.items()
+        },
+    }
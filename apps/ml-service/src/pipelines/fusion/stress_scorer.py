@@ -1,8 +1,10 @@
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-from datetime import datetime
 from utils.logging import get_logger
+from utils.health import HEALTH_CHECK_USER_ID
+from utils.metrics import StageTimer
+from utils.executor import AnalysisExecutor
 from utils.validation import validate_user_id, sanitize_output
 from config import settings
 
@@ -14,9 +16,11 @@ class StressScorer:
     Uses transparent, interpretable models with clear contributing factors.
     """
     
-    def __init__(self):
+    def __init__(self, executor: Optional[AnalysisExecutor] = None):
         self.model_ready = True
+        self.executor = executor if executor is not None else AnalysisExecutor(mode='inline')
         self.feature_weights = self._initialize_feature_weights()
+        self._build_weight_vector()
         self.thresholds = {
             'low': settings.stress_threshold_medium,
             'medium': settings.stress_threshold_high,
@@ -43,11 +47,20 @@ class StressScorer:
             'engagement_decline': 0.05
         }
     
+    def _build_weight_vector(self) -> None:
+        """Lay feature weights out in the fixed column order used for bulk scoring."""
+        self.feature_columns = list(self.feature_weights)
+        self.weight_vector = np.array(
+            [self.feature_weights[name] for name in self.feature_columns],
+            dtype=np.float64
+        )
+    
     async def calculate_score(
         self,
         user_id: str,
         text_features: Optional[Dict[str, float]] = None,
-        behavior_features: Optional[Dict[str, float]] = None
+        behavior_features: Optional[Dict[str, float]] = None,
+        validated: bool = False
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive stress score from available features.
@@ -56,58 +69,33 @@ class StressScorer:
             user_id: User identifier (for privacy-safe logging)
             text_features: Text analysis features
             behavior_features: Behavioral analysis features
+            validated: Whether the caller already validated the user ID
             
         Returns:
             Stress scoring results with interpretability
         """
-        start_time = datetime.now()
+        timer = StageTimer('stress')
         
         try:
             # Validate inputs
-            validate_user_id(user_id)
+            if not validated:
+                validate_user_id(user_id)
             
             if not text_features and not behavior_features:
                 raise ValueError("At least one feature set must be provided")
+            timer.mark('validate')
             
-            # Extract and normalize features
-            normalized_features = self._extract_and_normalize_features(
-                text_features or {}, 
-                behavior_features or {}
-            )
-            
-            # Calculate weighted stress score
-            stress_score = self._calculate_weighted_score(normalized_features)
-            
-            # Calculate confidence based on available features
-            confidence = self._calculate_confidence(text_features, behavior_features)
-            
-            # Identify contributing factors
-            contributing_factors = self._identify_contributing_factors(
-                normalized_features, stress_score
-            )
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                stress_score, contributing_factors
+            results = await self.executor.run(
+                'stress_scorer', self._score_features, text_features, behavior_features
             )
             
-            results = {
-                'stress_score': round(stress_score, 3),
-                'confidence': round(confidence, 3),
-                'contributing_factors': contributing_factors,
-                'recommendations': recommendations,
-            }
-            
-            # Sanitize output
-            results = sanitize_output(results)
-            
             # Log scoring (privacy-safe)
             logger.info(
                 "Stress score calculated",
                 user_id=user_id[:8] + "..." if user_id else None,
-                stress_score=stress_score,
-                confidence=confidence,
-                factors_count=len(contributing_factors)
+                stress_score=results['stress_score'],
+                confidence=results['confidence'],
+                factors_count=len(results['contributing_factors'])
             )
             
             return results
@@ -116,6 +104,54 @@ class StressScorer:
             logger.error(f"Stress scoring failed: {e}", user_id=user_id)
             raise
     
+    def _score_features(
+        self,
+        text_features: Optional[Dict[str, Any]],
+        behavior_features: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Run every scoring stage on already validated features."""
+        timer = StageTimer('stress')
+        
+        # Extract and normalize features
+        normalized_features = self._extract_and_normalize_features(
+            text_features or {}, 
+            behavior_features or {}
+        )
+        timer.mark('features')
+        
+        # Calculate weighted stress score
+        stress_score = self._calculate_weighted_score(normalized_features)
+        timer.mark('score')
+        
+        # Calculate confidence based on available features
+        confidence = self._calculate_confidence(text_features, behavior_features)
+        timer.mark('confidence')
+        
+        # Identify contributing factors
+        contributing_factors = self._identify_contributing_factors(
+            normalized_features, stress_score
+        )
+        timer.mark('factors')
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            stress_score, contributing_factors
+        )
+        timer.mark('recommendations')
+        
+        results = {
+            'stress_score': round(stress_score, 3),
+            'confidence': round(confidence, 3),
+            'contributing_factors': contributing_factors,
+            'recommendations': recommendations,
+        }
+        
+        # Sanitize output
+        results = sanitize_output(results)
+        timer.mark('sanitize')
+        
+        return results
+    
     def _extract_and_normalize_features(
         self, 
         text_features: Dict[str, float], 
@@ -194,6 +230,146 @@ class StressScorer:
         
         return min(max(stress_score, 0.0), 1.0)
     
+    def build_feature_matrix(
+        self,
+        text_features_list: List[Optional[Dict[str, Any]]],
+        behavior_features_list: List[Optional[Dict[str, Any]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalize per-user feature sets into a matrix for bulk scoring.
+        
+        Args:
+            text_features_list: Text analysis features per user (or None)
+            behavior_features_list: Behavioral analysis features per user (or None)
+            
+        Returns:
+            (N, F) feature matrix in ``feature_columns`` order with NaN for
+            features that are not available, and (N,) confidence values
+        """
+        features = np.full(
+            (len(text_features_list), len(self.feature_columns)), np.nan
+        )
+        confidence = np.zeros(len(text_features_list))
+        columns = {name: index for index, name in enumerate(self.feature_columns)}
+        
+        for row, (text_features, behavior_features) in enumerate(
+            zip(text_features_list, behavior_features_list)
+        ):
+            normalized = self._extract_and_normalize_features(
+                text_features or {},
+                behavior_features or {}
+            )
+            for name, value in normalized.items():
+                features[row, columns[name]] = value
+            confidence[row] = self._calculate_confidence(text_features, behavior_features)
+        
+        return features, confidence
+    
+    def score_many(
+        self,
+        features: np.ndarray,
+        confidence: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Score a matrix of normalized features for many users at once.
+        
+        Each row is scored with one masked dot product, normalizing only by the
+        weights of the features present in that row, exactly as
+        ``_calculate_weighted_score`` does for a single user.
+        
+        Args:
+            features: (N, F) matrix in ``feature_columns`` order, NaN where a
+                feature is not available
+            confidence: Optional (N,) confidence values to pass through
+            
+        Returns:
+            Columnar results with full-precision (N,) ``stress_score`` and (N, 5)
+            ``factor_columns`` / ``factor_values`` holding the top contributing
+            feature indices and their values, padded with -1 / NaN
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != len(self.feature_columns):
+            raise ValueError(
+                f"Features must have shape (N, {len(self.feature_columns)})"
+            )
+        
+        present = ~np.isnan(features)
+        values = np.where(present, features, 0.0)
+        
+        # Weighted score normalized by the weights of present features
+        weighted_sum = values @ self.weight_vector
+        total_weight = present @ self.weight_vector
+        raw_score = np.zeros(len(features))
+        np.divide(weighted_sum, total_weight, out=raw_score, where=total_weight > 0)
+        
+        # Apply sigmoid function for smooth scaling
+        stress_score = np.clip(1 / (1 + np.exp(-5 * (raw_score - 0.5))), 0.0, 1.0)
+        
+        # Top contributing factors, ranked by weighted contribution
+        contributions = values * self.weight_vector
+        eligible = present & (values > 0.1) & (contributions > 0.05)
+        ranked = np.where(eligible, contributions, -np.inf)
+        top_count = min(5, ranked.shape[1])
+        top = np.argpartition(-ranked, top_count - 1, axis=1)[:, :top_count]
+        top_ranked = np.take_along_axis(ranked, top, axis=1)
+        # Order the top factors by contribution, breaking ties by column order
+        order = np.lexsort((top, -top_ranked), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_eligible = np.isfinite(np.take_along_axis(top_ranked, order, axis=1))
+        factor_columns = np.where(top_eligible, top, -1)
+        factor_values = np.where(
+            top_eligible, np.take_along_axis(values, top, axis=1), np.nan
+        )
+        
+        results = {
+            'stress_score': stress_score,
+            'factor_columns': factor_columns,
+            'factor_values': factor_values,
+        }
+        if confidence is not None:
+            results['confidence'] = np.round(np.asarray(confidence, dtype=np.float64), 3)
+        
+        logger.info(
+            "Stress batch scoring completed",
+            batch_size=len(features),
+            high_stress_count=int((stress_score > self.thresholds['medium']).sum())
+        )
+        
+        return results
+    
+    def to_records(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Convert columnar ``score_many`` output into per-user result dictionaries.
+        
+        Args:
+            results: Output of ``score_many``
+            
+        Returns:
+            One dictionary per user in the same format as ``calculate_score``
+        """
+        records = []
+        for row, stress_score in enumerate(results['stress_score'].tolist()):
+            # Recommendations use the unrounded score, as in calculate_score
+            contributing_factors = [
+                self._get_factor_description(self.feature_columns[column], value)
+                for column, value in zip(
+                    results['factor_columns'][row].tolist(),
+                    results['factor_values'][row].tolist()
+                )
+                if column >= 0
+            ]
+            record = {
+                'stress_score': round(stress_score, 3),
+                'contributing_factors': contributing_factors,
+                'recommendations': self._generate_recommendations(
+                    stress_score, contributing_factors
+                ),
+            }
+            if 'confidence' in results:
+                record['confidence'] = float(results['confidence'][row])
+            records.append(record)
+        return records
+    
     def _calculate_confidence(
         self, 
         text_features: Optional[Dict], 
@@ -357,7 +533,7 @@ class StressScorer:
             }
             
             test_result = await self.calculate_score(
-                "test-user-id", 
+                HEALTH_CHECK_USER_ID, 
                 test_text_features, 
                 test_behavior_features
             )
@@ -380,6 +556,15 @@ class StressScorer:
         """Get current feature weights for transparency."""
         return self.feature_weights.copy()
     
+    def set_feature_weights(self, weights: Dict[str, float]) -> None:
+        """Update feature weights, keeping the bulk scoring column order in sync."""
+        unknown = set(weights) - set(self.feature_weights)
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+        
+        self.feature_weights.update(weights)
+        self._build_weight_vector()
+    
     def get_thresholds(self) -> Dict[str, float]:
         """Get stress level thresholds."""
         return self.thresholds.copy()
\ No newline at end of file
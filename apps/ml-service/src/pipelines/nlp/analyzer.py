@@ -1,9 +1,14 @@
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-from datetime import datetime
+from fastapi import HTTPException
 from utils.logging import get_logger
 from utils.validation import validate_text_input, sanitize_output
+from utils.cache import AnalysisCache, create_analysis_cache
+from utils.metrics import StageTimer
+from utils.executor import AnalysisExecutor
+from pipelines.nlp.lexicon import LexiconMatcher
+from pipelines.nlp.models import ModelRegistry
 from config import settings
 
 logger = get_logger(__name__)
@@ -13,9 +18,20 @@ class TextAnalyzer:
     Privacy-preserving text analyzer for sentiment, emotion, and safety detection.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        executor: Optional[AnalysisExecutor] = None
+    ):
         self.models_loaded = False
+        self.cache = cache if cache is not None else create_analysis_cache()
+        self.executor = executor if executor is not None else AnalysisExecutor(mode='inline')
         self._load_models()
+        self.models = ModelRegistry(
+            settings.model_cache_dir,
+            lexicon_provider=lambda: self.lexicon,
+            assignments=settings.text_model_backends
+        )
     
     def _load_models(self):
         """Load or initialize text analysis models."""
@@ -54,6 +70,25 @@ class TextAnalyzer:
                 'disgusting', 'terrible person', 'kill yourself'
             }
             
+            # Emotion keywords
+            self.emotion_keywords = {
+                'joy': {'happy', 'joy', 'excited', 'cheerful', 'delighted'},
+                'sadness': {'sad', 'depressed', 'down', 'melancholy', 'gloomy'},
+                'anger': {'angry', 'mad', 'furious', 'irritated', 'annoyed'},
+                'fear': {'scared', 'afraid', 'terrified', 'anxious', 'worried'},
+                'surprise': {'surprised', 'shocked', 'amazed', 'astonished'},
+                'disgust': {'disgusted', 'revolted', 'repulsed', 'sickened'}
+            }
+            
+            # Stress phrases (matched anywhere in the text)
+            self.stress_patterns = {
+                'too much work', 'can\'t handle', 'breaking point',
+                'so tired', 'no sleep', 'deadline approaching'
+            }
+            
+            # Compile every lexicon into a single matcher
+            self.lexicon = self._compile_lexicon()
+            
             self.models_loaded = True
             logger.info("Text analysis models loaded successfully")
             
@@ -61,11 +96,26 @@ class TextAnalyzer:
             logger.error(f"Failed to load text analysis models: {e}")
             self.models_loaded = False
     
+    def _compile_lexicon(self) -> LexiconMatcher:
+        """Compile all keyword lexicons into one multi-pattern matcher."""
+        lexicon = LexiconMatcher()
+        lexicon.add_terms('positive', self.positive_words)
+        lexicon.add_terms('negative', self.negative_words)
+        for emotion, keywords in self.emotion_keywords.items():
+            lexicon.add_terms(f'emotion:{emotion}', keywords)
+        lexicon.add_terms('toxicity', self.toxic_words)
+        lexicon.add_terms('stress', self.stress_indicators)
+        lexicon.add_substrings('stress_pattern', self.stress_patterns)
+        for flag_type, keywords in self.safety_keywords.items():
+            lexicon.add_substrings(f'safety:{flag_type}', keywords)
+        return lexicon.compile()
+    
     async def analyze(
         self, 
         text: str, 
         user_id: Optional[str] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        validated: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze text for sentiment, emotion, toxicity, and stress indicators.
@@ -74,54 +124,42 @@ class TextAnalyzer:
             text: Text to analyze
             user_id: Optional user identifier (for privacy-safe logging)
             context: Optional context information
+            validated: Whether the caller already ran ``validate_text_input``
             
         Returns:
             Analysis results dictionary
         """
-        start_time = datetime.now()
+        timer = StageTimer('text')
         
         try:
-            # Validate input
-            validate_text_input(text)
-            
-            # Normalize text
-            text_lower = text.lower()
-            words = text_lower.split()
-            
-            # Analyze sentiment
-            sentiment = self._analyze_sentiment(words)
+            # Validate input unless the caller already did
+            if not validated:
+                validate_text_input(text)
+                timer.mark('validate')
             
-            # Analyze emotions
-            emotion = self._analyze_emotion(words, text_lower)
+            # Serve repeated content from the result cache
+            results = None
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(text.lower(), await self._get_cache_version())
+                results = await self.cache.get(cache_key)
+                timer.mark('cache')
             
-            # Calculate toxicity score
-            toxicity_score = self._calculate_toxicity(words)
-            
-            # Detect stress indicators
-            stress_indicators = self._detect_stress_indicators(words, text_lower)
-            
-            # Check for safety flags
-            safety_flags = self._check_safety_flags(text_lower)
-            
-            results = {
-                'sentiment': sentiment,
-                'emotion': emotion,
-                'toxicity_score': toxicity_score,
-                'stress_indicators': stress_indicators,
-                'safety_flags': safety_flags,
-            }
-            
-            # Sanitize output
-            results = sanitize_output(results)
+            cached = results is not None
+            if not cached:
+                results = await self.executor.run('text_analyzer', self._analyze_text, text)
+                if cache_key is not None:
+                    await self.cache.set(cache_key, results)
             
             # Log analysis (privacy-safe)
             logger.info(
                 "Text analysis completed",
                 user_id=user_id[:8] + "..." if user_id else None,  # Partial ID only
                 text_length=len(text),
-                toxicity_score=toxicity_score,
-                stress_indicators_count=len(stress_indicators),
-                safety_flags_count=len(safety_flags)
+                cached=cached,
+                toxicity_score=results['toxicity_score'],
+                stress_indicators_count=len(results['stress_indicators']),
+                safety_flags_count=len(results['safety_flags'])
             )
             
             return results
@@ -130,11 +168,195 @@ class TextAnalyzer:
             logger.error(f"Text analysis failed: {e}", user_id=user_id)
             raise
     
-    def _analyze_sentiment(self, words: List[str]) -> Dict[str, float]:
+    async def analyze_batch(
+        self,
+        texts: List[str],
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze many texts in one call, isolating failures per item.
+        
+        Texts are processed in chunks of ``settings.batch_size`` and control is
+        returned to the event loop between chunks.
+        
+        Args:
+            texts: Texts to analyze
+            user_id: Optional user identifier (for privacy-safe logging)
+            context: Optional context information shared by the batch
+            
+        Returns:
+            Dictionary with ``results`` aligned to ``texts`` (``None`` where an
+            item failed) and ``errors`` listing the index and reason per failure
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        errors: List[Dict[str, Any]] = []
+        cached_count = 0
+        
+        for chunk_start in range(0, len(texts), settings.batch_size):
+            chunk_end = min(chunk_start + settings.batch_size, len(texts))
+            
+            valid_indices = []
+            for index in range(chunk_start, chunk_end):
+                try:
+                    validate_text_input(texts[index])
+                    valid_indices.append(index)
+                except HTTPException as e:
+                    errors.append({'index': index, 'error': e.detail})
+            
+            # Serve repeated content from the result cache
+            cache_keys = {}
+            if self.cache is not None and valid_indices:
+                version = await self._get_cache_version()
+                cache_keys = {
+                    index: self.cache.make_key(texts[index].lower(), version)
+                    for index in valid_indices
+                }
+                cached_results = await self.cache.get_many(list(cache_keys.values()))
+                for index, cached_result in zip(valid_indices, cached_results):
+                    results[index] = cached_result
+                cached_count += sum(1 for result in cached_results if result is not None)
+            
+            pending = [index for index in valid_indices if results[index] is None]
+            outcomes = []
+            if pending:
+                outcomes = await self.executor.run(
+                    'text_analyzer', self._analyze_chunk, [texts[index] for index in pending]
+                )
+            
+            fresh_results = {}
+            for index, (result, error) in zip(pending, outcomes):
+                if error is not None:
+                    errors.append({'index': index, 'error': f"Text analysis failed: {error}"})
+                    continue
+                results[index] = result
+                if index in cache_keys:
+                    fresh_results[cache_keys[index]] = result
+            
+            if fresh_results:
+                await self.cache.set_many(fresh_results)
+            
+            # Let other requests run between chunks
+            await asyncio.sleep(0)
+        
+        errors.sort(key=lambda error: error['index'])
+        
+        # Log batch analysis (privacy-safe)
+        logger.info(
+            "Text batch analysis completed",
+            user_id=user_id[:8] + "..." if user_id else None,
+            batch_size=len(texts),
+            cached_count=cached_count,
+            failed_count=len(errors),
+            safety_flagged_count=sum(
+                1 for result in results if result and result['safety_flags']
+            )
+        )
+        
+        return {'results': results, 'errors': errors}
+    
+    def _analyze_chunk(self, texts: List[str]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """Analyze validated texts, returning a (result, error) pair per text."""
+        # The lexicon and model backends score the whole chunk at once; on
+        # failure each text is retried alone so the error is reported against it
+        texts_lower = [text.lower() for text in texts]
+        batch_hits = [None] * len(texts)
+        try:
+            batch_hits = self.lexicon.match_many(texts_lower)
+        except Exception as e:
+            logger.error(f"Chunk lexicon matching failed, retrying texts one by one: {e}", chunk_size=len(texts))
+        batch_predictions = [None] * len(texts)
+        if self.models.uses_models:
+            try:
+                batch_predictions = self._predict_models(texts_lower)
+            except Exception as e:
+                logger.error(f"Chunk model prediction failed, retrying texts one by one: {e}", chunk_size=len(texts))
+        
+        outcomes = []
+        for text, hits, predictions in zip(texts, batch_hits, batch_predictions):
+            try:
+                outcomes.append((self._analyze_text(text, predictions, hits), None))
+            except Exception as e:
+                outcomes.append((None, str(e)))
+        return outcomes
+    
+    def _analyze_text(
+        self,
+        text: str,
+        predictions: Optional[Dict[str, Any]] = None,
+        hits: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run every text analysis stage on already validated text.
+        
+        Args:
+            text: Validated text
+            predictions: Model backend outputs already computed for this text
+            hits: Lexicon matches already computed for this text
+        """
+        timer = StageTimer('text')
+        
+        # Tokenize and match every lexicon in one pass
+        text_lower = text.lower()
+        if hits is None:
+            hits = self.lexicon.match(text_lower)
+        timer.mark('tokenize')
+        
+        # Run components served by model backends; the rest use the lexicon
+        if predictions is None:
+            predictions = self._predict_models([text_lower])[0]
+        timer.mark('models')
+        
+        # Analyze sentiment
+        sentiment = predictions['sentiment'] if 'sentiment' in predictions else self._analyze_sentiment(hits)
+        timer.mark('sentiment')
+        
+        # Analyze emotions
+        emotion = predictions['emotion'] if 'emotion' in predictions else self._analyze_emotion(hits)
+        timer.mark('emotion')
+        
+        # Calculate toxicity score
+        toxicity_score = predictions['toxicity'] if 'toxicity' in predictions else self._calculate_toxicity(hits)
+        timer.mark('toxicity')
+        
+        # Detect stress indicators
+        stress_indicators = (
+            predictions['stress'] if 'stress' in predictions else self._detect_stress_indicators(hits)
+        )
+        timer.mark('stress')
+        
+        # Check for safety flags
+        safety_flags = predictions['safety'] if 'safety' in predictions else self._check_safety_flags(hits)
+        timer.mark('safety')
+        
+        results = {
+            'sentiment': sentiment,
+            'emotion': emotion,
+            'toxicity_score': toxicity_score,
+            'stress_indicators': stress_indicators,
+            'safety_flags': safety_flags,
+        }
+        
+        # Sanitize output
+        results = sanitize_output(results)
+        timer.mark('sanitize')
+        
+        return results
+    
+    def _predict_models(self, texts_lower: List[str]) -> List[Dict[str, Any]]:
+        """Predict every component assigned to a model backend, one batch call per backend."""
+        predictions: List[Dict[str, Any]] = [{} for _ in texts_lower]
+        for backend, components in self.models.model_backends().items():
+            for prediction, backend_prediction in zip(predictions, backend.predict(texts_lower)):
+                for component in components:
+                    prediction[component] = backend_prediction[component]
+        return predictions
+    
+    def _analyze_sentiment(self, hits: Dict[str, Any]) -> Dict[str, float]:
         """Analyze sentiment using keyword-based approach."""
-        positive_count = sum(1 for word in words if word in self.positive_words)
-        negative_count = sum(1 for word in words if word in self.negative_words)
-        total_words = len(words)
+        positive_count = hits['counts']['positive']
+        negative_count = hits['counts']['negative']
+        total_words = hits['token_count']
         
         if total_words == 0:
             return {'positive': 0.5, 'negative': 0.5, 'neutral': 0.0}
@@ -156,30 +378,21 @@ class TextAnalyzer:
             'neutral': round(neutral_score, 3)
         }
     
-    def _analyze_emotion(self, words: List[str], text: str) -> Dict[str, float]:
+    def _analyze_emotion(self, hits: Dict[str, Any]) -> Dict[str, float]:
         """Analyze emotions using keyword-based approach."""
-        emotions = {
-            'joy': {'happy', 'joy', 'excited', 'cheerful', 'delighted'},
-            'sadness': {'sad', 'depressed', 'down', 'melancholy', 'gloomy'},
-            'anger': {'angry', 'mad', 'furious', 'irritated', 'annoyed'},
-            'fear': {'scared', 'afraid', 'terrified', 'anxious', 'worried'},
-            'surprise': {'surprised', 'shocked', 'amazed', 'astonished'},
-            'disgust': {'disgusted', 'revolted', 'repulsed', 'sickened'}
-        }
-        
         emotion_scores = {}
-        total_words = len(words)
+        total_words = hits['token_count']
         
-        for emotion, keywords in emotions.items():
-            count = sum(1 for word in words if word in keywords)
+        for emotion in self.emotion_keywords:
+            count = hits['counts'][f'emotion:{emotion}']
             emotion_scores[emotion] = round(count / max(total_words, 1), 3)
         
         return emotion_scores
     
-    def _calculate_toxicity(self, words: List[str]) -> float:
-        """Calculate toxicity score based on harmful keywords."""
-        toxic_count = sum(1 for word in words if word in self.toxic_words)
-        total_words = len(words)
+    def _calculate_toxicity(self, hits: Dict[str, Any]) -> float:
+        """Calculate toxicity score based on harmful keywords and phrases."""
+        toxic_count = hits['counts']['toxicity']
+        total_words = hits['token_count']
         
         if total_words == 0:
             return 0.0
@@ -192,44 +405,56 @@ class TextAnalyzer:
         
         return round(float(toxicity_score), 3)
     
-    def _detect_stress_indicators(self, words: List[str], text: str) -> List[str]:
+    def _detect_stress_indicators(self, hits: Dict[str, Any]) -> List[str]:
         """Detect stress-related indicators in text."""
-        detected_indicators = []
-        
-        # Check for stress keywords
-        for word in words:
-            if word in self.stress_indicators:
-                detected_indicators.append(word)
+        # Stress keywords followed by stress patterns
+        detected_indicators = list(hits['terms']['stress'])
+        detected_indicators.extend(
+            pattern.replace(' ', '_') for pattern in hits['terms']['stress_pattern']
+        )
         
-        # Check for stress patterns
-        stress_patterns = [
-            'too much work', 'can\'t handle', 'breaking point',
-            'so tired', 'no sleep', 'deadline approaching'
-        ]
-        
-        for pattern in stress_patterns:
-            if pattern in text:
-                detected_indicators.append(pattern.replace(' ', '_'))
-        
-        return list(set(detected_indicators))  # Remove duplicates
+        return list(dict.fromkeys(detected_indicators))  # Remove duplicates
     
-    def _check_safety_flags(self, text: str) -> List[str]:
+    def _check_safety_flags(self, hits: Dict[str, Any]) -> List[str]:
         """Check for safety concerns in text."""
-        safety_flags = []
+        return [
+            flag_type for flag_type in self.safety_keywords
+            if hits['counts'][f'safety:{flag_type}']
+        ]
+    
+    async def warm_up(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run texts through the single-text and chunk analysis paths once.
         
-        for flag_type, keywords in self.safety_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    safety_flags.append(flag_type)
-                    break  # Only add flag once per type
+        Loads every model backend and starts the executor's workers without
+        touching the result cache, so the first real request is not the slow one.
         
-        return safety_flags
+        Args:
+            texts: Valid sample texts
+            
+        Returns:
+            Analysis results for ``texts``
+            
+        Raises:
+            RuntimeError: If a sample text fails analysis
+        """
+        for backend in self.models.model_backends():
+            backend.ensure_loaded()
+        
+        await self.executor.run('text_analyzer', self._analyze_text, texts[0])
+        outcomes = await self.executor.run('text_analyzer', self._analyze_chunk, texts)
+        for result, error in outcomes:
+            if error is not None:
+                raise RuntimeError(f"Text analyzer warm-up failed: {error}")
+        return [result for result, _ in outcomes]
     
     async def health_check(self) -> bool:
         """Check if the text analyzer is healthy."""
         try:
-            # Test with a simple analysis
-            test_result = await self.analyze("This is a test message")
+            # Test with a simple analysis, bypassing the result cache
+            test_text = "This is a test message"
+            validate_text_input(test_text)
+            test_result = await self.executor.run('text_analyzer', self._analyze_text, test_text)
             return (
                 self.models_loaded and 
                 'sentiment' in test_result and 
@@ -239,10 +464,16 @@ class TextAnalyzer:
             logger.error(f"Text analyzer health check failed: {e}")
             return False
     
+    async def _get_cache_version(self) -> str:
+        """Model version for result cache keys; backends not loaded yet are loaded off the event loop."""
+        if not self.models.loaded:
+            return await asyncio.to_thread(lambda: self.models.version)
+        return self.models.version
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about loaded models."""
         return {
-            'type': 'rule_based',
+            'type': 'model_backed' if self.models.uses_models else 'rule_based',
             'version': '1.0.0',
             'capabilities': [
                 'sentiment_analysis',
@@ -253,5 +484,8 @@ class TextAnalyzer:
             ],
             'languages': ['en'],
             'privacy_preserving': True,
-            'models_loaded': self.models_loaded
+            'models_loaded': self.models_loaded,
+            'lexicon_version': self.lexicon.version if self.models_loaded else None,
+            'backends': self.models.get_info(),
+            'result_cache': self.cache.get_stats() if self.cache is not None else None
         }
\ No newline at end of file
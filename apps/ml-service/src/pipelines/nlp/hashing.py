@@ -0,0 +1,139 @@
+import re
+import zlib
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Everything that is not part of a word separates words
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9']+")
+
+# Multipliers of the polynomial n-gram hashes (odd 64-bit constants)
+WORD_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+CHAR_MULTIPLIER = np.uint64(0x100000001B3)
+# Salts keeping word n-grams and char n-grams of each length apart
+WORD_SALT = 0x51ED270B
+CHAR_SALT = 0x2545F491
+
+class HashedNgramVectorizer:
+    """
+    Hashes word and character n-grams of a batch of texts into a sparse matrix.
+
+    Words are hashed once each (CRC32); word n-grams and character n-grams are
+    then rolling polynomial hashes computed with whole-batch array operations,
+    so the per-text Python work is limited to splitting words. Character
+    n-grams run over the normalized text padded with spaces, so they capture
+    word prefixes and suffixes (and misspellings) that whole words miss.
+    Hashes are stable across processes and platforms.
+    """
+
+    def __init__(
+        self,
+        buckets: int = 2 ** 18,
+        word_ngrams: int = 2,
+        char_ngrams: Optional[Tuple[int, int]] = (3, 5)
+    ):
+        self.buckets = buckets
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = tuple(char_ngrams) if char_ngrams else None
+
+    def transform(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Hash a batch of lowercased texts.
+
+        Args:
+            texts: Lowercased texts
+
+        Returns:
+            CSR arrays ``(indptr, indices, values)`` of the (len(texts),
+            buckets) feature matrix; each row holds the distinct buckets of a
+            text with L2-normalized counts
+        """
+        normalized = [NON_WORD_PATTERN.sub(' ', text).split() for text in texts]
+        hashes = []
+        rows = []
+
+        word_hashes, word_rows = self._word_hashes(normalized)
+        if len(word_hashes):
+            self._add_ngrams(hashes, rows, word_hashes, word_rows, self.word_ngrams, WORD_MULTIPLIER, WORD_SALT)
+
+        if self.char_ngrams is not None:
+            padded = [(' ' + ' '.join(words) + ' ').encode('utf-8') if words else b'' for words in normalized]
+            lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+            chars = np.frombuffer(b''.join(padded), dtype=np.uint8).astype(np.uint64)
+            char_rows = np.repeat(np.arange(len(texts)), lengths)
+            low, high = self.char_ngrams
+            for n in range(low, high + 1):
+                self._add_char_ngrams(hashes, rows, chars, char_rows, n)
+
+        if not hashes:
+            return np.zeros(len(texts) + 1, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Merge repeated buckets within a text by sorting (row, bucket) keys
+        buckets = np.concatenate(hashes) % np.uint64(self.buckets)
+        keys = np.concatenate(rows).astype(np.int64) * self.buckets + buckets.astype(np.int64)
+        keys, counts = np.unique(keys, return_counts=True)
+        key_rows = keys // self.buckets
+        indices = keys - key_rows * self.buckets
+
+        values = counts.astype(np.float32)
+        norms = np.sqrt(np.bincount(key_rows, weights=values * values, minlength=len(texts)))
+        values /= norms[key_rows].astype(np.float32)
+
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key_rows, minlength=len(texts)), out=indptr[1:])
+        return indptr, indices, values
+
+    @staticmethod
+    def _word_hashes(normalized: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        counts = [len(words) for words in normalized]
+        total = sum(counts)
+        word_hashes = np.fromiter(
+            (zlib.crc32(word.encode('utf-8')) for words in normalized for word in words),
+            dtype=np.uint64,
+            count=total
+        )
+        word_rows = np.repeat(np.arange(len(normalized)), counts)
+        return word_hashes, word_rows
+
+    @staticmethod
+    def _add_ngrams(
+        hashes: List[np.ndarray],
+        rows: List[np.ndarray],
+        units: np.ndarray,
+        unit_rows: np.ndarray,
+        max_n: int,
+        multiplier: np.uint64,
+        salt: int
+    ) -> None:
+        """Append rolling hashes of every 1..max_n-gram that stays within one row."""
+        rolling = units.copy()
+        for n in range(1, max_n + 1):
+            if n > 1:
+                count = len(units) - n + 1
+                if count <= 0:
+                    break
+                rolling = rolling[:count] * multiplier + units[n - 1:]
+            # An n-gram is valid when its first and last units share a row
+            same_row = unit_rows[:len(rolling)] == unit_rows[n - 1:n - 1 + len(rolling)]
+            hashes.append(rolling[same_row] ^ np.uint64(salt * n))
+            rows.append(unit_rows[:len(rolling)][same_row])
+
+    @staticmethod
+    def _add_char_ngrams(
+        hashes: List[np.ndarray],
+        rows: List[np.ndarray],
+        chars: np.ndarray,
+        char_rows: np.ndarray,
+        n: int
+    ) -> None:
+        count = len(chars) - n + 1
+        if count <= 0:
+            return
+        rolling = chars[:count].copy()
+        for offset in range(1, n):
+            rolling = rolling * CHAR_MULTIPLIER + chars[offset:offset + count]
+        same_row = char_rows[:count] == char_rows[n - 1:]
+        # Final avalanche step so nearby n-grams spread over the buckets
+        mixed = rolling[same_row] ^ np.uint64(CHAR_SALT * n)
+        mixed ^= mixed >> np.uint64(29)
+        hashes.append(mixed)
+        rows.append(char_rows[:count][same_row])
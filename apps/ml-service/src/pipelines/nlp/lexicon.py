@@ -0,0 +1,405 @@
+import hashlib
+import re
+import string
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Tuple
+import numpy as np
+
+# Punctuation becomes whitespace so "stressed," and "exam!" tokenize to
+# "stressed" and "exam"; apostrophes stay part of words ("can't")
+TOKEN_TABLE = str.maketrans({
+    **{char: ' ' for char in string.punctuation if char != "'"},
+    **{char: ' ' for char in '“”„«»…–—'},
+    '‘': "'",
+    '’': "'",
+})
+
+# Bump when tokenize or normalize change in ways TOKEN_TABLE does not show,
+# so lexicon versions (and result cache keys built on them) change too
+TOKENIZER_REVISION = 2
+
+def tokenize(text: str) -> List[str]:
+    """Split lowercased text into tokens, dropping attached punctuation."""
+    return text.translate(TOKEN_TABLE).split()
+
+def normalize(text: str) -> str:
+    """Lowercased text as the token path sees it: tokens joined by single spaces."""
+    return ' '.join(tokenize(text))
+
+
+class LexiconMatcher:
+    """
+    Compiled multi-pattern matcher for keyword lexicons.
+
+    Every word of every token term (single words and multi-word phrases) gets
+    an integer id in one vocabulary shared by all lexicons. Matching maps the
+    tokens of a whole batch of texts to ids once, finds single-word terms by
+    indexing and phrases by comparing packed windows of ids, and scores every
+    category at once: per-text term counts come from one ``np.bincount`` and
+    are multiplied by the term-to-category matrix.
+
+    Substring terms keep plain ``pattern in text`` semantics (a phrase may start
+    or end inside a word) over the normalized text (see ``normalize``), so
+    punctuation and apostrophe variants match like they do for tokens. They
+    are compiled into one trie-shaped regular expression that reports every
+    category present in a single scan.
+    """
+
+    def __init__(self):
+        self._token_terms: Dict[Tuple[str, ...], List[str]] = {}
+        self._substring_terms: Dict[str, List[str]] = {}
+        self.categories: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.compiled = False
+        self.version = None
+
+    def add_terms(self, category: str, terms: Iterable[str]) -> None:
+        """
+        Register whole-token terms for a category.
+
+        Args:
+            category: Category name reported in match results
+            terms: Words or whitespace-separated phrases
+        """
+        self._register_category(category)
+        for term in terms:
+            key = tuple(tokenize(term.lower()))
+            if key:
+                self._add_unique(self._token_terms.setdefault(key, []), category)
+        self.compiled = False
+
+    def add_substrings(self, category: str, terms: Iterable[str]) -> None:
+        """
+        Register substring terms for a category.
+
+        Args:
+            category: Category name reported in match results
+            terms: Strings matched anywhere in the text
+        """
+        self._register_category(category)
+        for term in terms:
+            term = normalize(term.lower())
+            if term:
+                self._add_unique(self._substring_terms.setdefault(term, []), category)
+        self.compiled = False
+
+    def compile(self) -> "LexiconMatcher":
+        """Build the vocabulary, term tables and substring scanner."""
+        self._build_term_tables()
+        self._build_substring_scanner()
+        self.version = self._compute_version()
+        self.compiled = True
+        return self
+
+    def match(self, text: str) -> Dict[str, Any]:
+        """
+        Find every lexicon hit in already-lowercased text.
+
+        A single text is scanned token by token over the same id tables as
+        ``match_many``, which avoids paying array setup costs for one post.
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Dictionary with ``token_count``, per-category hit ``counts`` and
+            per-category distinct matched ``terms`` in order of first appearance
+        """
+        if not self.compiled:
+            self.compile()
+
+        tokens = tokenize(text)
+        get = self.vocabulary.get
+        ids = [get(token, 0) for token in tokens]
+        unigram_terms = self._unigram_term_list
+        phrase_terms = self._phrase_terms
+        phrase_lengths = self._phrase_lengths
+        ends_phrase = self._ends_phrase
+
+        # Term ids in reading order: by end token, longest phrase first
+        hit_terms = []
+        for end, token_id in enumerate(ids):
+            if not token_id:
+                continue
+            if ends_phrase[token_id]:
+                for length in phrase_lengths:
+                    if length <= end + 1:
+                        term = phrase_terms.get(tuple(ids[end - length + 1:end + 1]))
+                        if term is not None:
+                            hit_terms.append(term)
+            term = unigram_terms[token_id]
+            if term >= 0:
+                hit_terms.append(term)
+        hit_terms.extend(self._substring_hits(' '.join(tokens)))
+
+        counts = dict.fromkeys(self.categories, 0)
+        term_categories = self._term_category_lists
+        for term, count in Counter(hit_terms).items():
+            for category in term_categories[term]:
+                counts[category] += count
+
+        return {
+            'token_count': len(tokens),
+            'counts': counts,
+            'terms': self._collect_terms(hit_terms),
+        }
+
+    def match_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Find every lexicon hit in a batch of already-lowercased texts.
+
+        Args:
+            texts: Lowercased texts to scan
+
+        Returns:
+            One ``match`` result per text
+        """
+        token_counts, counts, hit_rows, hit_terms = self._score(texts)
+
+        # Hits are sorted by text, so each text owns a contiguous slice
+        boundaries = np.searchsorted(hit_rows, np.arange(len(texts) + 1)).tolist()
+        hit_terms = hit_terms.tolist()
+        return [
+            {
+                'token_count': token_count,
+                'counts': dict(zip(self.categories, row_counts)),
+                'terms': self._collect_terms(hit_terms[boundaries[row]:boundaries[row + 1]]),
+            }
+            for row, (token_count, row_counts) in enumerate(zip(token_counts, counts.tolist()))
+        ]
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get size information about the compiled lexicon."""
+        if not self.compiled:
+            self.compile()
+        return {
+            'categories': len(self.categories),
+            'token_terms': len(self._token_terms),
+            'substring_terms': len(self._substring_terms),
+            'vocabulary_size': len(self.vocabulary),
+            'version': self.version,
+        }
+
+    def _score(self, texts: List[str]) -> Tuple[List[int], np.ndarray, np.ndarray, np.ndarray]:
+        """Return token counts, the count matrix and the sorted (text, term) hits."""
+        if not self.compiled:
+            self.compile()
+        if not texts:
+            empty = np.zeros(0, dtype=np.int64)
+            return [], np.zeros((0, len(self.categories)), dtype=np.int64), empty, empty
+
+        token_lists = [tokenize(text) for text in texts]
+        token_counts = [len(tokens) for tokens in token_lists]
+        get = self.vocabulary.get
+        ids = np.fromiter(
+            (get(token, 0) for tokens in token_lists for token in tokens),
+            dtype=np.int64,
+            count=sum(token_counts)
+        )
+        rows = np.repeat(np.arange(len(texts)), token_counts)
+        positions = np.arange(len(ids)) - np.repeat(np.cumsum(token_counts) - token_counts, token_counts)
+
+        # Hits as parallel arrays, with a sort key reproducing reading order:
+        # token terms by end token (longest phrase first), then substrings
+        hit_rows = []
+        hit_terms = []
+        hit_order = []
+
+        unigram_terms = self._unigram_terms[ids]
+        found = unigram_terms >= 0
+        hit_rows.append(rows[found])
+        hit_terms.append(unigram_terms[found])
+        hit_order.append(positions[found] * 2 * self._max_phrase_length + self._max_phrase_length - 1)
+
+        base = len(self.vocabulary) + 1
+        for length, (keys, terms) in self._phrase_tables.items():
+            count = len(ids) - length + 1
+            if count <= 0:
+                continue
+            windows = ids[:count].copy()
+            for offset in range(1, length):
+                windows = windows * base + ids[offset:offset + count]
+            slots = np.minimum(np.searchsorted(keys, windows), len(keys) - 1)
+            found = (keys[slots] == windows) & (rows[:count] == rows[length - 1:])
+            hit_rows.append(rows[:count][found])
+            hit_terms.append(terms[slots[found]])
+            end = positions[:count][found] + length - 1
+            hit_order.append(end * 2 * self._max_phrase_length + self._max_phrase_length - length)
+
+        if self._substring_pattern is not None:
+            substring_lists = [self._substring_hits(' '.join(tokens)) for tokens in token_lists]
+            substring_counts = [len(terms) for terms in substring_lists]
+            total = sum(substring_counts)
+            # Substring hits follow every token hit of their text
+            offset = (max(token_counts) + 1) * 2 * self._max_phrase_length
+            hit_rows.append(np.repeat(np.arange(len(texts)), substring_counts))
+            hit_terms.append(np.fromiter(
+                (term for terms in substring_lists for term in terms), dtype=np.int64, count=total
+            ))
+            hit_order.append(np.arange(total) + offset)
+
+        hit_rows = np.concatenate(hit_rows)
+        hit_terms = np.concatenate(hit_terms)
+        order = np.lexsort((np.concatenate(hit_order), hit_rows))
+        hit_rows = hit_rows[order]
+        hit_terms = hit_terms[order]
+
+        # Term counts per text, then every category at once
+        term_count = len(self._term_names)
+        term_hits = np.bincount(
+            hit_rows * term_count + hit_terms, minlength=len(texts) * term_count
+        ).reshape(len(texts), term_count)
+        counts = term_hits @ self._term_category_matrix
+        return token_counts, counts, hit_rows, hit_terms
+
+    def _substring_hits(self, text: str) -> List[int]:
+        """Term ids of every substring hit, in order of position."""
+        if self._substring_pattern is None:
+            return []
+        # Restart one character after each hit so overlapping terms are
+        # still reported
+        search = self._substring_pattern.search
+        closure = self._substring_closure
+        hit_terms = []
+        found = search(text)
+        while found is not None:
+            hit_terms.extend(closure[found.group()])
+            found = search(text, found.start() + 1)
+        return hit_terms
+
+    def _collect_terms(self, hit_terms: List[int]) -> Dict[str, List[str]]:
+        """Distinct term names per category, in order of first hit."""
+        terms: Dict[str, List[str]] = {category: [] for category in self.categories}
+        term_names = self._term_names
+        term_categories = self._term_category_lists
+        for term in dict.fromkeys(hit_terms):
+            name = term_names[term]
+            for category in term_categories[term]:
+                if name not in terms[category]:
+                    terms[category].append(name)
+        return terms
+
+    def _compute_version(self) -> str:
+        """Digest of the tokenizer and every term and category, so any edit to either changes it."""
+        digest = hashlib.sha256()
+        digest.update(f"tokenizer\t{TOKENIZER_REVISION}\t{sorted(TOKEN_TABLE.items())}\n".encode())
+        for mode, entries in (
+            ('token', ((' '.join(key), categories) for key, categories in self._token_terms.items())),
+            ('substring', self._substring_terms.items()),
+        ):
+            for term, categories in sorted(entries):
+                digest.update(f"{mode}\t{term}\t{','.join(sorted(categories))}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def _register_category(self, category: str) -> None:
+        if category not in self.categories:
+            self.categories.append(category)
+
+    @staticmethod
+    def _add_unique(items: List[str], item: str) -> None:
+        if item not in items:
+            items.append(item)
+
+    def _build_term_tables(self) -> None:
+        """Assign token and term ids and build the term-to-category matrix."""
+        vocabulary: Dict[str, int] = {}
+        for key in self._token_terms:
+            for token in key:
+                # Id 0 is reserved for tokens outside every lexicon
+                vocabulary.setdefault(token, len(vocabulary) + 1)
+
+        term_names = []
+        term_category_lists = []
+        for key, categories in self._token_terms.items():
+            term_names.append(' '.join(key))
+            term_category_lists.append(tuple(categories))
+        self._substring_ids = {}
+        for term, categories in self._substring_terms.items():
+            self._substring_ids[term] = len(term_names)
+            term_names.append(term)
+            term_category_lists.append(tuple(categories))
+
+        column = {category: index for index, category in enumerate(self.categories)}
+        matrix = np.zeros((len(term_names), len(self.categories)), dtype=np.int64)
+        for term, categories in enumerate(term_category_lists):
+            for category in categories:
+                matrix[term, column[category]] = 1
+
+        unigram_terms = np.full(len(vocabulary) + 1, -1, dtype=np.int64)
+        phrase_terms: Dict[Tuple[int, ...], int] = {}
+        phrases: Dict[int, List[Tuple[int, int]]] = {}
+        base = len(vocabulary) + 1
+        for term, key in enumerate(self._token_terms):
+            if len(key) == 1:
+                unigram_terms[vocabulary[key[0]]] = term
+                continue
+            if base ** len(key) >= 2 ** 63:
+                raise ValueError(f"Phrase too long for a {len(vocabulary)}-token vocabulary: {' '.join(key)}")
+            phrase_terms[tuple(vocabulary[token] for token in key)] = term
+            packed = 0
+            for token in key:
+                packed = packed * base + vocabulary[token]
+            phrases.setdefault(len(key), []).append((packed, term))
+
+        # Packed phrase keys sorted per length, for binary search
+        phrase_tables = {}
+        for length, entries in sorted(phrases.items()):
+            entries.sort()
+            phrase_tables[length] = (
+                np.array([packed for packed, _ in entries], dtype=np.int64),
+                np.array([term for _, term in entries], dtype=np.int64),
+            )
+
+        self.vocabulary = vocabulary
+        self._term_names = term_names
+        self._term_category_lists = term_category_lists
+        self._term_category_matrix = matrix
+        self._unigram_terms = unigram_terms
+        self._unigram_term_list = unigram_terms.tolist()
+        self._phrase_terms = phrase_terms
+        self._phrase_lengths = sorted(phrase_tables, reverse=True)
+        self._ends_phrase = [False] * (len(vocabulary) + 1)
+        for key in phrase_terms:
+            self._ends_phrase[key[-1]] = True
+        self._phrase_tables = phrase_tables
+        self._max_phrase_length = max([1, *phrase_tables])
+
+    def _build_substring_scanner(self) -> None:
+        """Compile substring terms into a single longest-first trie pattern."""
+        if not self._substring_terms:
+            self._substring_pattern = None
+            self._substring_closure = {}
+            return
+
+        trie: Dict[str, Any] = {}
+        for term in self._substring_terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        self._substring_pattern = re.compile(self._trie_to_regex(trie))
+
+        # Every term matching at a position is a prefix of the longest match
+        # there, so each term carries the term ids of its registered prefixes
+        closure = {}
+        for term in self._substring_terms:
+            closure[term] = [
+                self._substring_ids[prefix]
+                for prefix in (term[:end] for end in range(1, len(term) + 1))
+                if prefix in self._substring_terms
+            ]
+        self._substring_closure = closure
+
+    def _trie_to_regex(self, node: Dict[str, Any]) -> str:
+        is_terminal = '' in node
+        branches = [
+            re.escape(char) + self._trie_to_regex(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional group so the longest term wins at each position
+        return '(?:' + body + ')?' if is_terminal else body
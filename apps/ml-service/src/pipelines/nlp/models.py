@@ -0,0 +1,405 @@
+import json
+import os
+import threading
+from typing import Dict, List, Any, Callable, Optional, Tuple
+import numpy as np
+from utils.logging import get_logger
+from utils.versioned_dir import publish_directory
+from pipelines.nlp.hashing import HashedNgramVectorizer
+
+logger = get_logger(__name__)
+
+# Text analysis components that can be served by a pluggable backend
+TEXT_COMPONENTS = ['sentiment', 'emotion', 'toxicity', 'stress', 'safety']
+
+MANIFEST_FILE = 'manifest.json'
+MODEL_FORMAT_VERSION = 2
+
+class ModelBackend:
+    """
+    Base class of text model backends.
+
+    A backend is constructed from its spec when a component first needs it
+    and loads its files lazily on first use. One backend instance may serve
+    several components (e.g. one model with sentiment and toxicity heads),
+    so it predicts every component it serves in one call.
+    """
+
+    name = 'base'
+    supported_components: Tuple[str, ...] = ()
+
+    def __init__(self, model_name: Optional[str] = None, model_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.loaded = False
+
+    def load(self) -> None:
+        """Load model files; called once, on first use."""
+        self.loaded = True
+
+    def ensure_loaded(self) -> "ModelBackend":
+        if not self.loaded:
+            self.load()
+        return self
+
+    @property
+    def version(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def components(self) -> List[str]:
+        """Components this (loaded) backend can predict."""
+        return list(self.supported_components)
+
+    def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Predict every served component for lowercased texts.
+
+        Returns:
+            One dictionary per text mapping component name to its output
+        """
+        raise NotImplementedError
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'model': self.model_name,
+            'loaded': self.loaded,
+            'version': self.version if self.loaded else None,
+        }
+
+class LexiconBackend(ModelBackend):
+    """
+    Rule-based keyword lexicons, the default backend of every component.
+
+    Scoring stays in ``TextAnalyzer``, which matches the lexicon once per text
+    for all lexicon-backed components; this backend only identifies the
+    lexicon and its version.
+    """
+
+    name = 'lexicon'
+    supported_components = tuple(TEXT_COMPONENTS)
+
+    def __init__(self, lexicon_provider: Callable[[], Any]):
+        super().__init__()
+        self.lexicon_provider = lexicon_provider
+        self.loaded = True
+
+    @property
+    def version(self) -> str:
+        return self.lexicon_provider().version
+
+class HashedLinearBackend(ModelBackend):
+    """
+    Linear model over hashed word and character n-grams, stored as NumPy arrays.
+
+    A model directory under ``model_cache_dir`` holds ``manifest.json``,
+    ``weights.npy`` and ``bias.npy``; sparse models (most buckets pruned to
+    zero) store only their nonzero bucket rows, listed in ``rows.npy``. The
+    arrays are memory-mapped read-only, so every worker process serving the
+    same model shares one copy of the weights in the page cache.
+
+    Prediction is vectorized over a batch: texts are hashed into one sparse
+    matrix and every head of every text is scored with a handful of array
+    operations. The manifest lists the heads in column order, e.g.::
+
+        {"format": "hashed_linear", "format_version": 2, "version": "2026.10",
+         "buckets": 262144, "word_ngrams": 2, "char_ngrams": [3, 5],
+         "storage": "sparse",
+         "heads": {"sentiment": {"labels": ["positive", "negative", "neutral"],
+                                 "activation": "softmax"},
+                   "toxicity": {"labels": ["toxic"], "activation": "sigmoid"}}}
+    """
+
+    name = 'hashed_linear'
+    supported_components = ('sentiment', 'emotion', 'toxicity')
+
+    def load(self) -> None:
+        # Resolve the published version once so every file comes from it
+        path = os.path.realpath(os.path.join(self.model_dir, self.model_name))
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != self.name:
+            raise ValueError(f"Model {self.model_name} is not a {self.name} model")
+        if manifest.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Model {self.model_name} has unsupported format version")
+
+        self.manifest = manifest
+        self.vectorizer = HashedNgramVectorizer(
+            buckets=int(manifest['buckets']),
+            word_ngrams=int(manifest.get('word_ngrams', 1)),
+            char_ngrams=manifest.get('char_ngrams')
+        )
+        self.weights = np.load(os.path.join(path, 'weights.npy'), mmap_mode='r')
+        self.bias = np.load(os.path.join(path, 'bias.npy'), mmap_mode='r')
+        self.rows = None
+        if manifest.get('storage', 'dense') == 'sparse':
+            self.rows = np.load(os.path.join(path, 'rows.npy'), mmap_mode='r')
+
+        self.heads = []
+        column = 0
+        for component, head in manifest['heads'].items():
+            width = len(head['labels'])
+            self.heads.append((component, head['labels'], head['activation'], slice(column, column + width)))
+            column += width
+        stored_rows = len(self.rows) if self.rows is not None else self.vectorizer.buckets
+        if self.weights.shape != (stored_rows, column) or self.bias.shape != (column,):
+            raise ValueError(f"Model {self.model_name} arrays do not match its manifest")
+
+        self.loaded = True
+        logger.info(
+            "Text model loaded",
+            backend=self.name,
+            model=self.model_name,
+            version=self.version,
+            mapped_bytes=self.mapped_bytes
+        )
+
+    @property
+    def version(self) -> str:
+        return f"{self.model_name}@{self.manifest['version']}"
+
+    @property
+    def components(self) -> List[str]:
+        return [component for component, _, _, _ in self.heads]
+
+    @property
+    def mapped_bytes(self) -> int:
+        arrays = [self.weights, self.bias] + ([self.rows] if self.rows is not None else [])
+        return int(sum(array.nbytes for array in arrays))
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute raw scores (logits) for lowercased texts.
+
+        Returns:
+            (len(texts), outputs) array of logits
+        """
+        self.ensure_loaded()
+        indptr, indices, values = self.vectorizer.transform(texts)
+
+        if self.rows is None:
+            weights = self.weights[indices]
+        else:
+            # Buckets pruned from a sparse model contribute nothing
+            positions = np.searchsorted(self.rows, indices)
+            positions[positions == len(self.rows)] = 0
+            found = self.rows[positions] == indices
+            weights = np.zeros((len(indices), self.weights.shape[1]), dtype=np.float32)
+            weights[found] = self.weights[positions[found]]
+
+        # Row sums of the sparse product via prefix sums over the nonzeros
+        contributions = np.zeros((len(indices) + 1, self.weights.shape[1]))
+        np.cumsum(weights * values[:, None], axis=0, dtype=np.float64, out=contributions[1:])
+        return contributions[indptr[1:]] - contributions[indptr[:-1]] + self.bias
+
+    def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        logits = self.decision_function(texts)
+        outputs = {
+            component: (labels, _activate(logits[:, columns], activation))
+            for component, labels, activation, columns in self.heads
+        }
+
+        predictions = []
+        for row in range(len(texts)):
+            prediction = {}
+            for component, (labels, probabilities) in outputs.items():
+                values = probabilities[row]
+                # Single-output heads (e.g. toxicity) are plain scores
+                if len(labels) == 1:
+                    prediction[component] = float(values[0])
+                else:
+                    prediction[component] = dict(zip(labels, values.tolist()))
+            predictions.append(prediction)
+        return predictions
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        if self.loaded:
+            info.update(
+                components=self.components,
+                buckets=self.vectorizer.buckets,
+                word_ngrams=self.vectorizer.word_ngrams,
+                char_ngrams=list(self.vectorizer.char_ngrams) if self.vectorizer.char_ngrams else None,
+                storage='sparse' if self.rows is not None else 'dense',
+                memory_mapped=isinstance(self.weights, np.memmap),
+                mapped_bytes=self.mapped_bytes,
+            )
+        return info
+
+class ModelRegistry:
+    """
+    Assignment of text analysis components to model backends.
+
+    Specs are ``"lexicon"`` or ``"<backend>:<model name>"``, the model name
+    being a directory under ``model_dir``. Specs are validated up front;
+    backends are constructed and loaded when a component first uses them,
+    and components naming the same model share one backend instance.
+    """
+
+    backend_types: Dict[str, type] = {
+        'lexicon': LexiconBackend,
+        'hashed_linear': HashedLinearBackend,
+    }
+
+    def __init__(
+        self,
+        model_dir: str,
+        lexicon_provider: Callable[[], Any],
+        assignments: Optional[Dict[str, str]] = None
+    ):
+        self.model_dir = model_dir
+        self.lexicon = LexiconBackend(lexicon_provider)
+        self.specs: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._backends: Dict[Tuple[str, Optional[str]], ModelBackend] = {('lexicon', None): self.lexicon}
+        self._lock = threading.Lock()
+
+        assignments = assignments or {}
+        unknown = set(assignments) - set(TEXT_COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown text components: {', '.join(sorted(unknown))}")
+        for component in TEXT_COMPONENTS:
+            backend_name, _, model_name = assignments.get(component, 'lexicon').partition(':')
+            backend_type = self.backend_types.get(backend_name)
+            if backend_type is None:
+                raise ValueError(f"Unknown model backend for {component}: {backend_name}")
+            if component not in backend_type.supported_components:
+                raise ValueError(f"Backend {backend_name} cannot serve {component}")
+            if backend_name != 'lexicon' and not model_name:
+                raise ValueError(f"Backend {backend_name} for {component} needs a model name")
+            self.specs[component] = (backend_name, model_name or None)
+        # Whether any component is assigned to a non-lexicon backend
+        self.uses_models = any(backend_name != 'lexicon' for backend_name, _ in self.specs.values())
+
+    @classmethod
+    def register_backend(cls, backend_type: type) -> type:
+        """Make a ModelBackend subclass available to specs under its ``name``."""
+        cls.backend_types[backend_type.name] = backend_type
+        return backend_type
+
+    def backend(self, component: str) -> ModelBackend:
+        """Get the loaded backend serving a component."""
+        spec = self.specs[component]
+        backend = self._backends.get(spec)
+        if backend is None or not backend.loaded:
+            # Analyzer threads may race to the first use of a model
+            with self._lock:
+                backend = self._backends.get(spec)
+                if backend is None:
+                    backend_name, model_name = spec
+                    backend = self.backend_types[backend_name](model_name, self.model_dir)
+                    self._backends[spec] = backend
+                backend.ensure_loaded()
+        if component not in backend.components:
+            raise ValueError(f"Model {backend.model_name} has no {component} head")
+        return backend
+
+    @property
+    def loaded(self) -> bool:
+        """Whether every assigned backend is loaded, so ``version`` loads nothing."""
+        return all(
+            spec in self._backends and self._backends[spec].loaded
+            for spec in set(self.specs.values())
+        )
+
+    def model_backends(self) -> Dict[ModelBackend, List[str]]:
+        """Group components served by non-lexicon backends by backend."""
+        groups: Dict[ModelBackend, List[str]] = {}
+        if not self.uses_models:
+            return groups
+        for component, (backend_name, _) in self.specs.items():
+            if backend_name != 'lexicon':
+                groups.setdefault(self.backend(component), []).append(component)
+        return groups
+
+    @property
+    def version(self) -> str:
+        """Combined version of every backend in use, for result cache keys."""
+        if not self.uses_models:
+            return self.lexicon.version
+        versions = dict.fromkeys(self.backend(component).version for component in TEXT_COMPONENTS)
+        return '+'.join(versions)
+
+    def get_info(self) -> Dict[str, Any]:
+        """Describe the backend and version serving each component."""
+        info = {}
+        for component, spec in self.specs.items():
+            backend = self._backends.get(spec)
+            if backend is None:
+                info[component] = {'backend': spec[0], 'model': spec[1], 'loaded': False, 'version': None}
+            else:
+                info[component] = backend.get_info()
+        return info
+
+def save_hashed_linear_model(
+    path: str,
+    weights: np.ndarray,
+    bias: np.ndarray,
+    heads: Dict[str, Dict[str, Any]],
+    version: str,
+    vectorizer: HashedNgramVectorizer,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Write a hashed linear model directory readable by HashedLinearBackend.
+
+    Weights where fewer than half the buckets are nonzero are stored sparse.
+
+    Args:
+        path: Model directory, replaced atomically (see ``publish_directory``)
+        weights: (buckets, outputs) weight matrix
+        bias: (outputs,) bias vector
+        heads: Component heads in column order, each with ``labels`` and
+            ``activation`` ("softmax" or "sigmoid")
+        version: Model version reported by /model-info
+        vectorizer: Vectorizer the weights were trained with
+        metadata: Extra manifest entries (e.g. training statistics); keys the
+            manifest defines itself are ignored
+
+    Returns:
+        The written manifest
+    """
+    nonzero_rows = np.flatnonzero(np.any(weights != 0, axis=1))
+    arrays = {'bias.npy': bias}
+    if len(nonzero_rows) < weights.shape[0] // 2:
+        storage = 'sparse'
+        arrays['rows.npy'] = nonzero_rows.astype(np.int64)
+        arrays['weights.npy'] = weights[nonzero_rows]
+    else:
+        storage = 'dense'
+        arrays['weights.npy'] = weights
+
+    manifest = {
+        # Spread first, so metadata can never override the structural keys
+        **(metadata or {}),
+        'format': HashedLinearBackend.name,
+        'format_version': MODEL_FORMAT_VERSION,
+        'version': version,
+        'buckets': vectorizer.buckets,
+        'word_ngrams': vectorizer.word_ngrams,
+        'char_ngrams': list(vectorizer.char_ngrams) if vectorizer.char_ngrams else None,
+        'storage': storage,
+        'heads': heads,
+    }
+
+    def write(directory: str) -> None:
+        for name, array in arrays.items():
+            dtype = np.int64 if name == 'rows.npy' else np.float32
+            np.save(os.path.join(directory, name), np.ascontiguousarray(array, dtype=dtype))
+        with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    # Arrays and manifest are published together, so a worker loading the
+    # model never pairs new weights with the old manifest; processes still
+    # mapping the previous version keep reading it
+    publish_directory(path, write)
+    return manifest
+
+def _activate(logits: np.ndarray, activation: str) -> np.ndarray:
+    """Turn a (texts, labels) block of logits into rounded probabilities."""
+    if activation == 'softmax':
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = exp / exp.sum(axis=1, keepdims=True)
+    else:
+        probabilities = 1 / (1 + np.exp(-logits))
+    return np.round(probabilities, 3)
@@ -0,0 +1,299 @@
+"""
+Offline training of hashed n-gram linear text models.
+
+Reads labeled posts from JSONL and writes a model directory that the
+``hashed_linear`` backend serves. Each line holds ``text`` plus any of:
+
+    "sentiment": "positive" | "negative" | "neutral"
+    "emotion": ["sadness", "fear", ...]   (any of the six emotions)
+    "toxicity": 0 | 1                     (or a probability)
+
+Records without a head's label are ignored by that head only.
+
+Usage (from src):
+    python -m pipelines.nlp.train posts.jsonl --name sentiment-toxicity --version 2026.10
+then serve it with
+    TEXT_MODEL_BACKENDS='{"sentiment": "hashed_linear:sentiment-toxicity",
+                          "toxicity": "hashed_linear:sentiment-toxicity"}'
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from config import settings
+from pipelines.nlp.hashing import HashedNgramVectorizer
+from pipelines.nlp.models import save_hashed_linear_model
+
+# Heads a model can be trained for, in the output schema of TextAnalyzer
+HEADS: Dict[str, Dict[str, Any]] = {
+    'sentiment': {'labels': ['positive', 'negative', 'neutral'], 'activation': 'softmax'},
+    'emotion': {'labels': ['joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust'], 'activation': 'sigmoid'},
+    'toxicity': {'labels': ['toxic'], 'activation': 'sigmoid'},
+}
+
+def build_targets(records: List[Dict[str, Any]], heads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode record labels as target and mask matrices.
+
+    Args:
+        records: Labeled records
+        heads: Heads to train, in column order
+
+    Returns:
+        ``(targets, mask)`` arrays of shape (records, outputs); mask is 0
+        where a record has no label for the head
+
+    Raises:
+        ValueError: For labels outside a head's label set
+    """
+    widths = [len(HEADS[head]['labels']) for head in heads]
+    targets = np.zeros((len(records), sum(widths)), dtype=np.float32)
+    mask = np.zeros_like(targets)
+
+    for row, record in enumerate(records):
+        column = 0
+        for head, width in zip(heads, widths):
+            label = record.get(head)
+            if label is not None:
+                labels = HEADS[head]['labels']
+                if head == 'toxicity':
+                    targets[row, column] = float(label)
+                else:
+                    for name in ([label] if isinstance(label, str) else label):
+                        if name not in labels:
+                            raise ValueError(f"Unknown {head} label in record {row}: {name}")
+                        targets[row, column + labels.index(name)] = 1.0
+                mask[row, column:column + width] = 1.0
+            column += width
+    return targets, mask
+
+def train_hashed_linear(
+    texts: List[str],
+    targets: np.ndarray,
+    mask: np.ndarray,
+    heads: List[str],
+    vectorizer: HashedNgramVectorizer,
+    epochs: int = 10,
+    batch_size: int = 256,
+    learning_rate: float = 0.5,
+    l1: float = 1e-5,
+    l2: float = 1e-6,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+    """
+    Fit softmax/logistic heads on hashed n-grams with mini-batch gradient descent.
+
+    Only the buckets present in a mini-batch are updated. After every update
+    the touched weights are shrunk towards zero by the L1 penalty (truncated
+    gradient), so buckets carrying no signal end at exactly zero and the
+    saved model is sparse.
+
+    Args:
+        texts: Lowercased training texts
+        targets: (texts, outputs) targets from ``build_targets``
+        mask: (texts, outputs) label mask from ``build_targets``
+        heads: Heads in column order
+        vectorizer: Feature hashing configuration
+        epochs: Passes over the data
+        batch_size: Texts per update
+        learning_rate: Initial step size, decayed by 1/sqrt(epoch)
+        l1: L1 penalty (sparsity)
+        l2: L2 penalty
+        seed: Shuffling seed
+
+    Returns:
+        ``(weights, bias, losses)`` with the mean training loss per epoch
+    """
+    rng = np.random.default_rng(seed)
+    indptr, indices, values = vectorizer.transform(texts)
+    outputs = targets.shape[1]
+    weights = np.zeros((vectorizer.buckets, outputs), dtype=np.float32)
+    bias = np.zeros(outputs, dtype=np.float32)
+    losses = []
+
+    for epoch in range(epochs):
+        step = learning_rate / np.sqrt(epoch + 1)
+        epoch_loss = 0.0
+        for start in rng.permutation(np.arange(0, len(texts), batch_size)):
+            end = min(start + batch_size, len(texts))
+            lo, hi = indptr[start], indptr[end]
+            batch_indices, batch_values = indices[lo:hi], values[lo:hi]
+            batch_rows = np.repeat(np.arange(end - start), np.diff(indptr[start:end + 1]))
+
+            # Forward pass over the touched buckets only
+            touched, inverse = np.unique(batch_indices, return_inverse=True)
+            logits = np.tile(bias, (end - start, 1)).astype(np.float64)
+            contributions = weights[touched][inverse] * batch_values[:, None]
+            for column in range(outputs):
+                logits[:, column] += np.bincount(batch_rows, contributions[:, column], minlength=end - start)
+
+            probabilities = _activate(logits, heads)
+            batch_mask = mask[start:end]
+            epoch_loss += _loss(probabilities, targets[start:end], batch_mask, heads)
+            error = (probabilities - targets[start:end]) * batch_mask / (end - start)
+
+            # Gradient per touched bucket, then penalized update
+            gradient = np.empty((len(touched), outputs), dtype=np.float32)
+            per_value = error[batch_rows] * batch_values[:, None]
+            for column in range(outputs):
+                gradient[:, column] = np.bincount(inverse, per_value[:, column], minlength=len(touched))
+            updated = weights[touched] - step * (gradient + l2 * weights[touched])
+            weights[touched] = np.sign(updated) * np.maximum(np.abs(updated) - step * l1, 0.0)
+            bias -= step * error.sum(axis=0).astype(np.float32)
+
+        losses.append(epoch_loss / len(texts))
+    return weights, bias, losses
+
+def evaluate(
+    probabilities: np.ndarray,
+    targets: np.ndarray,
+    mask: np.ndarray,
+    heads: List[str]
+) -> Dict[str, float]:
+    """Accuracy per head (argmax for softmax heads, 0.5 threshold for sigmoid heads)."""
+    accuracy = {}
+    for head, columns in zip(heads, _head_columns(heads)):
+        labeled = mask[:, columns.start] > 0
+        if not labeled.any():
+            continue
+        predicted, expected = probabilities[labeled, columns], targets[labeled, columns]
+        if HEADS[head]['activation'] == 'softmax':
+            correct = predicted.argmax(axis=1) == expected.argmax(axis=1)
+        else:
+            correct = ((predicted >= 0.5) == (expected >= 0.5)).all(axis=1)
+        accuracy[head] = float(correct.mean())
+    return accuracy
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train a hashed n-gram linear text model.")
+    parser.add_argument('data', help="Labeled JSONL file")
+    parser.add_argument('--name', required=True, help="Model directory name under --model-dir")
+    parser.add_argument('--version', default=time.strftime('%Y.%m.%d'), help="Model version")
+    parser.add_argument('--model-dir', default=settings.model_cache_dir, help="Directory holding models")
+    parser.add_argument('--heads', help="Comma-separated heads (default: every head labeled in the data)")
+    parser.add_argument('--buckets', type=int, default=2 ** 18, help="Hash buckets")
+    parser.add_argument('--word-ngrams', type=int, default=2, help="Longest word n-gram")
+    parser.add_argument('--char-ngrams', default='3,5', help="Char n-gram length range, or 'none'")
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--l1', type=float, default=1e-5, help="L1 penalty (higher = sparser)")
+    parser.add_argument('--l2', type=float, default=1e-6, help="L2 penalty")
+    parser.add_argument('--holdout', type=float, default=0.1, help="Fraction held out for evaluation")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with open(args.data, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [record for record in records if record.get('text')]
+    np.random.default_rng(args.seed).shuffle(records)
+
+    heads = args.heads.split(',') if args.heads else [
+        head for head in HEADS if any(record.get(head) is not None for record in records)
+    ]
+    unknown = set(heads) - set(HEADS)
+    if unknown or not heads:
+        parser.error(f"Heads must be among {', '.join(HEADS)}")
+
+    char_ngrams = None
+    if args.char_ngrams != 'none':
+        low, high = (int(value) for value in args.char_ngrams.split(','))
+        char_ngrams = (low, high)
+    vectorizer = HashedNgramVectorizer(args.buckets, args.word_ngrams, char_ngrams)
+
+    texts = [record['text'].lower() for record in records]
+    targets, mask = build_targets(records, heads)
+    split = len(texts) - int(len(texts) * args.holdout)
+
+    start = time.perf_counter()
+    weights, bias, losses = train_hashed_linear(
+        texts[:split], targets[:split], mask[:split], heads, vectorizer,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        l1=args.l1,
+        l2=args.l2,
+        seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+    for epoch, loss in enumerate(losses, 1):
+        print(f"epoch {epoch}: loss {loss:.4f}", file=sys.stderr)
+
+    metrics = {}
+    if split < len(texts):
+        probabilities = predict_probabilities(texts[split:], weights, bias, heads, vectorizer)
+        metrics = evaluate(probabilities, targets[split:], mask[split:], heads)
+        print(f"holdout accuracy: {json.dumps(metrics)}", file=sys.stderr)
+
+    path = os.path.join(args.model_dir, args.name)
+    manifest = save_hashed_linear_model(
+        path, weights, bias, {head: HEADS[head] for head in heads}, args.version, vectorizer,
+        metadata={'training': {
+            'records': split,
+            'epochs': args.epochs,
+            'seconds': round(elapsed, 2),
+            'nonzero_buckets': int(np.any(weights != 0, axis=1).sum()),
+            'holdout_accuracy': metrics,
+        }}
+    )
+    print(
+        f"Saved {manifest['storage']} model {args.name}@{args.version} to {path} "
+        f"({manifest['training']['nonzero_buckets']} nonzero buckets)",
+        file=sys.stderr
+    )
+    return 0
+
+def predict_probabilities(
+    texts: List[str],
+    weights: np.ndarray,
+    bias: np.ndarray,
+    heads: List[str],
+    vectorizer: HashedNgramVectorizer
+) -> np.ndarray:
+    """Score lowercased texts with in-memory weights (as the backend would)."""
+    indptr, indices, values = vectorizer.transform(texts)
+    rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+    contributions = weights[indices] * values[:, None]
+    logits = np.tile(bias, (len(texts), 1)).astype(np.float64)
+    for column in range(weights.shape[1]):
+        logits[:, column] += np.bincount(rows, contributions[:, column], minlength=len(texts))
+    return _activate(logits, heads)
+
+def _head_columns(heads: List[str]) -> List[slice]:
+    columns = []
+    start = 0
+    for head in heads:
+        width = len(HEADS[head]['labels'])
+        columns.append(slice(start, start + width))
+        start += width
+    return columns
+
+def _activate(logits: np.ndarray, heads: List[str]) -> np.ndarray:
+    probabilities = np.empty_like(logits)
+    for head, columns in zip(heads, _head_columns(heads)):
+        block = logits[:, columns]
+        if HEADS[head]['activation'] == 'softmax':
+            exp = np.exp(block - block.max(axis=1, keepdims=True))
+            probabilities[:, columns] = exp / exp.sum(axis=1, keepdims=True)
+        else:
+            probabilities[:, columns] = 1 / (1 + np.exp(-block))
+    return probabilities
+
+def _loss(probabilities: np.ndarray, targets: np.ndarray, mask: np.ndarray, heads: List[str]) -> float:
+    """Summed cross-entropy of the labeled outputs."""
+    clipped = np.clip(probabilities, 1e-7, 1 - 1e-7)
+    loss = 0.0
+    for head, columns in zip(heads, _head_columns(heads)):
+        p, y, m = clipped[:, columns], targets[:, columns], mask[:, columns]
+        if HEADS[head]['activation'] == 'softmax':
+            loss -= (m * y * np.log(p)).sum()
+        else:
+            loss -= (m * (y * np.log(p) + (1 - y) * np.log(1 - p))).sum()
+    return float(loss)
+
+if __name__ == "__main__":
+    sys.exit(main())
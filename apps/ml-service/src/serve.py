@@ -0,0 +1,116 @@
+"""
+Production launcher: preforked uvicorn workers sharing one preloaded app.
+
+The master process imports the app, builds the analyzers (compiling the
+lexicons and mapping model files) and runs the warm-up once, with the
+garbage collector disabled. It then forks the workers, which inherit all of
+it copy-on-write and accept connections from the same listening socket.
+Each worker runs the app's lifespan (executor, health checks, behavior state
+snapshots). Workers that die are restarted; SIGTERM or SIGINT stops them
+gracefully.
+
+Workers do not share mutable state: result caches, metrics and rolling
+behavior state are per worker (behavior state is snapshotted under
+``behavior_state/worker-<index>``), so incremental behavior analysis needs
+requests for a user to reach the same worker, or a single worker, and each
+scrape of /metrics sees one worker. Privacy budgets are per worker too
+unless the accountant uses Redis. The launcher therefore refuses more than
+one worker unless privacy budgets are shared (PRIVACY_ACCOUNTANT_USE_REDIS,
+or differential privacy disabled) and SERVER_PER_WORKER_BEHAVIOR_STATE
+acknowledges the rest. The Docker image runs the single-process server.
+
+Usage:
+    python src/serve.py [--host 0.0.0.0] [--port 8001] [--workers N]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import socket
+import sys
+from typing import List, Optional
+
+from config import settings
+from utils.logging import setup_logging, get_logger
+from utils.prefork import PreforkSupervisor
+
+logger = get_logger(__name__)
+
+def multi_worker_problems(workers: int) -> List[str]:
+    """
+    Check that per-process state allows serving from several workers.
+
+    Args:
+        workers: Worker processes requested
+
+    Returns:
+        Reasons the workers would serve inconsistent results (empty if none)
+    """
+    if workers <= 1:
+        return []
+
+    problems = []
+    if settings.enable_differential_privacy and not settings.privacy_accountant_use_redis:
+        problems.append(
+            "privacy budgets would be per worker, multiplying each user's budget; "
+            "set PRIVACY_ACCOUNTANT_USE_REDIS=true"
+        )
+    if not settings.server_per_worker_behavior_state:
+        problems.append(
+            "rolling behavior state and metrics would be per worker, so incremental "
+            "behavior analysis would miss events; set SERVER_PER_WORKER_BEHAVIOR_STATE=true "
+            "if it is unused or each user reaches one worker"
+        )
+    return problems
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the ML service from preforked workers.")
+    parser.add_argument('--host', default="0.0.0.0", help="Address to bind")
+    parser.add_argument('--port', type=int, default=int(os.getenv("ML_PORT", 8001)), help="Port to bind")
+    parser.add_argument('--workers', type=int, default=settings.server_workers or os.cpu_count() or 1,
+                        help="Worker processes (default: SERVER_WORKERS; 0 = one per core)")
+    parser.add_argument('--graceful-timeout', type=float, default=settings.server_graceful_timeout_seconds,
+                        help="Seconds workers get to finish requests on shutdown")
+    parser.add_argument('--log-level', default='info', help="Uvicorn log level")
+    args = parser.parse_args(argv)
+
+    problems = multi_worker_problems(args.workers)
+    if problems:
+        for problem in problems:
+            logger.error(f"Refusing to start {args.workers} workers: {problem}")
+        return 2
+
+    # Objects built from here on are shared with the workers; keep the
+    # collector from freeing holes in their pages before the fork
+    gc.disable()
+    setup_logging()
+
+    from main import app
+    import api
+    api.get_analyzers()
+    warm_up_ms = asyncio.run(api.warm_up())
+    logger.info("Master preloaded the app", workers=args.workers, warm_up=warm_up_ms)
+
+    def serve_worker(sock: socket.socket, index: int) -> None:
+        import uvicorn
+
+        api.behavior_state_dir = os.path.join(api.behavior_state_dir, f"worker-{index}")
+        config = uvicorn.Config(
+            app,
+            log_level=args.log_level,
+            timeout_graceful_shutdown=args.graceful_timeout
+        )
+        uvicorn.Server(config).run(sockets=[sock])
+
+    supervisor = PreforkSupervisor(
+        serve_worker,
+        args.host,
+        args.port,
+        args.workers,
+        # Room for the lifespan shutdown after uvicorn stops waiting for requests
+        graceful_timeout_seconds=args.graceful_timeout + 5
+    )
+    return supervisor.run()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+from utils.logging import get_logger
+from config import settings
+
+logger = get_logger(__name__)
+
+class AnalysisCache:
+    """
+    Content-addressed cache for derived analysis results.
+
+    Entries are keyed by a hash of the normalized input and a model version,
+    and hold only derived features, never raw text. A bounded in-process LRU
+    tier is consulted first; an optional Redis tier (any client exposing the
+    ``redis.asyncio`` ``get``/``set``/``mget`` coroutines) is shared between
+    workers and replicas. Redis failures are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: int = 3600,
+        redis_client: Optional[Any] = None,
+        namespace: str = "text-analysis"
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {'hits': 0, 'redis_hits': 0, 'misses': 0, 'redis_errors': 0}
+
+    @staticmethod
+    def make_key(text: str, version: str) -> str:
+        """
+        Build a cache key for a text under a given model version.
+
+        Args:
+            text: Normalized input text
+            version: Version of the models or lexicons producing the result
+
+        Returns:
+            Hex digest identifying the input and version
+        """
+        return hashlib.sha256(f"{version}\0{text}".encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            A copy of the cached result, or None on a miss
+        """
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up many cached results, using one Redis round-trip for local misses.
+
+        Args:
+            keys: Cache keys from ``make_key``
+
+        Returns:
+            Copies of the cached results aligned with ``keys`` (None on a miss)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        remote: List[int] = []
+
+        for index, key in enumerate(keys):
+            value = self._entries.get(key)
+            if value is None:
+                remote.append(index)
+            else:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                results[index] = _copy_result(value)
+
+        if remote and self.redis_client is not None:
+            try:
+                payloads = await self.redis_client.mget(
+                    [self._redis_key(keys[index]) for index in remote]
+                )
+            except Exception as e:
+                self._stats['redis_errors'] += 1
+                logger.warning(f"Analysis cache lookup failed: {e}")
+                payloads = [None] * len(remote)
+
+            for index, payload in zip(remote, payloads):
+                if payload is not None:
+                    value = json.loads(payload)
+                    self._store_local(keys[index], value)
+                    self._stats['redis_hits'] += 1
+                    results[index] = _copy_result(value)
+
+        self._stats['misses'] += sum(1 for result in results if result is None)
+        return results
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a derived result.
+
+        Args:
+            key: Cache key from ``make_key``
+            value: JSON-serializable derived features
+        """
+        await self.set_many({key: value})
+
+    async def set_many(self, values: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store many derived results, writing them to Redis in one pipeline.
+
+        Args:
+            values: Mapping of cache key to JSON-serializable derived features
+        """
+        for key, value in values.items():
+            self._store_local(key, _copy_result(value))
+
+        if values and self.redis_client is not None:
+            try:
+                pipeline = self.redis_client.pipeline(transaction=False)
+                for key, value in values.items():
+                    pipeline.set(self._redis_key(key), json.dumps(value), ex=self.ttl_seconds)
+                await pipeline.execute()
+            except Exception as e:
+                self._stats['redis_errors'] += 1
+                logger.warning(f"Analysis cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry from the in-process tier."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes."""
+        return {
+            **self._stats,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'redis_enabled': self.redis_client is not None,
+        }
+
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _redis_key(self, key: str) -> str:
+        return f"ml:{self.namespace}:{key}"
+
+def create_redis_client(redis_url: str) -> Optional[Any]:
+    """
+    Create an asyncio Redis client if the optional ``redis`` package is installed.
+
+    Args:
+        redis_url: Redis connection URL
+
+    Returns:
+        Redis client, or None when the package is unavailable
+    """
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("redis package not installed, Redis tier disabled")
+        return None
+
+    return redis.from_url(redis_url)
+
+def create_analysis_cache() -> Optional[AnalysisCache]:
+    """Build the text analysis cache from settings, or None when disabled."""
+    if not settings.enable_result_cache:
+        return None
+
+    redis_client = None
+    if settings.result_cache_use_redis:
+        redis_client = create_redis_client(settings.redis_url)
+
+    return AnalysisCache(
+        max_entries=settings.result_cache_size,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+        redis_client=redis_client
+    )
+
+def _copy_result(value: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a result one level deep so callers cannot mutate cached entries."""
+    return {
+        key: item.copy() if isinstance(item, (dict, list)) else item
+        for key, item in value.items()
+    }
@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+from fastapi import HTTPException
+from utils.logging import get_logger
+from utils.metrics import registry
+
+logger = get_logger(__name__)
+
+EXECUTOR_MODES = ('inline', 'thread', 'process')
+
+ADMISSION_REJECTED_TOTAL = registry.counter(
+    'ml_admission_rejected_total',
+    'Requests rejected because the concurrent request limit was reached.'
+)
+
+# Analyzers owned by a process pool worker, built once by the pool initializer
+_worker_components: Dict[str, Any] = {}
+
+class AnalysisExecutor:
+    """
+    Runs synchronous analyzer work off the event loop, with admission control.
+
+    Modes:
+        inline: run on the calling coroutine (no pool; used until ``start``)
+        thread: run in a thread pool, keeping the event loop responsive
+        process: run in a process pool whose workers each hold pre-warmed
+            analyzers built by ``component_factory``, for real parallelism.
+            Workers are built once at ``start``, so runtime changes to the
+            parent's analyzers (e.g. feature weights) are not propagated, and
+            stage metrics recorded in workers are not exported by the parent.
+    """
+
+    def __init__(
+        self,
+        mode: str = 'thread',
+        max_workers: Optional[int] = None,
+        max_concurrent_requests: int = 100,
+        retry_after_seconds: int = 1,
+        component_factory: Optional[Callable[[], Dict[str, Any]]] = None
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {mode}")
+        if mode == 'process' and component_factory is None:
+            raise ValueError("Process mode requires a component factory")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_concurrent_requests = max_concurrent_requests
+        self.retry_after_seconds = retry_after_seconds
+        self.component_factory = component_factory
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        """Create the worker pool; process workers are spawned and warmed up eagerly."""
+        if self._pool is not None or self.mode == 'inline':
+            return
+
+        if self.mode == 'thread':
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='analysis'
+            )
+        else:
+            workers = self.max_workers or os.cpu_count() or 1
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.component_factory,)
+            )
+            # One task per worker forces every process to start and build its analyzers
+            warm_up = [self._pool.submit(_worker_ready) for _ in range(workers)]
+            for future in warm_up:
+                future.result()
+
+        logger.info("Analysis executor started", mode=self.mode, max_workers=self.max_workers)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling queued work."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, component: str, method: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run an analyzer method according to the executor mode.
+
+        Args:
+            component: Name of the analyzer in ``component_factory`` output
+            method: Bound analyzer method (called by name in process workers)
+            *args: Picklable positional arguments
+
+        Returns:
+            The method's return value
+        """
+        if self._pool is None:
+            return method(*args)
+
+        loop = asyncio.get_running_loop()
+        if self.mode == 'process':
+            return await loop.run_in_executor(
+                self._pool, _call_in_worker, component, method.__name__, args
+            )
+        return await loop.run_in_executor(self._pool, functools.partial(method, *args))
+
+    async def admit(self):
+        """
+        FastAPI dependency enforcing the concurrent request limit.
+
+        Raises:
+            HTTPException: 503 with Retry-After when the limit is reached
+        """
+        if self._in_flight >= self.max_concurrent_requests:
+            self._rejected += 1
+            ADMISSION_REJECTED_TOTAL.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Service is at capacity, retry later",
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor mode and current load."""
+        return {
+            'mode': self.mode,
+            'running': self._pool is not None,
+            'in_flight': self._in_flight,
+            'max_concurrent_requests': self.max_concurrent_requests,
+            'rejected': self._rejected,
+        }
+
+def _init_worker(component_factory: Callable[[], Dict[str, Any]]) -> None:
+    _worker_components.update(component_factory())
+
+def _worker_ready() -> bool:
+    return bool(_worker_components)
+
+def _call_in_worker(component: str, method_name: str, args: tuple) -> Any:
+    return getattr(_worker_components[component], method_name)(*args)
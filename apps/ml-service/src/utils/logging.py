@@ -1,37 +1,277 @@
 import structlog
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Any, Dict
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, TextIO, Tuple
 
-def setup_logging() -> None:
-    """Configure structured logging for the ML service."""
-    
-    # Configure structlog
+from config import settings
+from utils.metrics import registry
+
+LOG_LINES_DROPPED_TOTAL = registry.counter(
+    'ml_log_lines_dropped_total',
+    'Log lines not written, by reason: sampled, queue_full or write_error.',
+    ['reason']
+)
+
+# Only these levels are sampled; warnings and errors are always written
+SAMPLED_LEVELS = frozenset({'debug', 'info'})
+
+# Events with any of these fields set are always written (e.g. safety flags)
+UNSAMPLED_FIELDS = ('safety_flags', 'safety_flags_count', 'safety_flagged_count')
+
+# How long an error waits for room in a full queue before it is dropped
+ERROR_ENQUEUE_TIMEOUT_SECONDS = 1.0
+
+_STOP = object()
+
+_render = structlog.processors.JSONRenderer()
+_decode = structlog.processors.UnicodeDecoder()
+
+class LogWriter:
+    """
+    Background thread rendering queued log events as JSON lines and writing them.
+
+    ``put`` never blocks the caller: when the queue is full the event is
+    dropped and counted in ``ml_log_lines_dropped_total``, except errors,
+    which wait up to ``ERROR_ENQUEUE_TIMEOUT_SECONDS`` for room. The stream is
+    flushed whenever the queue runs empty.
+    """
+
+    def __init__(self, stream: TextIO, queue_size: int):
+        self.stream = stream
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event_dict: Dict[str, Any], error: bool = False) -> None:
+        """Queue an event for writing."""
+        try:
+            self.queue.put_nowait(event_dict)
+            return
+        except queue.Full:
+            pass
+        if error:
+            try:
+                self.queue.put(event_dict, timeout=ERROR_ENQUEUE_TIMEOUT_SECONDS)
+                return
+            except queue.Full:
+                pass
+        LOG_LINES_DROPPED_TOTAL.inc('queue_full')
+
+    def stop(self) -> None:
+        """Write out the queued events and stop the thread."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            event_dict = self.queue.get()
+            if event_dict is _STOP:
+                break
+            _write(self.stream, event_dict)
+            if self.queue.empty():
+                self._flush()
+        self._flush()
+
+    def _flush(self) -> None:
+        try:
+            self.stream.flush()
+        except Exception:
+            pass
+
+class QueueLogger:
+    """
+    structlog logger handing each processed event to the log writer.
+
+    Everything else (level checks for ``filter_by_level``) is delegated to
+    the standard library logger of the same name, so ``logging`` levels
+    still apply.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self._stdlib_logger = logging.getLogger(name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stdlib_logger, name)
+
+    def msg(self, event_dict: Dict[str, Any]) -> None:
+        _hand_off(event_dict, error=False)
+
+    def error(self, event_dict: Dict[str, Any]) -> None:
+        _hand_off(event_dict, error=True)
+
+    debug = info = warning = warn = log = msg
+    critical = fatal = exception = error
+
+class QueueLoggerFactory:
+    """Creates a ``QueueLogger`` per ``structlog.get_logger(name)``."""
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(args[0] if args else None)
+
+class LogQueueHandler(logging.Handler):
+    """Standard library handler passing records from other libraries to the log writer."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            event_dict = {
+                'event': record.getMessage(),
+                'logger': record.name,
+                'level': record.levelname.lower(),
+                'timestamp': datetime.fromtimestamp(record.created, timezone.utc)
+                    .isoformat().replace('+00:00', 'Z'),
+            }
+            if record.exc_info:
+                event_dict['exception'] = logging.Formatter().formatException(record.exc_info)
+        except Exception:
+            self.handleError(record)
+            return
+        _hand_off(event_dict, error=record.levelno >= logging.ERROR)
+
+_sample_rates: Dict[str, float] = {}
+_stream: Optional[TextIO] = None
+_queue_size = 0
+_writer: Optional[LogWriter] = None
+_handler: Optional[LogQueueHandler] = None
+
+def sample_events(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only a share of high-volume events, per ``settings.log_sample_rates``.
+
+    Rates map event names to the fraction written (e.g. 0.1 writes one in
+    ten). Kept events carry their ``sample_rate`` so counts can be scaled
+    back up. Warnings, errors and events with safety flags are never sampled.
+    """
+    rate = _sample_rates.get(event_dict.get('event'))
+    if rate is None or rate >= 1.0 or method_name not in SAMPLED_LEVELS:
+        return event_dict
+    if any(event_dict.get(field) for field in UNSAMPLED_FIELDS):
+        return event_dict
+    if random.random() < rate:
+        event_dict['sample_rate'] = rate
+        return event_dict
+    LOG_LINES_DROPPED_TOTAL.inc('sampled')
+    raise structlog.DropEvent
+
+def setup_logging(
+    stream: Optional[TextIO] = None,
+    sample_rates: Optional[Mapping[str, float]] = None,
+    queue_size: Optional[int] = None
+) -> None:
+    """
+    Configure structured logging for the ML service.
+
+    Events are filtered, sampled and timestamped on the calling thread, then
+    handed to a bounded queue; a background thread renders them as JSON and
+    writes them, so a slow stdout never blocks the event loop. Calling it
+    again replaces the previous configuration, and forked processes (prefork
+    workers, process pools) start their own writer thread.
+
+    Args:
+        stream: Where lines are written (stdout by default)
+        sample_rates: Per-event sample rates (``settings.log_sample_rates``
+            by default)
+        queue_size: Most lines waiting to be written before new ones are
+            dropped (``settings.log_queue_size`` by default)
+    """
+    global _stream, _queue_size
+
+    _sample_rates.clear()
+    _sample_rates.update(settings.log_sample_rates if sample_rates is None else sample_rates)
+    _stream = stream
+    _queue_size = settings.log_queue_size if queue_size is None else queue_size
+
+    # Configure structlog; rendering is left to the writer thread
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
+            sample_events,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            _as_logger_args
         ],
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        logger_factory=QueueLoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
 
     # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
+    shutdown_logging()
+    _start_writer()
+    logging.getLogger().setLevel(logging.INFO)
+
+def shutdown_logging() -> None:
+    """Write out queued lines and stop the writer thread; later lines are written directly."""
+    global _writer, _handler
+
+    if _writer is not None:
+        _writer.stop()
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+    _writer = None
+    _handler = None
 
 def get_logger(name: str) -> structlog.BoundLogger:
     """Get a structured logger instance."""
-    return structlog.get_logger(name)
\ No newline at end of file
+    return structlog.get_logger(name)
+
+def _as_logger_args(
+    logger: Any,
+    method_name: str,
+    event_dict: Dict[str, Any]
+) -> Tuple[Tuple[Dict[str, Any]], Dict[str, Any]]:
+    return (event_dict,), {}
+
+def _hand_off(event_dict: Dict[str, Any], error: bool) -> None:
+    writer = _writer
+    if writer is not None:
+        writer.put(event_dict, error)
+    else:
+        _write(_stream or sys.stdout, event_dict)
+
+def _write(stream: TextIO, event_dict: Dict[str, Any]) -> None:
+    try:
+        stream.write(_render(None, '', _decode(None, '', event_dict)) + "\n")
+    except Exception:
+        LOG_LINES_DROPPED_TOTAL.inc('write_error')
+
+def _start_writer() -> None:
+    global _writer, _handler
+
+    _writer = LogWriter(_stream or sys.stdout, _queue_size)
+    _writer.start()
+    _handler = LogQueueHandler()
+    logging.getLogger().addHandler(_handler)
+
+def _restart_writer_after_fork() -> None:
+    # The writer thread does not survive fork and may have held the queue's
+    # lock, so the child starts over with its own queue and thread
+    global _writer, _handler
+
+    if _writer is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _writer = None
+    _handler = None
+    _start_writer()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_writer_after_fork)
+atexit.register(shutdown_logging)
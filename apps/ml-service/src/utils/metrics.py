@@ -0,0 +1,243 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Any, Sequence, Tuple
+
+# Request latency buckets (seconds)
+REQUEST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Pipeline stage latency buckets (seconds)
+STAGE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1
+)
+
+class Counter:
+    """Monotonically increasing counter with labels."""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter for a label combination."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        """Get the current value for a label combination."""
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+class Histogram:
+    """Bucketed latency histogram with labels."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label combination: [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for a label combination."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def get_count(self, *labels: str) -> int:
+        """Get the number of observations for a label combination."""
+        series = self._values.get(labels)
+        return series[2] if series else 0
+
+    def get_sum(self, *labels: str) -> float:
+        """Get the sum of observations for a label combination."""
+        series = self._values.get(labels)
+        return series[1] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(series[0]), series[1], series[2])
+                      for labels, series in self._values.items()]
+
+        lines = []
+        for labels, bucket_counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    self.labelnames + ('le',), labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every registered metric."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+registry = MetricsRegistry()
+
+REQUESTS_TOTAL = registry.counter(
+    'ml_http_requests_total',
+    'HTTP requests handled, by route, method and status code.',
+    ['route', 'method', 'status']
+)
+REQUEST_ERRORS_TOTAL = registry.counter(
+    'ml_http_request_errors_total',
+    'HTTP requests that failed with a 5xx status or an unhandled exception.',
+    ['route', 'method']
+)
+REQUEST_DURATION = registry.histogram(
+    'ml_http_request_duration_seconds',
+    'HTTP request latency, by route and method.',
+    ['route', 'method'],
+    REQUEST_BUCKETS
+)
+STAGE_DURATION = registry.histogram(
+    'ml_pipeline_stage_duration_seconds',
+    'Latency of individual analysis pipeline stages.',
+    ['pipeline', 'stage'],
+    STAGE_BUCKETS
+)
+
+class StageTimer:
+    """
+    Records consecutive pipeline stage durations with a monotonic clock.
+
+    Each ``mark`` observes the time elapsed since the previous mark (or since
+    the timer was created) under the given stage name.
+    """
+
+    __slots__ = ('pipeline', '_last')
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        STAGE_DURATION.observe(now - self._last, self.pipeline, stage)
+        self._last = now
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, errors and latency per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            route_path = _route_template(scope)
+            method = scope.get('method', '')
+            REQUEST_DURATION.observe(time.perf_counter() - start, route_path, method)
+            REQUESTS_TOTAL.inc(route_path, method, str(status_code))
+            if status_code >= 500:
+                REQUEST_ERRORS_TOTAL.inc(route_path, method)
+
+def _route_template(scope) -> str:
+    """
+    Label a request by its route template, never by raw path, to bound cardinality.
+
+    The template is the matched route's ``path_format`` under the ``root_path``
+    of the app it is mounted in. Routes of a router included with a prefix do
+    not carry that prefix, so routers set theirs with ``APIRouter(prefix=...)``.
+    """
+    route = scope.get('route')
+    path_format = getattr(route, 'path_format', None)
+    if path_format is None:
+        return 'unmatched'
+    return scope.get('root_path', '') + path_format
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
@@ -0,0 +1,77 @@
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Tuple
+from starlette.responses import StreamingResponse
+from utils.serialization import dumps, loads
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def iter_ndjson(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int
+) -> AsyncIterator[Tuple[Optional[Any], Optional[str]]]:
+    """
+    Decode newline-delimited JSON from a byte stream, one line at a time.
+
+    Only one partial line is buffered, so memory stays bounded by
+    ``max_line_bytes`` however large the stream is. Blank lines are skipped.
+
+    Args:
+        chunks: Byte chunks (e.g. ``Request.stream()``)
+        max_line_bytes: Longest accepted line; longer lines are skipped
+
+    Yields:
+        ``(value, None)`` for each decoded line, or ``(None, error)`` for a
+        line that is too long or is not valid JSON
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        # Split each chunk once; only its last, unfinished line is carried over
+        lines = (buffer + chunk if buffer else chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            if len(line) > max_line_bytes:
+                yield None, f"Line exceeds {max_line_bytes} bytes"
+                continue
+            if line.strip():
+                yield _decode(line)
+
+        if len(buffer) > max_line_bytes and not skipping:
+            # Drop the rest of an oversized line instead of buffering it
+            yield None, f"Line exceeds {max_line_bytes} bytes"
+            skipping = True
+        if skipping:
+            buffer = b""
+
+    if buffer.strip() and not skipping:
+        yield _decode(buffer)
+
+def encode_ndjson(records: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode records as NDJSON lines, each terminated by a newline."""
+    return b"".join(dumps(record) + b"\n" for record in records)
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body iterator may read the request body.
+
+    ``StreamingResponse`` consumes ``receive`` to watch for disconnects,
+    which would steal request body messages from an iterator that is still
+    reading the request; here disconnects surface through ``Request.stream``
+    instead. Each chunk is sent before the next one is produced, so a slow
+    client slows the producer down rather than growing a buffer.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _decode(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        return loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
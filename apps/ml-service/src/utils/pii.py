@@ -0,0 +1,60 @@
+import re
+from typing import Dict, List, Any
+
+# PII categories in the order they are tried at each position
+PII_CATEGORIES = ['ssn', 'credit_card', 'phone', 'email']
+
+# All PII patterns combined into one alternation, compiled once at import.
+# Digit-led patterns share a single lookahead so word starts without a digit
+# only try the email branch.
+PII_PATTERN = re.compile(
+    r'\b(?:'
+    r'(?=\d)(?:'
+    r'(?P<ssn>\d{3}-\d{2}-\d{4}\b)'
+    r'|(?P<credit_card>\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b)'
+    r'|(?P<phone>\d{3}[-.]?\d{3}[-.]?\d{4}\b)'
+    r')'
+    r'|(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r')'
+)
+
+def contains_pii(text: str) -> bool:
+    """
+    Check whether text contains any PII pattern.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        True if at least one PII pattern matches
+    """
+    return PII_PATTERN.search(text) is not None
+
+def detect_pii(text: str) -> List[Dict[str, Any]]:
+    """
+    Find PII in text with a single scan.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        Non-overlapping matches in order, each with ``category``, ``start``
+        and ``end`` offsets (matched values are never returned)
+    """
+    return [
+        {'category': match.lastgroup, 'start': match.start(), 'end': match.end()}
+        for match in PII_PATTERN.finditer(text)
+    ]
+
+def pii_categories(matches: List[Dict[str, Any]]) -> List[str]:
+    """
+    Get the distinct PII categories found, in ``PII_CATEGORIES`` order.
+
+    Args:
+        matches: Output of ``detect_pii``
+
+    Returns:
+        Category names
+    """
+    found = {match['category'] for match in matches}
+    return [category for category in PII_CATEGORIES if category in found]
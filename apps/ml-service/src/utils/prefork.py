@@ -0,0 +1,194 @@
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict
+from utils.logging import get_logger, shutdown_logging
+
+logger = get_logger(__name__)
+
+class PreforkSupervisor:
+    """
+    Forks worker processes that serve one shared listening socket, and keeps them running.
+
+    ``worker`` is called in each worker process with the socket and the
+    worker's index, and serves until signalled to stop.
+
+    Everything the master builds before ``run`` (the app, compiled lexicons,
+    memory-mapped models) is inherited by the workers copy-on-write. The
+    garbage collector is frozen right before each fork, so collections in the
+    workers never traverse (and thereby write to and un-share) the pages
+    holding those objects. For the most sharing, the caller disables the
+    collector before building them; workers re-enable it.
+
+    Workers that exit are restarted; one that keeps dying shortly after
+    starting is restarted with exponential backoff. SIGTERM or SIGINT stops
+    every worker gracefully, killing those still running after
+    ``graceful_timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[socket.socket, int], Any],
+        host: str,
+        port: int,
+        workers: int,
+        backlog: int = 2048,
+        graceful_timeout_seconds: float = 30.0,
+        min_uptime_seconds: float = 5.0,
+        max_backoff_seconds: float = 30.0
+    ):
+        self.worker = worker
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.backlog = backlog
+        self.graceful_timeout_seconds = graceful_timeout_seconds
+        self.min_uptime_seconds = min_uptime_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.restarts = 0
+        self._pids: Dict[int, int] = {}
+        self._started_at: Dict[int, float] = {}
+        self._failures: Dict[int, int] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> int:
+        """
+        Bind the socket, fork the workers and supervise them until stopped.
+
+        Returns:
+            Process exit code
+        """
+        sock = self._bind()
+        previous_handlers = {
+            signum: signal.signal(signum, self._request_stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        logger.info(
+            "Prefork server started",
+            pid=os.getpid(), host=self.host, port=self.port, workers=self.workers
+        )
+
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                for index in range(self.workers):
+                    if index not in self._pids and self._restart_at.get(index, 0.0) <= now:
+                        self._spawn(sock, index)
+                self._reap()
+                time.sleep(0.1)
+        finally:
+            self._stop_workers()
+            sock.close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        logger.info("Prefork server stopped", restarts=self.restarts)
+        return 0
+
+    def get_workers(self) -> Dict[int, int]:
+        """Get the pid of each running worker by index."""
+        return dict(self._pids)
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        return sock
+
+    def _spawn(self, sock: socket.socket, index: int) -> None:
+        # Objects allocated so far stay out of every worker's collections
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(sock, index)
+        self._pids[index] = pid
+        self._started_at[index] = time.monotonic()
+        logger.info("Worker started", index=index, pid=pid)
+
+    def _run_worker(self, sock: socket.socket, index: int) -> None:
+        """Body of a forked worker; never returns."""
+        code = 0
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            gc.enable()
+            self.worker(sock, index)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException as e:
+            logger.error(f"Worker failed: {e}", index=index, pid=os.getpid())
+            code = 1
+        finally:
+            # os._exit skips atexit, so write out queued log lines first
+            shutdown_logging()
+            os._exit(code)
+
+    def _reap(self) -> None:
+        """Collect exited workers and schedule their restarts."""
+        while self._pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = next((index for index, worker_pid in self._pids.items() if worker_pid == pid), None)
+            if index is None:
+                continue
+            del self._pids[index]
+            if self._stopping:
+                continue
+
+            uptime = time.monotonic() - self._started_at[index]
+            if uptime < self.min_uptime_seconds:
+                self._failures[index] = self._failures.get(index, 0) + 1
+            else:
+                self._failures[index] = 0
+            delay = 0.0
+            if self._failures[index]:
+                delay = min(0.5 * 2 ** (self._failures[index] - 1), self.max_backoff_seconds)
+            self._restart_at[index] = time.monotonic() + delay
+            self.restarts += 1
+            logger.warning(
+                "Worker exited, restarting",
+                index=index,
+                pid=pid,
+                exit_code=os.waitstatus_to_exitcode(status),
+                uptime_seconds=round(uptime, 3),
+                restart_delay_seconds=delay
+            )
+
+    def _request_stop(self, signum: int, frame: Any) -> None:
+        self._stopping = True
+
+    def _stop_workers(self) -> None:
+        """Ask every worker to finish, then kill the ones that do not in time."""
+        self._stopping = True
+        for pid in self._pids.values():
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout_seconds
+        while self._pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+
+        for index, pid in list(self._pids.items()):
+            logger.warning("Worker did not stop in time, killing it", index=index, pid=pid)
+            self._signal(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            del self._pids[index]
+
+    @staticmethod
+    def _signal(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
@@ -1,6 +1,206 @@
+import os
+import threading
+from contextvars import ContextVar
 import numpy as np
-from typing import Dict, Any, Union
+from typing import Dict, List, Any, Optional, Tuple
 from config import settings
+from utils.metrics import registry
+
+EPSILON_SPENT_TOTAL = registry.counter(
+    'ml_privacy_epsilon_spent_total',
+    'Differential privacy budget (epsilon) spent on released results.'
+)
+RELEASES_TOTAL = registry.counter(
+    'ml_privacy_releases_total',
+    'Results released with differential privacy noise.'
+)
+
+class PrivacyBudgetExceeded(ValueError):
+    """Raised when a release would spend more epsilon than the budget has left."""
+
+class PrivacyBudget:
+    """
+    Epsilon budget for one request.
+
+    Releases made while the budget is active (see ``open_budget``) are
+    charged against it under sequential composition.
+    """
+
+    def __init__(self, epsilon: float):
+        self.epsilon = epsilon
+        self.spent = 0.0
+        self.releases = 0
+
+    @property
+    def remaining(self) -> float:
+        return max(self.epsilon - self.spent, 0.0)
+
+    def charge(self, epsilon: float) -> None:
+        """
+        Record a release costing ``epsilon``.
+
+        Raises:
+            PrivacyBudgetExceeded: If the release does not fit in the remaining budget
+        """
+        if epsilon > self.remaining + 1e-12:
+            raise PrivacyBudgetExceeded(
+                f"Release needs epsilon {epsilon:g} but only {self.remaining:g} remains"
+            )
+        self.spent += epsilon
+        self.releases += 1
+
+_current_budget: ContextVar[Optional[PrivacyBudget]] = ContextVar('privacy_budget', default=None)
+
+def open_budget(epsilon: Optional[float] = None) -> PrivacyBudget:
+    """
+    Start a privacy budget for the current request (task context).
+
+    Args:
+        epsilon: Total epsilon the request may spend (defaults to settings.privacy_epsilon)
+
+    Returns:
+        The active budget
+    """
+    budget = PrivacyBudget(settings.privacy_epsilon if epsilon is None else epsilon)
+    _current_budget.set(budget)
+    return budget
+
+def current_budget() -> Optional[PrivacyBudget]:
+    """Get the budget of the current request, if one was opened."""
+    return _current_budget.get()
+
+class PrivacyEngine:
+    """
+    Laplace mechanism over every numeric leaf of analysis results.
+
+    Numeric values (nested in dicts, and lists of numbers) are flattened into
+    one array, noised with a single draw and written back into a copy of the
+    result, clamped to [0, 1]. By default ``epsilon`` applies to each leaf
+    (noise scale ``sensitivity / epsilon``), so the noise on a score does not
+    depend on how many other scores the result has. With ``split_epsilon`` a
+    release's epsilon is split evenly across its leaves instead, so the
+    release as a whole costs exactly ``epsilon`` at the price of noise that
+    grows with the leaf count. Each thread (and each forked worker process)
+    draws from its own Generator.
+    """
+
+    def __init__(self, sensitivity: float = 1.0, seed: Optional[int] = None, split_epsilon: bool = False):
+        self.sensitivity = sensitivity
+        self.split_epsilon = split_epsilon
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._seed_lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def privatize(self, data: Dict[str, Any], epsilon: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Noise one analysis result.
+
+        Args:
+            data: Dictionary containing analysis results
+            epsilon: Privacy parameter per score, or for the whole result with split_epsilon (smaller = more private)
+
+        Returns:
+            Privacy-protected copy of the data
+
+        Raises:
+            PrivacyBudgetExceeded: If the request's budget cannot cover ``epsilon``
+        """
+        return self.privatize_batch([data], epsilon)[0]
+
+    def privatize_batch(
+        self,
+        results: List[Optional[Dict[str, Any]]],
+        epsilon: Optional[float] = None,
+        charge: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Noise a batch of analysis results with one random draw.
+
+        Each result is computed from a different input, so under parallel
+        composition the batch costs ``epsilon`` once, and every result gets
+        the full ``epsilon`` (split across its own leaves with ``split_epsilon``).
+
+        Args:
+            results: Analysis results; None entries (failed items) are kept as None
+            epsilon: Privacy parameter per result (smaller = more private)
+            charge: False for later parts of a release already charged, such as
+                further chunks of one stream of distinct inputs
+
+        Returns:
+            Privacy-protected copies, in input order
+
+        Raises:
+            PrivacyBudgetExceeded: If the request's budget cannot cover ``epsilon``
+        """
+        if epsilon is None:
+            epsilon = settings.privacy_epsilon
+
+        budget = current_budget()
+        if budget is not None and charge:
+            budget.charge(epsilon)
+
+        slots: List[Tuple[Any, Any]] = []
+        values: List[float] = []
+        scales: List[float] = []
+        protected = []
+        for data in results:
+            if data is None:
+                protected.append(None)
+                continue
+            first_leaf = len(values)
+            protected.append(_collect_leaves(data, slots, values))
+            leaves = len(values) - first_leaf
+            scale = self.sensitivity * leaves / epsilon if self.split_epsilon else self.sensitivity / epsilon
+            scales.extend([scale] * leaves)
+
+        if values:
+            noised = np.asarray(values, dtype=np.float64)
+            noised += self._generator().laplace(0.0, 1.0, len(values)) * np.asarray(scales)
+            np.clip(noised, 0.0, 1.0, out=noised)
+            for (container, key), value in zip(slots, noised.tolist()):
+                container[key] = value
+
+        if charge:
+            EPSILON_SPENT_TOTAL.inc(amount=epsilon)
+        RELEASES_TOTAL.inc(amount=len(results))
+        return protected
+
+    def _generator(self) -> np.random.Generator:
+        local = self._local
+        pid = os.getpid()
+        if getattr(local, 'pid', None) != pid:
+            with self._seed_lock:
+                child = self._seed_sequence.spawn(1)[0]
+            if pid != self._pid:
+                # Forked workers inherit identical seed state; the pid keeps their streams apart
+                child = np.random.SeedSequence(child.entropy, spawn_key=child.spawn_key + (pid,))
+            local.generator = np.random.default_rng(child)
+            local.pid = pid
+        return local.generator
+
+def _collect_leaves(data: Dict[str, Any], slots: List[Tuple[Any, Any]], values: List[float]) -> Dict[str, Any]:
+    """Copy ``data`` recording where each numeric leaf lives in the copy."""
+    copied = dict(data)
+    for key, value in copied.items():
+        if _is_number(value):
+            slots.append((copied, key))
+            values.append(value)
+        elif isinstance(value, dict):
+            copied[key] = _collect_leaves(value, slots, values)
+        elif isinstance(value, list) and value and all(_is_number(item) for item in value):
+            items = copied[key] = list(value)
+            slots.extend((items, index) for index in range(len(items)))
+            values.extend(items)
+    return copied
+
+def _is_number(value: Any) -> bool:
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        return True
+    return value_type is not bool and isinstance(value, (int, float, np.number))
+
+privacy_engine = PrivacyEngine(split_epsilon=settings.privacy_split_epsilon)
 
 def apply_differential_privacy(
     data: Dict[str, Any], 
@@ -11,38 +211,30 @@ def apply_differential_privacy(
     
     Args:
         data: Dictionary containing analysis results
-        epsilon: Privacy parameter (smaller = more private)
+        epsilon: Privacy parameter per score, or for the whole result with split_epsilon (smaller = more private)
     
     Returns:
         Privacy-protected data with added noise
     """
-    if epsilon is None:
-        epsilon = settings.privacy_epsilon
-    
-    # Create a copy to avoid modifying original data
-    protected_data = data.copy()
+    return privacy_engine.privatize(data, epsilon)
+
+def apply_differential_privacy_batch(
+    results: List[Optional[Dict[str, Any]]],
+    epsilon: float = None,
+    charge: bool = True
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Apply differential privacy to a batch of analysis results at once.
     
-    # Add Laplace noise to numerical values
-    for key, value in protected_data.items():
-        if isinstance(value, (int, float)):
-            # Calculate sensitivity (max change in output for unit change in input)
-            sensitivity = 1.0  # Conservative estimate
-            
-            # Add Laplace noise
-            noise = np.random.laplace(0, sensitivity / epsilon)
-            protected_data[key] = max(0, min(1, value + noise))  # Clamp to [0,1]
-            
-        elif isinstance(value, dict):
-            # Recursively apply to nested dictionaries
-            protected_data[key] = apply_differential_privacy(value, epsilon)
-            
-        elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], (int, float)):
-            # Apply noise to numerical lists
-            sensitivity = 1.0
-            noise = np.random.laplace(0, sensitivity / epsilon, len(value))
-            protected_data[key] = [max(0, min(1, v + n)) for v, n in zip(value, noise)]
+    Args:
+        results: Analysis results; None entries are kept as None
+        epsilon: Privacy parameter per result (smaller = more private)
+        charge: Whether to charge ``epsilon`` to the request's budget
     
-    return protected_data
+    Returns:
+        Privacy-protected results, in input order
+    """
+    return privacy_engine.privatize_batch(results, epsilon, charge)
 
 def anonymize_features(features: Dict[str, Any]) -> Dict[str, Any]:
     """
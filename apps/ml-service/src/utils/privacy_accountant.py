@@ -0,0 +1,282 @@
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple
+from fastapi import HTTPException
+from utils.cache import create_redis_client
+from utils.logging import get_logger
+from utils.metrics import registry
+from config import settings
+
+logger = get_logger(__name__)
+
+CACHED_ANSWERS_TOTAL = registry.counter(
+    'ml_privacy_cached_answers_total',
+    'Noised answers re-served because the user privacy budget was exhausted.'
+)
+BUDGET_EXHAUSTED_TOTAL = registry.counter(
+    'ml_privacy_budget_exhausted_total',
+    'Requests refused because the user privacy budget was exhausted and no answer was cached.'
+)
+
+# Answer bucket of queries made without a user ID
+ANONYMOUS_USER = "anonymous"
+
+# How queries without a user ID are answered (see PrivacyAccountant)
+ANONYMOUS_POLICIES = ('answer_once', 'unaccounted')
+
+class PrivacyAccountant:
+    """
+    Cumulative per-user epsilon accounting over fixed time windows.
+
+    Every noised release for a user is charged against ``user_budget``
+    epsilon for the current window of ``window_seconds``. Once the budget is
+    spent, a query that was already answered in the window gets the same
+    noised answer again, which reveals nothing new and skips the analysis;
+    new queries are refused with 429 until the window rolls over. A release
+    that fails is refunded.
+
+    Queries without a user ID are about no one whose spend can be tracked,
+    so they are not capped. With the ``answer_once`` policy each distinct
+    query gets one fresh release per window and repeats get that same
+    answer, so repeating a query to average out the noise reveals nothing
+    new; ``unaccounted`` releases afresh every time (benchmarks, or callers
+    whose anonymous input is not user data).
+
+    Spend and answers live in process memory; with ``redis_client`` (any
+    client exposing the ``redis.asyncio`` API) they are shared between
+    workers and replicas, with Redis failures falling back to local state.
+    """
+
+    def __init__(
+        self,
+        user_budget: float = 10.0,
+        anonymous_policy: str = 'answer_once',
+        window_seconds: int = 86400,
+        max_answers: int = 10000,
+        redis_client: Optional[Any] = None,
+        namespace: str = "privacy",
+        clock: Callable[[], float] = time.time
+    ):
+        if anonymous_policy not in ANONYMOUS_POLICIES:
+            raise ValueError(f"Unknown anonymous privacy policy: {anonymous_policy}")
+        self.user_budget = user_budget
+        self.anonymous_policy = anonymous_policy
+        self.window_seconds = window_seconds
+        self.max_answers = max_answers
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.clock = clock
+        self._window: Optional[int] = None
+        self._spent: Dict[str, float] = {}
+        self._answers: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._stats = {
+            'charged': 0, 'refunded': 0, 'cached_answers': 0, 'anonymous_repeats': 0,
+            'exhausted': 0, 'redis_errors': 0
+        }
+
+    @staticmethod
+    def make_key(kind: str, *parts: str) -> str:
+        """
+        Identify a query whose noised answer can be re-served.
+
+        Args:
+            kind: Kind of answer (e.g. "text")
+            *parts: Query inputs
+
+        Returns:
+            Hex digest of the query
+        """
+        return hashlib.sha256("\0".join((kind,) + parts).encode("utf-8")).hexdigest()
+
+    async def answer(
+        self,
+        user_id: Optional[str],
+        query_key: str,
+        epsilon: float,
+        release: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Produce a noised answer within the user's budget.
+
+        Args:
+            user_id: User the query is about; None applies the anonymous policy
+            query_key: Query identifier from ``make_key``
+            epsilon: Cost of a fresh release
+            release: Coroutine function computing and noising a fresh answer
+
+        Returns:
+            A fresh noised answer, or the cached one once the budget is exhausted
+
+        Raises:
+            HTTPException: 429 with Retry-After when the user's budget is
+                exhausted and the query has no cached answer
+        """
+        window = self._current_window()
+        if user_id is None:
+            return await self._answer_anonymous(window, query_key, release)
+
+        if await self._charge(user_id, window, epsilon):
+            try:
+                result = await release()
+            except BaseException:
+                # Nothing was released, so nothing was spent
+                await self._refund(user_id, window, epsilon)
+                raise
+            await self._remember(user_id, window, query_key, result)
+            return result
+
+        cached = await self._cached_answer(user_id, window, query_key)
+        if cached is not None:
+            self._stats['cached_answers'] += 1
+            CACHED_ANSWERS_TOTAL.inc()
+            return cached
+
+        self._stats['exhausted'] += 1
+        BUDGET_EXHAUSTED_TOTAL.inc()
+        retry_after = int((window + 1) * self.window_seconds - self.clock()) + 1
+        raise HTTPException(
+            status_code=429,
+            detail="Privacy budget exhausted for this user, retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def get_spent(self, user_id: str) -> float:
+        """Get the epsilon a user has spent in the current window."""
+        window = self._current_window()
+        if self.redis_client is not None:
+            try:
+                spent = await self.redis_client.get(self._redis_key('spent', window, user_id))
+                return float(spent or 0.0)
+            except Exception as e:
+                self._redis_failed("lookup", e)
+        return self._spent.get(user_id, 0.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get accounting counters and local state sizes."""
+        return {
+            **self._stats,
+            'user_budget': self.user_budget,
+            'anonymous_policy': self.anonymous_policy,
+            'window_seconds': self.window_seconds,
+            'tracked_users': len(self._spent),
+            'cached_answer_count': len(self._answers),
+            'redis_enabled': self.redis_client is not None,
+        }
+
+    def _current_window(self) -> int:
+        window = int(self.clock() // self.window_seconds)
+        if window != self._window:
+            # Budgets reset with the window, and so do the answers they paid for
+            self._window = window
+            self._spent.clear()
+            self._answers.clear()
+        return window
+
+    async def _answer_anonymous(
+        self,
+        window: int,
+        query_key: str,
+        release: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        if self.anonymous_policy == 'unaccounted':
+            return await release()
+
+        cached = await self._cached_answer(ANONYMOUS_USER, window, query_key)
+        if cached is not None:
+            self._stats['anonymous_repeats'] += 1
+            return cached
+        result = await release()
+        await self._remember(ANONYMOUS_USER, window, query_key, result)
+        return result
+
+    async def _charge(self, user_id: str, window: int, epsilon: float) -> bool:
+        budget = self.user_budget
+        if self.redis_client is not None:
+            key = self._redis_key('spent', window, user_id)
+            try:
+                pipeline = self.redis_client.pipeline(transaction=True)
+                pipeline.incrbyfloat(key, epsilon)
+                pipeline.expire(key, self.window_seconds)
+                spent, _ = await pipeline.execute()
+                if float(spent) <= budget + 1e-9:
+                    self._spent[user_id] = float(spent)
+                    self._stats['charged'] += 1
+                    return True
+                await self.redis_client.incrbyfloat(key, -epsilon)
+                return False
+            except Exception as e:
+                self._redis_failed("charge", e)
+
+        spent = self._spent.get(user_id, 0.0) + epsilon
+        if spent > budget + 1e-9:
+            return False
+        self._spent[user_id] = spent
+        self._stats['charged'] += 1
+        return True
+
+    async def _refund(self, user_id: str, window: int, epsilon: float) -> None:
+        self._stats['refunded'] += 1
+        if self.redis_client is not None:
+            try:
+                spent = await self.redis_client.incrbyfloat(self._redis_key('spent', window, user_id), -epsilon)
+                self._spent[user_id] = float(spent)
+                return
+            except Exception as e:
+                self._redis_failed("refund", e)
+
+        self._spent[user_id] = max(self._spent.get(user_id, 0.0) - epsilon, 0.0)
+
+    async def _remember(self, user_id: str, window: int, query_key: str, result: Dict[str, Any]) -> None:
+        self._answers[(user_id, query_key)] = copy.deepcopy(result)
+        self._answers.move_to_end((user_id, query_key))
+        while len(self._answers) > self.max_answers:
+            self._answers.popitem(last=False)
+
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(
+                    self._redis_key('answer', window, user_id, query_key),
+                    json.dumps(result),
+                    ex=self.window_seconds
+                )
+            except Exception as e:
+                self._redis_failed("store", e)
+
+    async def _cached_answer(self, user_id: str, window: int, query_key: str) -> Optional[Dict[str, Any]]:
+        cached = self._answers.get((user_id, query_key))
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        if self.redis_client is not None:
+            try:
+                payload = await self.redis_client.get(self._redis_key('answer', window, user_id, query_key))
+            except Exception as e:
+                self._redis_failed("lookup", e)
+                return None
+            if payload is not None:
+                return json.loads(payload)
+        return None
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self._stats['redis_errors'] += 1
+        logger.warning(f"Privacy accountant Redis {operation} failed: {error}")
+
+    def _redis_key(self, kind: str, window: int, *parts: str) -> str:
+        return ":".join(("ml", self.namespace, kind, str(window)) + parts)
+
+def create_privacy_accountant() -> PrivacyAccountant:
+    """Build the per-user privacy accountant from settings."""
+    redis_client = None
+    if settings.privacy_accountant_use_redis:
+        redis_client = create_redis_client(settings.redis_url)
+
+    return PrivacyAccountant(
+        user_budget=settings.privacy_user_budget,
+        anonymous_policy=settings.privacy_anonymous_policy,
+        window_seconds=settings.privacy_budget_window_seconds,
+        max_answers=settings.privacy_answer_cache_size,
+        redis_client=redis_client
+    )
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Callable, Awaitable, Optional
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+class PeriodicTask:
+    """Runs a coroutine function on a fixed interval on the running event loop."""
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the loop; a non-positive interval disables the task."""
+        if self.interval_seconds <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Stop the loop, waiting for a run in progress to be cancelled."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.func()
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {e}")
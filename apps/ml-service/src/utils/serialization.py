@@ -0,0 +1,93 @@
+import json
+from typing import Any, Dict
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+# orjson encodes several times faster than the standard library; without it
+# the same output is produced with ``json``
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON, including numpy scalars and arrays."""
+    if orjson is not None:
+        return orjson.dumps(value, option=ORJSON_OPTIONS)
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+def loads(data: Any) -> Any:
+    """Decode JSON from bytes or str; raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with ``dumps``.
+
+    Routes return it directly for output that already has the documented
+    types: FastAPI sends a returned response as is, so the content is
+    encoded once, without response model validation or ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+async def parse_json_body(request: Request, adapter: TypeAdapter) -> Any:
+    """
+    Parse and validate a JSON request body in one pass.
+
+    Validating the raw bytes with a ``TypeAdapter`` skips building the
+    intermediate Python objects FastAPI decodes the body into, and an adapter
+    over TypedDicts returns plain dicts instead of model instances.
+
+    Raises:
+        RequestValidationError: Invalid JSON or a body not matching the
+            adapter's type, reported like FastAPI's own body errors (422)
+    """
+    body = await request.body()
+    try:
+        return adapter.validate_json(body)
+    except ValidationError as e:
+        errors = [
+            {**error, 'loc': ('body', *error['loc'])}
+            for error in e.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=body)
+
+def json_body_schema(adapter: TypeAdapter) -> Dict[str, Any]:
+    """
+    OpenAPI ``requestBody`` for a route that parses its body with ``parse_json_body``.
+
+    Pass as the route's ``openapi_extra={"requestBody": ...}``.
+    """
+    schema = adapter.json_schema()
+    definitions = schema.pop('$defs', {})
+    return {
+        'required': True,
+        'content': {'application/json': {'schema': _inline_refs(schema, definitions)}},
+    }
+
+def _inline_refs(schema: Any, definitions: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get('$ref')
+        if isinstance(ref, str) and ref.startswith('#/$defs/'):
+            return _inline_refs(definitions[ref[len('#/$defs/'):]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(value, definitions) for value in schema]
+    return schema
+
+def _default(value: Any) -> Any:
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -2,6 +2,7 @@ import re
 from typing import List, Optional
 from fastapi import HTTPException
 from config import settings
+from utils.pii import detect_pii, pii_categories
 
 def validate_text_input(text: str) -> None:
     """
@@ -22,20 +23,16 @@ def validate_text_input(text: str) -> None:
             detail=f"Text exceeds maximum length of {settings.max_text_length} characters"
         )
     
-    # Check for potential PII patterns
-    pii_patterns = [
-        r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
-        r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b',  # Credit card
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Email
-        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # Phone number
-    ]
-    
-    for pattern in pii_patterns:
-        if re.search(pattern, text):
-            raise HTTPException(
-                status_code=400, 
-                detail="Text appears to contain personally identifiable information"
+    # Check for potential PII patterns (single combined scan)
+    pii_matches = detect_pii(text)
+    if pii_matches:
+        raise HTTPException(
+            status_code=400, 
+            detail=(
+                "Text appears to contain personally identifiable information "
+                f"({', '.join(pii_categories(pii_matches))})"
             )
+        )
 
 def validate_user_id(user_id: str) -> None:
     """
@@ -0,0 +1,58 @@
+import os
+import re
+import shutil
+import time
+from typing import Callable, Optional
+
+def publish_directory(path: str, write: Callable[[str], None]) -> str:
+    """
+    Atomically replace the directory at ``path`` with one filled by ``write``.
+
+    ``write`` fills a fresh sibling version directory; ``path`` is then a
+    symlink switched to it with one ``os.replace``, so readers that resolve
+    ``path`` once (``os.path.realpath``) see either the old or the new files,
+    never a mix and never nothing. The version ``path`` pointed to before is
+    kept for readers that resolved it just before the switch; older versions
+    are removed. A plain directory at ``path`` (written before versioning) is
+    moved aside as the previous version first.
+
+    Args:
+        path: Directory path readers use
+        write: Callable filling the directory it is given
+
+    Returns:
+        The new version directory
+    """
+    parent, name = os.path.split(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    version_dir = _new_version_dir(parent, name)
+    os.makedirs(version_dir)
+    try:
+        write(version_dir)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+    previous: Optional[str] = None
+    if os.path.islink(path):
+        previous = os.path.realpath(path)
+    elif os.path.isdir(path):
+        previous = _new_version_dir(parent, name)
+        os.replace(path, previous)
+
+    link = version_dir + '.link'
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, path)
+
+    pattern = re.compile(r'\.' + re.escape(name) + r'\.v\d+(\.link)?$')
+    for entry in os.listdir(parent):
+        stale = os.path.join(parent, entry)
+        if pattern.match(entry) and stale not in (version_dir, previous):
+            if os.path.isdir(stale) and not os.path.islink(stale):
+                shutil.rmtree(stale, ignore_errors=True)
+            else:
+                os.remove(stale)
+    return version_dir
+
+def _new_version_dir(parent: str, name: str) -> str:
+    return os.path.join(parent, f".{name}.v{time.time_ns()}")
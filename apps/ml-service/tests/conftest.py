@@ -0,0 +1,13 @@
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api import get_analyzers
+
+@pytest.fixture(scope="session", autouse=True)
+def service_analyzers():
+    """Build the app's analyzers up front, as the lifespan hook does in production."""
+    return get_analyzers()
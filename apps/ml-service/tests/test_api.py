@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import asyncio
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -67,6 +68,43 @@ class TestTextAnalysis:
         response = client.post("/api/v1/analyze-text", json=request_data)
         assert response.status_code == 400
 
+class TestBatchTextAnalysis:
+    def test_analyze_text_batch_success(self):
+        """Test batch analysis returns one result per text."""
+        request_data = {
+            "texts": ["I'm feeling good about my exam!", "So tired, no sleep this week"],
+            "user_id": "test-user-123"
+        }
+        
+        response = client.post("/api/v1/analyze-text/batch", json=request_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["results"]) == 2
+        assert data["errors"] == []
+        assert "sentiment" in data["results"][0]
+        assert "processing_time_ms" in data
+
+    def test_analyze_text_batch_item_errors(self):
+        """Test invalid items are reported without failing the batch."""
+        request_data = {
+            "texts": ["A normal post", "", "Email me at someone@example.com"]
+        }
+        
+        response = client.post("/api/v1/analyze-text/batch", json=request_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"][0] is not None
+        assert data["results"][1] is None
+        assert data["results"][2] is None
+        assert [error["index"] for error in data["errors"]] == [1, 2]
+
+    def test_analyze_text_batch_empty(self):
+        """Test batch analysis rejects an empty batch."""
+        response = client.post("/api/v1/analyze-text/batch", json={"texts": []})
+        assert response.status_code == 422
+
 class TestBehaviorAnalysis:
     @patch('pipelines.behavior.analyzer.BehaviorAnalyzer')
     def test_analyze_behavior_success(self, mock_analyzer):
@@ -139,6 +177,57 @@ class TestStressScoring:
         assert "recommendations" in data
         assert "processing_time_ms" in data
 
+class TestAssessment:
+    def test_assess_combined_pipeline(self):
+        """Test one call returns text, behavior and stress outputs."""
+        request_data = {
+            "user_id": "123e4567-e89b-12d3-a456-426614174000",
+            "text": "So stressed, too much work and no sleep before finals",
+            "activity_data": {"posts_count": 2, "hourly_activity": {"1": 5, "14": 2}}
+        }
+        
+        with patch('api.apply_differential_privacy', side_effect=lambda data, epsilon: data):
+            response = client.post("/api/v1/assess", json=request_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "stress_indicators" in data["text_analysis"]
+        assert "activity_score" in data["behavior_analysis"]
+        
+        from api import stress_scorer
+        expected = asyncio.run(stress_scorer.calculate_score(
+            request_data["user_id"],
+            text_features=data["text_analysis"],
+            behavior_features=data["behavior_analysis"]
+        ))
+        assert data["stress"] == expected
+
+    def test_assess_text_only(self):
+        """Test assessment with only text input."""
+        request_data = {
+            "user_id": "123e4567-e89b-12d3-a456-426614174000",
+            "text": "Feeling great today"
+        }
+        
+        response = client.post("/api/v1/assess", json=request_data)
+        
+        assert response.status_code == 200
+        assert response.json()["behavior_analysis"] is None
+
+    def test_assess_requires_input(self):
+        """Test assessment rejects requests with neither text nor activity data."""
+        response = client.post(
+            "/api/v1/assess", json={"user_id": "123e4567-e89b-12d3-a456-426614174000"}
+        )
+        assert response.status_code == 400
+
+    def test_assess_invalid_user_id(self):
+        """Test assessment validates the user ID."""
+        response = client.post(
+            "/api/v1/assess", json={"user_id": "not-a-uuid", "text": "Hello"}
+        )
+        assert response.status_code == 400
+
 class TestModelInfo:
     def test_model_info(self):
         """Test model info endpoint."""
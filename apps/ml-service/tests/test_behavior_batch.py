@@ -0,0 +1,93 @@
+import pytest
+import asyncio
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipelines.behavior.analyzer import BehaviorAnalyzer
+from pipelines.behavior.batch import ActivityBatch, ANOMALY_FLAGS, results_to_records
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+SAMPLE_RECORDS = [
+    {
+        'posts_count': 5,
+        'comments_count': 10,
+        'reactions_count': 15,
+        'messages_count': 8,
+        'login_frequency': 5,
+        'avg_session_duration': 45,
+        'hourly_activity': {'9': 4, '14': 6, '23': 1},
+        'daily_activity': {'0': 3, '1': 4, '2': 2, '5': 1},
+        'recent_activity': [4, 5, 6, 8, 9],
+    },
+    {
+        'posts_count': 8,
+        'comments_count': 0,
+        'hourly_activity': {'0': 5, '1': 4, '2': 3, '15': 1},
+        'recent_activity': [10, 9, 8, 1, 0, 0],
+        'daily_posts': [1, 1, 1, 1, 2, 6, 5],
+        'session_durations': [20, 25, 20, 90, 120, 100],
+    },
+    {
+        'daily_activity': {'3': 2},
+        'recent_activity': [1, 2],
+        'session_durations': [60, 50, 70, 5, 4, 6],
+    },
+    {},
+]
+
+class TestBehaviorAnalyzeMany:
+    def setup_method(self):
+        self.analyzer = BehaviorAnalyzer()
+
+    def test_matches_single_user_analysis(self):
+        """Test columnar results match per-user analysis."""
+        batch = ActivityBatch.from_records(SAMPLE_RECORDS)
+        records = results_to_records(self.analyzer.analyze_many(batch))
+
+        for activity_data, record in zip(SAMPLE_RECORDS, records):
+            expected = asyncio.run(self.analyzer.analyze(TEST_USER_ID, activity_data, 7))
+            assert record['activity_score'] == pytest.approx(expected['activity_score'])
+            assert record['rhythm_changes'] == pytest.approx(expected['rhythm_changes'])
+            assert record['engagement_trend'] == expected['engagement_trend']
+            assert record['anomaly_flags'] == expected['anomaly_flags']
+
+    def test_flags_matrix_columns(self):
+        """Test anomaly flags are returned as a boolean matrix."""
+        batch = ActivityBatch.from_records(SAMPLE_RECORDS)
+        results = self.analyzer.analyze_many(batch)
+
+        flags = results['anomaly_flags']
+        assert flags.shape == (len(SAMPLE_RECORDS), len(ANOMALY_FLAGS))
+        assert flags.dtype == np.bool_
+        assert flags[1, ANOMALY_FLAGS.index('sudden_activity_drop')]
+        assert flags[2, ANOMALY_FLAGS.index('shortened_session_duration')]
+
+    def test_closed_form_slope(self):
+        """Test the engagement slope matches a least-squares fit."""
+        batch = ActivityBatch.from_records(SAMPLE_RECORDS)
+        results = self.analyzer.analyze_many(batch)
+
+        expected = np.polyfit(np.arange(5), SAMPLE_RECORDS[0]['recent_activity'], 1)[0]
+        assert results['engagement_slope'][0] == pytest.approx(expected)
+        assert results['engagement_slope'][2] == 0.0
+
+    def test_rejects_bad_shapes(self):
+        """Test shape validation of columnar inputs."""
+        with pytest.raises(ValueError):
+            ActivityBatch(
+                counts={},
+                hourly_activity=np.zeros((2, 12)),
+                daily_activity=np.zeros((2, 7)),
+                recent_activity=np.zeros((2, 0)),
+                daily_posts=np.zeros((2, 0)),
+                session_durations=np.zeros((2, 0)),
+            )
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,311 @@
+import pytest
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipelines.behavior.state import BehaviorStateStore, STATE_LAYOUT
+from unittest.mock import patch
+from pipelines.behavior.analyzer import BehaviorAnalyzer, UnknownUserError, RECORD_CHUNK_SIZE
+from main import app
+
+client = TestClient(app)
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+START = datetime(2026, 3, 2, 12)  # A Monday
+
+def daily_events(counts, event_type='post'):
+    """Build events with ``counts[i]`` events on day i."""
+    return [
+        {'user_id': TEST_USER_ID, 'event_type': event_type, 'timestamp': START + timedelta(days=day, minutes=n)}
+        for day, count in enumerate(counts)
+        for n in range(count)
+    ]
+
+class TestBehaviorStateStore:
+    def test_windows_expire_old_days(self):
+        """Test days leave each rolling window as time advances."""
+        store = BehaviorStateStore()
+        for day in range(10):
+            store.record(TEST_USER_ID, 'post', START + timedelta(days=day))
+
+        as_of = (START + timedelta(days=9)).toordinal()
+        assert store.window_stats(TEST_USER_ID, 1, as_of)['counts']['posts_count'] == 1
+        assert store.window_stats(TEST_USER_ID, 7, as_of)['counts']['posts_count'] == 7
+        assert store.window_stats(TEST_USER_ID, 14, as_of)['counts']['posts_count'] == 10
+
+        later = store.window_stats(TEST_USER_ID, 7, as_of + 5)
+        assert later['counts']['posts_count'] == 2
+
+    def test_running_statistics_match_direct_computation(self):
+        """Test the running power sums reproduce mean, std and slope."""
+        counts = [3, 0, 5, 2, 8, 1, 4, 6, 0, 7]
+        store = BehaviorStateStore()
+        for day, count in enumerate(counts):
+            for n in range(count):
+                store.record(TEST_USER_ID, 'comment', START + timedelta(days=day, minutes=n))
+
+        stats = store.window_stats(TEST_USER_ID, 14, (START + timedelta(days=9)).toordinal())
+
+        assert stats['days'] == 10
+        assert stats['activity_mean'] == pytest.approx(np.mean(counts))
+        assert stats['activity_std'] == pytest.approx(np.std(counts))
+        assert stats['engagement_slope'] == pytest.approx(np.polyfit(np.arange(10), counts, 1)[0])
+
+    def test_out_of_order_and_stale_events(self):
+        """Test late events update past days and too-old events are dropped."""
+        store = BehaviorStateStore()
+        store.record(TEST_USER_ID, 'post', START + timedelta(days=40))
+
+        assert store.record(TEST_USER_ID, 'post', START + timedelta(days=38))
+        assert not store.record(TEST_USER_ID, 'post', START)
+        assert store.window_stats(TEST_USER_ID, 7)['counts']['posts_count'] == 2
+
+    def test_session_baseline(self):
+        """Test older sessions feed the Welford baseline."""
+        store = BehaviorStateStore()
+        for minutes in [10, 20, 30, 100, 100, 100]:
+            store.record(TEST_USER_ID, 'session_end', START, minutes)
+
+        stats = store.window_stats(TEST_USER_ID, 7)
+        assert stats['recent_sessions'] == [100, 100, 100]
+        assert stats['baseline_sessions'] == 3
+        assert stats['baseline_session_mean'] == pytest.approx(20)
+        assert stats['baseline_session_std'] == pytest.approx(np.std([10, 20, 30]))
+
+    def test_invalid_events_leave_no_state(self):
+        """Test invalid events are rejected before creating state."""
+        store = BehaviorStateStore()
+
+        with pytest.raises(ValueError):
+            store.record(TEST_USER_ID, 'logout', START)
+        with pytest.raises(ValueError):
+            store.record(TEST_USER_ID, 'session_end', START)
+
+        assert len(store) == 0
+
+    def test_users_are_isolated_across_growth(self):
+        """Test rows stay per user as the arrays grow past their capacity."""
+        store = BehaviorStateStore(capacity=2)
+        user_ids = [f"00000000-0000-4000-8000-{n:012d}" for n in range(5)]
+        for n, user_id in enumerate(user_ids):
+            for _ in range(n + 1):
+                store.record(user_id, 'message', START)
+
+        assert store.capacity >= 5
+        for n, user_id in enumerate(user_ids):
+            assert store.window_stats(user_id, 1)['counts']['messages_count'] == n + 1
+        with pytest.raises(KeyError):
+            store.window_stats(TEST_USER_ID, 7)
+
+    def test_memory_stats(self):
+        """Test memory reporting accounts for the fixed-width state per user."""
+        store = BehaviorStateStore(capacity=4)
+        store.record(TEST_USER_ID, 'post', START)
+
+        stats = store.memory_stats()
+        expected = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for shape, dtype, _ in STATE_LAYOUT.values())
+        assert stats['users'] == 1
+        assert stats['state_bytes_per_user'] == expected
+        assert stats['allocated_state_bytes'] == 4 * expected
+        assert stats['bytes_per_user'] > stats['allocated_state_bytes']
+
+class TestSnapshots:
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test a reloaded snapshot reproduces the state and keeps accepting events."""
+        store = BehaviorStateStore()
+        for day, count in enumerate([3, 0, 5, 2, 8]):
+            for n in range(count):
+                store.record(TEST_USER_ID, 'post', START + timedelta(days=day, minutes=n))
+        for minutes in [10, 20, 30, 40]:
+            store.record(TEST_USER_ID, 'session_end', START, minutes)
+        directory = str(tmp_path / "state")
+        store.save_snapshot(directory)
+        store.save_snapshot(directory)  # Replaces the previous snapshot
+
+        loaded = BehaviorStateStore.load_snapshot(directory)
+        as_of = (START + timedelta(days=4)).toordinal()
+        assert len(loaded) == 1
+        expected = store.window_stats(TEST_USER_ID, 7, as_of)
+        actual = loaded.window_stats(TEST_USER_ID, 7, as_of)
+        assert actual['counts'] == expected['counts']
+        assert actual['recent_sessions'] == expected['recent_sessions']
+        for key in ['activity_std', 'engagement_slope', 'baseline_session_mean']:
+            assert actual[key] == pytest.approx(expected[key])
+
+        loaded.record(TEST_USER_ID, 'post', START + timedelta(days=4))
+        loaded.record("00000000-0000-4000-8000-000000000001", 'post', START)
+        assert loaded.window_stats(TEST_USER_ID, 1)['counts']['posts_count'] == 9
+        assert len(loaded) == 2
+
+    def test_snapshot_switched_atomically(self, tmp_path):
+        """Test snapshots are published as versions behind a symlink, keeping the previous one."""
+        directory = tmp_path / "state"
+        store = BehaviorStateStore()
+        store.record(TEST_USER_ID, 'post', START)
+        store.save_snapshot(str(directory))
+        loaded = BehaviorStateStore.load_snapshot(str(directory))
+        store.record(TEST_USER_ID, 'post', START)
+        store.save_snapshot(str(directory))
+        store.save_snapshot(str(directory))
+
+        assert directory.is_symlink()
+        assert len(list(tmp_path.glob(".state.v*"))) == 2
+        # A store loaded from an older version keeps its memory-mapped files
+        assert loaded.window_stats(TEST_USER_ID, 1, START.toordinal())['counts']['posts_count'] == 1
+        reloaded = BehaviorStateStore.load_snapshot(str(directory))
+        assert reloaded.window_stats(TEST_USER_ID, 1, START.toordinal())['counts']['posts_count'] == 2
+
+    def test_interrupted_legacy_swap_recovered(self, tmp_path):
+        """Test a snapshot left at ``.old`` by a crash mid-swap is still loaded and then cleaned up."""
+        directory = tmp_path / "state"
+        store = BehaviorStateStore()
+        store.record(TEST_USER_ID, 'post', START)
+        store.save_snapshot(str(directory))
+        (directory.resolve()).rename(tmp_path / "state.old")
+        directory.unlink()
+
+        loaded = BehaviorStateStore.load_snapshot(str(directory))
+        assert len(loaded) == 1
+        loaded.save_snapshot(str(directory))
+        assert not (tmp_path / "state.old").exists()
+        assert len(BehaviorStateStore.load_snapshot(str(directory))) == 1
+
+    def test_layout_mismatch_rejected(self, tmp_path):
+        """Test snapshots written with another layout are not loaded."""
+        directory = tmp_path / "state"
+        store = BehaviorStateStore()
+        store.record(TEST_USER_ID, 'post', START)
+        store.save_snapshot(str(directory))
+        (directory / "meta.json").write_text('{"version": 0}')
+
+        with pytest.raises(ValueError):
+            BehaviorStateStore.load_snapshot(str(directory))
+        assert not BehaviorAnalyzer().restore_state(str(directory))
+        assert not BehaviorAnalyzer().restore_state(str(tmp_path / "missing"))
+
+    def test_analyzer_snapshot_and_restore(self, tmp_path):
+        """Test the analyzer restores incremental state from its snapshot."""
+        directory = str(tmp_path / "state")
+        analyzer = BehaviorAnalyzer()
+        asyncio.run(analyzer.record_events(daily_events([2, 4, 1])))
+        as_of = START + timedelta(days=2)
+        asyncio.run(analyzer.snapshot_state(directory))
+
+        restored = BehaviorAnalyzer()
+        assert restored.restore_state(directory)
+        assert (asyncio.run(restored.analyze_incremental(TEST_USER_ID, 7, as_of))
+                == asyncio.run(analyzer.analyze_incremental(TEST_USER_ID, 7, as_of)))
+
+class TestIncrementalAnalysis:
+    def test_matches_full_analysis(self):
+        """Test incremental analysis matches analyze() on the same activity."""
+        counts = [6, 6, 6, 6, 1, 0, 0]
+        analyzer = BehaviorAnalyzer()
+        asyncio.run(analyzer.record_events(daily_events(counts)))
+        as_of = START + timedelta(days=6)
+
+        incremental = asyncio.run(analyzer.analyze_incremental(TEST_USER_ID, 7, as_of))
+        full = asyncio.run(analyzer.analyze(TEST_USER_ID, {
+            'posts_count': sum(counts),
+            'hourly_activity': {'12': sum(counts)},
+            'daily_activity': {str(day): count for day, count in enumerate(counts)},
+            'recent_activity': counts,
+            'daily_posts': counts
+        }, 7))
+
+        assert incremental == full
+        assert 'sudden_activity_drop' in incremental['anomaly_flags']
+
+    def test_unknown_user(self):
+        """Test analysis of a user without events is rejected."""
+        with pytest.raises(UnknownUserError):
+            asyncio.run(BehaviorAnalyzer().analyze_incremental(TEST_USER_ID))
+
+    def test_window_longer_than_history(self):
+        """Test windows past the retained history are invalid arguments, not unknown users."""
+        analyzer = BehaviorAnalyzer()
+        asyncio.run(analyzer.record_events(daily_events([1])))
+
+        with pytest.raises(ValueError) as error:
+            asyncio.run(analyzer.analyze_incremental(TEST_USER_ID, 60, START))
+        assert not isinstance(error.value, UnknownUserError)
+
+    def test_large_batches_yield_to_the_loop(self):
+        """Test other coroutines run while a large event batch is folded in."""
+        analyzer = BehaviorAnalyzer()
+        events = daily_events([RECORD_CHUNK_SIZE, RECORD_CHUNK_SIZE, RECORD_CHUNK_SIZE])
+        progress = []
+
+        async def watch():
+            while not progress or progress[-1] < len(events):
+                progress.append(analyzer.state_store.window_stats(
+                    TEST_USER_ID, 7, (START + timedelta(days=2)).toordinal()
+                )['counts']['posts_count'] if TEST_USER_ID in analyzer.state_store else 0)
+                await asyncio.sleep(0)
+
+        async def run():
+            watcher = asyncio.create_task(watch())
+            await asyncio.sleep(0)
+            result = await analyzer.record_events(events)
+            await watcher
+            return result
+
+        assert asyncio.run(run())['accepted'] == len(events)
+        assert any(0 < count < len(events) for count in progress)
+
+class TestIncrementalEndpoints:
+    def test_ingest_then_analyze(self):
+        """Test events posted to the API drive incremental analysis."""
+        now = datetime.now()
+        events = [
+            {"user_id": TEST_USER_ID, "event_type": "post", "timestamp": (now - timedelta(hours=h)).isoformat()}
+            for h in range(5)
+        ]
+        events.append({"user_id": "bad-id", "event_type": "post", "timestamp": now.isoformat()})
+
+        ingest = client.post("/api/v1/behavior/events", json={"events": events})
+
+        assert ingest.status_code == 200
+        assert ingest.json()["accepted"] == 5
+        assert [error["index"] for error in ingest.json()["errors"]] == [5]
+
+        response = client.post(
+            "/api/v1/analyze-behavior/incremental",
+            json={"user_id": TEST_USER_ID, "time_window_days": 7}
+        )
+        assert response.status_code == 200
+        assert "activity_score" in response.json()
+
+    def test_analyze_unknown_user(self):
+        """Test incremental analysis of an unknown user returns 404."""
+        response = client.post(
+            "/api/v1/analyze-behavior/incremental",
+            json={"user_id": "00000000-0000-4000-8000-00000000abcd"}
+        )
+        assert response.status_code == 404
+
+    def test_invalid_arguments_are_client_errors(self):
+        """Test invalid analysis and event arguments return 400, not 404 or 500."""
+        from api import get_analyzer
+        analyzer = get_analyzer("behavior_analyzer")
+        window_error = ValueError("Incremental analysis supports windows up to 30 days")
+
+        with patch.object(analyzer, 'analyze_incremental', side_effect=window_error):
+            response = client.post("/api/v1/analyze-behavior/incremental", json={"user_id": TEST_USER_ID})
+        assert response.status_code == 400
+
+        with patch.object(analyzer, 'record_events', side_effect=ValueError("Bad event")):
+            response = client.post("/api/v1/behavior/events", json={"events": [
+                {"user_id": TEST_USER_ID, "event_type": "post", "timestamp": START.isoformat()}
+            ]})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Bad event"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+import json
+import sys
+import os
+
+# Add src and the benchmarks package to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.corpora import text_corpus, activity_profiles
+from benchmarks.run import compare, run_suite
+from benchmarks.load_test import parse_mix, find_knee, build_report, run_load_test
+from utils.pii import contains_pii
+
+def results(**benchmarks):
+    return {'benchmarks': benchmarks}
+
+def stage(concurrency, throughput, error_rate=0.0):
+    return {'concurrency': concurrency, 'throughput_rps': throughput, 'error_rate': error_rate}
+
+class TestCorpora:
+    def test_corpora_are_reproducible(self):
+        """Test the same seed yields the same inputs and another seed does not."""
+        assert text_corpus('short', 20, 2000, seed=1) == text_corpus('short', 20, 2000, seed=1)
+        assert text_corpus('short', 20, 2000, seed=1) != text_corpus('short', 20, 2000, seed=2)
+        assert activity_profiles(8, seed=1) == activity_profiles(8, seed=1)
+
+    def test_corpus_kinds(self):
+        """Test each corpus kind has the shape its benchmarks rely on."""
+        long_posts = text_corpus('long', 10, 500)
+        pii_posts = text_corpus('pii', 50, 2000)
+        keyword_posts = text_corpus('keyword', 10, 2000, vocabulary=['deadline'])
+
+        assert all(len(post) == 500 for post in long_posts)
+        assert all(contains_pii(post) for post in pii_posts)
+        assert all('deadline' in post for post in keyword_posts)
+        assert len(set(long_posts)) == 10
+
+    def test_unknown_kind(self):
+        """Test unknown corpus kinds are rejected."""
+        with pytest.raises(ValueError):
+            text_corpus('poems', 1, 100)
+
+class TestCompare:
+    def test_regressions_flagged(self):
+        """Test slower throughput or latency beyond the threshold is flagged."""
+        baseline = results(a={'ops_per_sec': 1000.0, 'p50_ms': 1.0, 'p99_ms': 2.0})
+        current = results(a={'ops_per_sec': 700.0, 'p50_ms': 1.1, 'p99_ms': 3.0})
+
+        regressions = compare(current, baseline, threshold=0.25)
+
+        assert {(r['benchmark'], r['metric']) for r in regressions} == {('a', 'ops_per_sec'), ('a', 'p99_ms')}
+
+    def test_improvements_and_new_benchmarks_pass(self):
+        """Test faster results and benchmarks missing from the baseline are not flagged."""
+        baseline = results(a={'ops_per_sec': 1000.0, 'p50_ms': 1.0, 'p99_ms': 2.0})
+        current = results(
+            a={'ops_per_sec': 2000.0, 'p50_ms': 0.5, 'p99_ms': 1.0},
+            b={'ops_per_sec': 1.0, 'p50_ms': 100.0, 'p99_ms': 100.0}
+        )
+
+        assert compare(current, baseline) == []
+
+class TestRunSuite:
+    def test_results_document(self):
+        """Test a filtered run produces JSON-serializable statistics."""
+        document = run_suite(samples=20, warmup=2, name_filter='validate_text_input')
+
+        assert set(document['benchmarks']) == {
+            f"validation.validate_text_input[{kind}]" for kind in ('short', 'long', 'pii', 'keyword')
+        }
+        pii = document['benchmarks']['validation.validate_text_input[pii]']
+        assert pii['expected_errors'] == 20
+        assert pii['p50_ms'] <= pii['p99_ms']
+        assert json.loads(json.dumps(document))['metadata']['samples'] == 20
+
+class TestLoadTest:
+    def test_parse_mix(self):
+        """Test request mixes parse weights and reject unknown kinds."""
+        assert parse_mix("analyze-text=3,health") == {'analyze-text': 3.0, 'health': 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("analyze-everything=1")
+        with pytest.raises(ValueError):
+            parse_mix("health=0")
+
+    def test_knee_is_first_stage_near_peak(self):
+        """Test the knee is the lowest concurrency reaching near-peak throughput."""
+        stages = [stage(1, 100), stage(2, 190), stage(4, 300), stage(8, 320), stage(16, 310), stage(32, 400, 0.2)]
+
+        assert find_knee(stages)['concurrency'] == 4
+        assert find_knee([stage(1, 100, 0.5)]) is None
+
+    def test_report_sizing(self):
+        """Test the report recommends the knee concurrency and a replica count."""
+        report = build_report([stage(1, 100), stage(2, 250), stage(4, 260)], target_rps=1000)
+
+        assert report['recommended_max_concurrent_requests'] == 2
+        assert report['replicas_needed'] == 4
+
+    def test_in_process_ramp(self):
+        """Test a short in-process ramp exercises every request kind without errors."""
+        mix = parse_mix("analyze-text=1,analyze-behavior=1,stress-score=1,health=1")
+
+        stages = asyncio.run(run_load_test([1, 3], mix, stage_seconds=0.3, corpus_size=50))
+
+        assert [s['concurrency'] for s in stages] == [1, 3]
+        assert all(s['requests'] > 0 and s['error_rate'] == 0.0 for s in stages)
+        assert set(stages[1]['routes']) == set(mix)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,118 @@
+import pytest
+import asyncio
+import sys
+import os
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.cache import AnalysisCache
+from pipelines.nlp.analyzer import TextAnalyzer
+from main import app
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client."""
+
+    def __init__(self, fail: bool = False):
+        self.store = {}
+        self.fail = fail
+
+    async def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+        return self
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis unavailable")
+        self.redis.store.update(self.commands)
+
+class TestAnalysisCache:
+    def test_lru_eviction(self):
+        """Test the in-process tier is bounded."""
+        cache = AnalysisCache(max_entries=2)
+
+        async def run():
+            await cache.set('a', {'x': 1})
+            await cache.set('b', {'x': 2})
+            await cache.get('a')
+            await cache.set('c', {'x': 3})
+            return await cache.get_many(['a', 'b', 'c'])
+
+        assert asyncio.run(run()) == [{'x': 1}, None, {'x': 3}]
+
+    def test_redis_tier_shared_between_instances(self):
+        """Test entries written by one instance are served to another via Redis."""
+        redis = FakeRedis()
+        writer = AnalysisCache(redis_client=redis)
+        reader = AnalysisCache(redis_client=redis)
+
+        asyncio.run(writer.set('key', {'toxicity_score': 0.1}))
+
+        assert asyncio.run(reader.get('key')) == {'toxicity_score': 0.1}
+        assert reader.get_stats()['redis_hits'] == 1
+        assert list(redis.store) == ['ml:text-analysis:key']
+
+    def test_redis_failures_are_misses(self):
+        """Test Redis errors fall back to the in-process tier."""
+        cache = AnalysisCache(redis_client=FakeRedis(fail=True))
+
+        asyncio.run(cache.set('key', {'x': 1}))
+        cache.clear()
+
+        assert asyncio.run(cache.get('key')) is None
+        assert cache.get_stats()['redis_errors'] == 2
+
+class TestTextAnalyzerCache:
+    def test_repeated_text_is_served_from_cache(self):
+        """Test repeated content hits the cache and returns independent copies."""
+        cache = AnalysisCache()
+        analyzer = TextAnalyzer(cache=cache)
+
+        first = asyncio.run(analyzer.analyze("So tired, exam tomorrow"))
+        first['stress_indicators'].append('mutated')
+        second = asyncio.run(analyzer.analyze("so tired, EXAM tomorrow"))
+
+        assert cache.get_stats()['hits'] == 1
+        assert 'mutated' not in second['stress_indicators']
+
+    def test_lexicon_version_is_part_of_key(self):
+        """Test a lexicon change invalidates cached results."""
+        cache = AnalysisCache()
+        analyzer = TextAnalyzer(cache=cache)
+        asyncio.run(analyzer.analyze("what a great day"))
+
+        analyzer.positive_words.add('day')
+        analyzer.lexicon = analyzer._compile_lexicon()
+        results = asyncio.run(analyzer.analyze("what a great day"))
+
+        assert cache.get_stats()['hits'] == 0
+        assert results['sentiment']['positive'] == 0.5
+
+    def test_differential_privacy_applied_after_cache(self):
+        """Test DP noise is applied on every response, including cache hits."""
+        client = TestClient(app)
+        request_data = {"text": "Cached post about my deadline"}
+
+        with patch('api.apply_differential_privacy', side_effect=lambda data, epsilon: data) as dp:
+            client.post("/api/v1/analyze-text", json=request_data)
+            client.post("/api/v1/analyze-text", json=request_data)
+
+        assert dp.call_count == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
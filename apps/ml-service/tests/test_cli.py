@@ -0,0 +1,151 @@
+import pytest
+import asyncio
+import csv
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cli
+from cli import main, score_file, score_records
+from utils.cache import AnalysisCache
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+ACTIVITY_DATA = {
+    "posts_count": 2,
+    "comments_count": 5,
+    "login_frequency": 4,
+    "avg_session_duration": 35,
+    "hourly_activity": {"9": 3, "23": 4},
+    "daily_activity": {"0": 5, "1": 2},
+    "recent_activity": [6, 5, 1]
+}
+
+def write_jsonl(path, records, extra_lines=()):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        for line in extra_lines:
+            f.write(line + "\n")
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+class LoopBoundRedis:
+    """Redis stand-in that, like ``redis.asyncio``, only works on the loop it first ran on."""
+
+    def __init__(self):
+        self.loops = set()
+        self.values = {}
+
+    def _check_loop(self):
+        self.loops.add(asyncio.get_running_loop())
+        if len(self.loops) > 1:
+            raise RuntimeError("Event loop is closed")
+
+    async def mget(self, keys):
+        self._check_loop()
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return LoopBoundPipeline(self)
+
+class LoopBoundPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.writes = {}
+
+    def set(self, key, value, ex=None):
+        self.writes[key] = value
+
+    async def execute(self):
+        self.redis._check_loop()
+        self.redis.values.update(self.writes)
+
+class TestScoreFile:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_jsonl_round_trip(self, tmp_path, workers):
+        """Test every record gets a result row, in input order."""
+        records = [
+            {"id": f"post-{n}", "user_id": TEST_USER_ID, "text": f"So stressed about exam {n}"}
+            for n in range(25)
+        ]
+        records[3]["activity_data"] = ACTIVITY_DATA
+        records[4] = {"id": "activity-only", "activity_data": ACTIVITY_DATA}
+        input_path, output_path = tmp_path / "posts.jsonl", tmp_path / "scores.jsonl"
+        write_jsonl(input_path, records, extra_lines=["not json"])
+
+        summary = score_file(str(input_path), str(output_path), 'jsonl', 'jsonl', workers=workers, chunk_size=4)
+
+        rows = read_jsonl(output_path)
+        assert summary['records'] == len(rows) == 26
+        assert summary['failed'] == 1
+        assert [row['index'] for row in rows] == list(range(26))
+        assert rows[0]['id'] == "post-0"
+        assert "stress_indicators" in rows[0]['text_analysis']
+        assert 0.0 <= rows[0]['stress']['stress_score'] <= 1.0
+        assert "activity_score" in rows[3]['behavior_analysis']
+        assert "text_analysis" not in rows[4] and "stress" in rows[4]
+        assert rows[25]['errors']['input'].startswith("Invalid JSON")
+
+    def test_record_errors_are_isolated(self, tmp_path):
+        """Test invalid text or activity fails only its own record."""
+        records = [
+            {"text": "x" * 100000},
+            {"text": "Fine day", "activity_data": {"posts_count": "many"}},
+            {"text": "Fine day", "activity_data": ACTIVITY_DATA},
+        ]
+        input_path, output_path = tmp_path / "posts.jsonl", tmp_path / "scores.jsonl"
+        write_jsonl(input_path, records)
+
+        score_file(str(input_path), str(output_path), 'jsonl', 'jsonl')
+
+        rows = read_jsonl(output_path)
+        assert "text" in rows[0]['errors'] and "stress" not in rows[0]
+        assert "behavior" in rows[1]['errors'] and "text_analysis" in rows[1]
+        assert "errors" not in rows[2] and "behavior_analysis" in rows[2]
+
+    def test_chunks_share_one_event_loop(self):
+        """Test every chunk runs on the process's loop, so loop-bound Redis clients keep working."""
+        score_records([{"index": 0, "text": "Warm up"}])
+        redis = LoopBoundRedis()
+        cache = AnalysisCache(redis_client=redis)
+        text_analyzer = cli._components['text_analyzer']
+        previous, text_analyzer.cache = text_analyzer.cache, cache
+        try:
+            for n in range(3):
+                rows = score_records([{"index": 0, "text": f"So stressed about exam {n}"}])
+                assert "text_analysis" in rows[0]
+        finally:
+            text_analyzer.cache = previous
+
+        assert len(redis.loops) == 1
+        assert cache.get_stats()['redis_errors'] == 0
+        assert len(redis.values) == 3
+
+    def test_csv_activity_columns(self, tmp_path):
+        """Test CSV activity fields are assembled and results flattened."""
+        input_path, output_path = tmp_path / "activity.csv", tmp_path / "scores.csv"
+        with open(input_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["user_id", "text", "posts_count", "login_frequency", "hourly_activity"])
+            writer.writerow([TEST_USER_ID, "Deadline panic again", "3", "6", json.dumps({"2": 5})])
+            writer.writerow([TEST_USER_ID, "", "1", "2", ""])
+
+        assert main([str(input_path), str(output_path), "--workers", "1"]) == 0
+
+        with open(output_path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 2
+        assert rows[0]['user_id'] == TEST_USER_ID
+        assert float(rows[0]['stress_score']) >= 0.0
+        assert rows[0]['toxicity_score'] != "" and rows[1]['toxicity_score'] == ""
+        assert rows[1]['activity_score'] != ""
+        assert json.loads(rows[0]['behavior_analysis'])['activity_score'] >= 0.0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,88 @@
+import pytest
+import asyncio
+import sys
+import os
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.executor import AnalysisExecutor
+from pipelines.nlp.analyzer import TextAnalyzer
+from pipelines.fusion.stress_scorer import StressScorer
+from api import analysis_executor
+from main import app
+
+client = TestClient(app)
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+def build_components():
+    return {'stress_scorer': StressScorer()}
+
+class TestAnalysisExecutor:
+    def test_invalid_mode(self):
+        """Test unknown modes and process mode without a factory are rejected."""
+        with pytest.raises(ValueError):
+            AnalysisExecutor(mode='gpu')
+        with pytest.raises(ValueError):
+            AnalysisExecutor(mode='process')
+
+    def test_thread_pool_matches_inline(self):
+        """Test text analysis in the thread pool matches inline results."""
+        executor = AnalysisExecutor(mode='thread', max_workers=2)
+        executor.start()
+        try:
+            pooled = TextAnalyzer(executor=executor)
+            pooled.cache = None
+            inline = TextAnalyzer()
+            inline.cache = None
+
+            text = "So stressed about the exam, can't handle it"
+            batch = asyncio.run(pooled.analyze_batch([text, "", text]))
+
+            assert asyncio.run(pooled.analyze(text)) == asyncio.run(inline.analyze(text))
+            assert batch['results'][0] == batch['results'][2]
+            assert [error['index'] for error in batch['errors']] == [1]
+        finally:
+            executor.shutdown()
+
+    def test_process_pool_uses_prewarmed_workers(self):
+        """Test process workers score with analyzers built by the factory."""
+        executor = AnalysisExecutor(mode='process', max_workers=2, component_factory=build_components)
+        executor.start()
+        try:
+            scorer = StressScorer(executor=executor)
+            results = asyncio.run(scorer.calculate_score(
+                TEST_USER_ID, behavior_features={'activity_score': 0.1}
+            ))
+
+            assert results == asyncio.run(StressScorer().calculate_score(
+                TEST_USER_ID, behavior_features={'activity_score': 0.1}
+            ))
+        finally:
+            executor.shutdown()
+
+class TestAdmissionControl:
+    def test_rejects_when_at_capacity(self):
+        """Test analysis routes return 503 with Retry-After when full."""
+        limit = analysis_executor.max_concurrent_requests
+        analysis_executor.max_concurrent_requests = 0
+        try:
+            response = client.post("/api/v1/analyze-text", json={"text": "Hello there"})
+            health = client.get("/api/v1/health/live")
+        finally:
+            analysis_executor.max_concurrent_requests = limit
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert health.status_code == 200
+
+    def test_in_flight_released(self):
+        """Test admitted requests release their slot."""
+        client.post("/api/v1/analyze-text", json={"text": "Hello there"})
+
+        assert analysis_executor.get_stats()['in_flight'] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
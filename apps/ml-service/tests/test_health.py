@@ -0,0 +1,83 @@
+import pytest
+import asyncio
+import sys
+import os
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.health import HealthMonitor
+from api import health_monitor
+from main import app
+
+client = TestClient(app)
+
+async def passing_check():
+    return True
+
+async def failing_check():
+    raise RuntimeError("model not loaded")
+
+class TestHealthMonitor:
+    def test_starting_before_first_run(self):
+        """Test the monitor is not ready before self-tests have run."""
+        monitor = HealthMonitor(checks={'model': passing_check})
+
+        status = monitor.get_status()
+        assert status['status'] == 'starting'
+        assert not status['ready']
+
+    def test_failing_check(self):
+        """Test a failing self-test is reported with its error."""
+        monitor = HealthMonitor(checks={'ok': passing_check, 'broken': failing_check})
+
+        status = asyncio.run(monitor.run_checks())
+
+        assert status['status'] == 'degraded'
+        assert status['models'] == {'ok': 'healthy', 'broken': 'unhealthy'}
+        assert status['checks']['broken']['error'] == "model not loaded"
+        assert not status['ready']
+
+    def test_latency_over_budget_is_degraded(self):
+        """Test slow self-tests mark the component degraded but still ready."""
+        async def slow_check():
+            await asyncio.sleep(0.01)
+            return True
+
+        monitor = HealthMonitor(checks={'slow': slow_check}, latency_budget_ms=1)
+        status = asyncio.run(monitor.run_checks())
+
+        assert status['models'] == {'slow': 'degraded'}
+        assert status['checks']['slow']['latency_ms'] >= 1
+        assert status['ready']
+
+class TestHealthEndpoints:
+    def test_analyzer_self_tests_pass(self):
+        """Test every analyzer self-test passes and is served from cache."""
+        asyncio.run(health_monitor.run_checks())
+
+        response = client.get("/api/v1/health")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["models"].values()) <= {"healthy", "degraded"}
+        assert data["last_checked"] is not None
+
+    def test_readiness(self):
+        """Test readiness reflects the cached self-test results."""
+        asyncio.run(health_monitor.run_checks())
+
+        response = client.get("/api/v1/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    def test_liveness(self):
+        """Test the liveness probe."""
+        response = client.get("/api/v1/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,135 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipelines.nlp.lexicon import LexiconMatcher
+from pipelines.nlp.analyzer import TextAnalyzer
+
+class TestLexiconMatcher:
+    def test_counts_words_and_phrases_in_one_pass(self):
+        """Test that token terms and phrases are counted per category."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('positive', {'good', 'great'})
+        matcher.add_terms('toxicity', {'idiot', 'terrible person'})
+        matcher.add_terms('negative', {'terrible'})
+        matcher.compile()
+
+        hits = matcher.match("good good what a terrible person great")
+
+        assert hits['token_count'] == 7
+        assert hits['counts'] == {'positive': 3, 'toxicity': 1, 'negative': 1}
+        assert hits['terms']['toxicity'] == ['terrible person']
+
+    def test_token_terms_require_whole_tokens(self):
+        """Test that token terms do not match inside other words."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('stress', {'test'})
+
+        hits = matcher.match("testing the contest")
+
+        assert hits['counts']['stress'] == 0
+
+    def test_overlapping_phrases(self):
+        """Test phrases that share tokens with other phrases."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('a', {'so tired'})
+        matcher.add_terms('b', {'tired of it', 'tired'})
+
+        hits = matcher.match("so so tired of it")
+
+        assert hits['counts'] == {'a': 1, 'b': 2}
+
+    def test_substrings_match_anywhere(self):
+        """Test substring terms keep plain substring semantics."""
+        matcher = LexiconMatcher()
+        matcher.add_substrings('violence', {'kill', 'killing'})
+        matcher.add_substrings('crisis', {'help me', 'elp'})
+
+        hits = matcher.match("killing time, please help me")
+
+        assert hits['counts'] == {'violence': 2, 'crisis': 2}
+
+    def test_punctuation_attached_words_match(self):
+        """Test words followed by punctuation still hit their terms."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('stress', {'stressed', 'exam'})
+        matcher.add_terms('toxicity', {'terrible person'})
+
+        hits = matcher.match("so stressed, exam! (a terrible person...)")
+
+        assert hits['counts'] == {'stress': 2, 'toxicity': 1}
+        assert hits['token_count'] == 6
+
+    def test_batch_matches_single_texts(self):
+        """Test batch matching agrees with matching each text alone."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('a', {'so tired', 'tired'})
+        matcher.add_terms('b', {'tired of it', 'exam'})
+        matcher.add_substrings('c', {'help me', 'elp'})
+        texts = ["so so tired of it", "", "exam, help me", "tired", "nothing here"]
+
+        assert matcher.match_many(texts) == [matcher.match(text) for text in texts]
+
+    def test_empty_batch(self):
+        """Test an empty batch is matched without scanning."""
+        matcher = LexiconMatcher()
+        matcher.add_terms('a', {'tired'})
+        matcher.add_substrings('b', {'help me'})
+
+        assert matcher.match_many([]) == []
+
+    def test_substrings_match_normalized_text(self):
+        """Test substring terms match across punctuation, spacing and apostrophe variants."""
+        matcher = LexiconMatcher()
+        matcher.add_substrings('stress', {"can't handle", 'too much work'})
+
+        hits = matcher.match_many(["i can’t handle it", "too much   work!", "too much, work"])
+
+        assert [hit['counts']['stress'] for hit in hits] == [1, 1, 1]
+        assert hits[0]['terms']['stress'] == ["can't handle"]
+
+    def test_version_covers_tokenizer(self, monkeypatch):
+        """Test a tokenizer change alters the lexicon version."""
+        import pipelines.nlp.lexicon as lexicon
+
+        def build():
+            matcher = LexiconMatcher()
+            matcher.add_terms('a', {'tired'})
+            return matcher.compile().version
+
+        version = build()
+        monkeypatch.setattr(lexicon, 'TOKENIZER_REVISION', lexicon.TOKENIZER_REVISION + 1)
+
+        assert build() != version
+
+class TestTextAnalyzerLexicon:
+    def setup_method(self):
+        self.analyzer = TextAnalyzer()
+
+    def test_stress_indicators_and_patterns(self):
+        """Test stress keywords and phrases are both reported."""
+        results = asyncio.run(self.analyzer.analyze("exam tomorrow and no sleep, so tired"))
+
+        assert set(results['stress_indicators']) == {'exam', 'tired', 'no_sleep', 'so_tired'}
+
+    def test_safety_flags_keep_category_order(self):
+        """Test safety flags are reported once per category in lexicon order."""
+        results = asyncio.run(
+            self.analyzer.analyze("this is an emergency, please help me, I might hurt myself")
+        )
+
+        assert results['safety_flags'] == ['self_harm', 'crisis']
+
+    def test_toxic_phrases_are_counted(self):
+        """Test multi-word toxic phrases contribute to toxicity."""
+        clean = asyncio.run(self.analyzer.analyze("you are a kind person"))
+        toxic = asyncio.run(self.analyzer.analyze("you are a terrible person"))
+
+        assert toxic['toxicity_score'] > clean['toxicity_score']
+
+if __name__ == "__main__":
+    pytest.main([__file__])
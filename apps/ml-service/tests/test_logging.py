@@ -0,0 +1,157 @@
+import pytest
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import structlog
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.logging as service_logging
+from utils.logging import (
+    setup_logging, shutdown_logging, get_logger, LogWriter, LOG_LINES_DROPPED_TOTAL
+)
+
+class ThreadRecordingStream(io.StringIO):
+    """StringIO remembering which threads wrote to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def write(self, text):
+        self.threads.add(threading.current_thread().name)
+        return super().write(text)
+
+@pytest.fixture
+def log_stream():
+    stream = ThreadRecordingStream()
+    level = logging.getLogger().level
+    yield stream
+    shutdown_logging()
+    structlog.reset_defaults()
+    logging.getLogger().setLevel(level)
+
+def written(stream):
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+class TestLogPipeline:
+    def test_lines_written_on_background_thread(self, log_stream):
+        """Test events are rendered as JSON lines by the writer thread, not the caller."""
+        setup_logging(stream=log_stream, sample_rates={})
+        get_logger("test").info("Text analysis completed", text_length=12)
+
+        lines = written(log_stream)
+        assert lines[0]["event"] == "Text analysis completed"
+        assert lines[0]["text_length"] == 12
+        assert lines[0]["level"] == "info"
+        assert lines[0]["logger"] == "test"
+        assert "timestamp" in lines[0]
+        assert log_stream.threads == {"log-writer"}
+
+    def test_standard_library_records(self, log_stream):
+        """Test records from standard library loggers go through the same writer."""
+        setup_logging(stream=log_stream, sample_rates={})
+        logging.getLogger("dependency").warning("Retrying %s", "request")
+
+        lines = written(log_stream)
+        assert lines == [{
+            "event": "Retrying request",
+            "logger": "dependency",
+            "level": "warning",
+            "timestamp": lines[0]["timestamp"],
+        }]
+
+    def test_levels_still_apply(self, log_stream):
+        """Test the standard library level keeps filtering structlog events."""
+        setup_logging(stream=log_stream, sample_rates={})
+        logging.getLogger().setLevel(logging.WARNING)
+        logger = get_logger("test")
+        logger.info("Quiet")
+        logger.warning("Loud")
+
+        assert [line["event"] for line in written(log_stream)] == ["Loud"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_forked_process_gets_own_writer(self, log_stream):
+        """Test a forked child starts its own writer thread and writes its lines."""
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, "w") as pipe:
+            setup_logging(stream=pipe, sample_rates={})
+            pid = os.fork()
+            if pid == 0:
+                get_logger("child").info("From child")
+                shutdown_logging()
+                os._exit(0)
+            os.waitpid(pid, 0)
+            shutdown_logging()
+        with os.fdopen(read_fd) as pipe:
+            events = [json.loads(line)["event"] for line in pipe]
+        assert events == ["From child"]
+
+class TestSampling:
+    def test_sampled_events_dropped_and_counted(self, log_stream):
+        """Test events sampled out are not written and are counted."""
+        setup_logging(stream=log_stream, sample_rates={"Text analysis completed": 0.0})
+        before = LOG_LINES_DROPPED_TOTAL.get("sampled")
+        logger = get_logger("test")
+        for _ in range(5):
+            logger.info("Text analysis completed", safety_flags_count=0)
+        logger.info("Behavior events recorded")
+
+        assert [line["event"] for line in written(log_stream)] == ["Behavior events recorded"]
+        assert LOG_LINES_DROPPED_TOTAL.get("sampled") == before + 5
+
+    def test_errors_and_safety_flags_never_sampled(self, log_stream):
+        """Test warnings, errors and events carrying safety flags are always written."""
+        setup_logging(stream=log_stream, sample_rates={
+            "Text analysis completed": 0.0, "Text batch analysis completed": 0.0
+        })
+        logger = get_logger("test")
+        logger.info("Text analysis completed", safety_flags_count=1)
+        logger.info("Text batch analysis completed", safety_flagged_count=2)
+        logger.warning("Text analysis completed")
+        logger.error("Text analysis completed")
+
+        lines = written(log_stream)
+        assert [line["level"] for line in lines] == ["info", "info", "warning", "error"]
+
+    def test_kept_events_carry_sample_rate(self, log_stream):
+        """Test kept sampled events record their rate so counts can be scaled."""
+        setup_logging(stream=log_stream, sample_rates={"Behavior analysis completed": 0.999999})
+        get_logger("test").info("Behavior analysis completed")
+        get_logger("test").info("Stress score calculated")
+
+        lines = written(log_stream)
+        assert lines[0]["sample_rate"] == 0.999999
+        assert "sample_rate" not in lines[1]
+
+class TestLogWriter:
+    def test_full_queue_drops_and_counts(self):
+        """Test lines that do not fit the queue are dropped without blocking."""
+        writer = LogWriter(io.StringIO(), queue_size=1)
+        before = LOG_LINES_DROPPED_TOTAL.get("queue_full")
+        writer.put({"event": "first"})
+        writer.put({"event": "second"})
+
+        assert writer.queue.qsize() == 1
+        assert LOG_LINES_DROPPED_TOTAL.get("queue_full") == before + 1
+
+    def test_errors_wait_for_room(self, monkeypatch):
+        """Test errors wait for the writer to make room instead of being dropped."""
+        monkeypatch.setattr(service_logging, "ERROR_ENQUEUE_TIMEOUT_SECONDS", 5.0)
+        stream = io.StringIO()
+        writer = LogWriter(stream, queue_size=1)
+        writer.put({"event": "first"})
+        threading.Timer(0.05, writer.start).start()
+        writer.put({"event": "failure"}, error=True)
+        writer.stop()
+
+        assert [json.loads(line)["event"] for line in stream.getvalue().splitlines()] == ["first", "failure"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,142 @@
+import pytest
+import asyncio
+import sys
+import os
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.metrics import MetricsMiddleware, MetricsRegistry, REQUESTS_TOTAL, REQUEST_ERRORS_TOTAL, STAGE_DURATION
+from pipelines.nlp.analyzer import TextAnalyzer
+from pipelines.behavior.analyzer import BehaviorAnalyzer
+from pipelines.fusion.stress_scorer import StressScorer
+from main import app
+
+client = TestClient(app)
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+class TestMetricsRegistry:
+    def test_histogram_exposition(self):
+        """Test histogram buckets are rendered cumulatively."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('test_seconds', 'Test latency.', ['stage'], buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, 'a')
+        histogram.observe(0.5, 'a')
+        histogram.observe(5.0, 'a')
+
+        lines = registry.render().splitlines()
+        assert '# TYPE test_seconds histogram' in lines
+        assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{stage="a"} 3' in lines
+
+    def test_duplicate_registration(self):
+        """Test a metric name can only be registered once."""
+        registry = MetricsRegistry()
+        registry.counter('test_total', 'Test counter.')
+
+        with pytest.raises(ValueError):
+            registry.counter('test_total', 'Test counter.')
+
+class TestStageMetrics:
+    def test_text_analysis_stages(self):
+        """Test every text analysis stage is timed."""
+        analyzer = TextAnalyzer()
+        analyzer.cache = None  # Run the full pipeline on every call
+        stages = ['validate', 'tokenize', 'sentiment', 'emotion', 'toxicity', 'stress', 'safety', 'sanitize']
+        before = {stage: STAGE_DURATION.get_count('text', stage) for stage in stages}
+
+        asyncio.run(analyzer.analyze("Feeling stressed about the exam"))
+
+        for stage in stages:
+            assert STAGE_DURATION.get_count('text', stage) == before[stage] + 1
+
+    def test_behavior_and_stress_stages(self):
+        """Test behavior analysis and stress scoring stages are timed."""
+        behavior_before = STAGE_DURATION.get_count('behavior', 'anomalies')
+        stress_before = STAGE_DURATION.get_count('stress', 'recommendations')
+
+        asyncio.run(BehaviorAnalyzer().analyze(TEST_USER_ID, {'posts_count': 3}))
+        asyncio.run(StressScorer().calculate_score(
+            TEST_USER_ID, behavior_features={'activity_score': 0.2}
+        ))
+
+        assert STAGE_DURATION.get_count('behavior', 'anomalies') == behavior_before + 1
+        assert STAGE_DURATION.get_count('stress', 'recommendations') == stress_before + 1
+
+class TestMetricsEndpoint:
+    def test_route_metrics(self):
+        """Test requests are counted per route template."""
+        route = '/api/v1/analyze-text'
+        before = REQUESTS_TOTAL.get(route, 'POST', '200')
+
+        client.post(route, json={"text": "Had a good day"})
+
+        assert REQUESTS_TOTAL.get(route, 'POST', '200') == before + 1
+
+    def test_path_parameters_labelled_by_template(self):
+        """Test path parameters are labelled by the route template even when their value repeats in the path."""
+        router = APIRouter(prefix="/v1")
+
+        @router.get("/users/{user_id}/users")
+        async def user_users(user_id: str):
+            return {}
+
+        params_app = FastAPI()
+        params_app.add_middleware(MetricsMiddleware)
+        params_app.include_router(router)
+        route = '/v1/users/{user_id}/users'
+        before = REQUESTS_TOTAL.get(route, 'GET', '200')
+
+        TestClient(params_app).get("/v1/users/users/users")
+        TestClient(params_app).get("/v1/users/other/users")
+
+        assert REQUESTS_TOTAL.get(route, 'GET', '200') == before + 2
+        assert REQUESTS_TOTAL.get('/v1/{user_id}/users/users', 'GET', '200') == 0
+
+    def test_mounted_app_labelled_under_its_mount(self):
+        """Test routes of a mounted app are labelled under the mount path, even when the route also matches it."""
+        inner = FastAPI()
+
+        @inner.get("/{file_path:path}")
+        async def file(file_path: str):
+            return {}
+
+        outer = FastAPI()
+        outer.add_middleware(MetricsMiddleware)
+        outer.mount("/files", inner)
+        route = '/files/{file_path}'
+        before = REQUESTS_TOTAL.get(route, 'GET', '200')
+
+        TestClient(outer).get("/files/reports/2026.csv")
+
+        assert REQUESTS_TOTAL.get(route, 'GET', '200') == before + 1
+        assert REQUESTS_TOTAL.get('/{file_path}', 'GET', '200') == 0
+
+    def test_server_errors_counted(self):
+        """Test 5xx responses are counted as errors."""
+        route = '/api/v1/stress-score'
+        before = REQUEST_ERRORS_TOTAL.get(route, 'POST')
+
+        client.post(route, json={"user_id": TEST_USER_ID})
+
+        assert REQUEST_ERRORS_TOTAL.get(route, 'POST') == before + 1
+
+    def test_metrics_exposition(self):
+        """Test the metrics endpoint serves the Prometheus text format."""
+        client.get("/api/v1/health/live")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'ml_http_requests_total{route="/api/v1/health/live",method="GET",status="200"}' in response.text
+        assert 'ml_pipeline_stage_duration_seconds_bucket' in response.text
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,280 @@
+import pytest
+import asyncio
+import sys
+import os
+import json
+import threading
+from unittest.mock import patch
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipelines.nlp.analyzer import TextAnalyzer
+from pipelines.nlp.models import ModelRegistry, save_hashed_linear_model
+from pipelines.nlp.hashing import HashedNgramVectorizer
+from pipelines.nlp import train
+from utils.cache import AnalysisCache
+from utils.executor import AnalysisExecutor
+from config import settings
+from main import app
+
+client = TestClient(app)
+
+HEADS = {
+    'sentiment': {'labels': ['positive', 'negative', 'neutral'], 'activation': 'softmax'},
+    'toxicity': {'labels': ['toxic'], 'activation': 'sigmoid'},
+}
+
+def save_model(model_dir, name="tiny", version="1", buckets=64, metadata=None):
+    """Write a small hashed model that reads 'awful' as negative and toxic."""
+    vectorizer = HashedNgramVectorizer(buckets=buckets, word_ngrams=1, char_ngrams=None)
+    weights = np.zeros((buckets, 4), dtype=np.float32)
+    _, indices, _ = vectorizer.transform(["awful"])
+    weights[indices, 1] = 5.0
+    weights[indices, 3] = 16.0
+    bias = np.array([0.0, 0.0, 1.0, -4.0], dtype=np.float32)
+    return save_hashed_linear_model(
+        os.path.join(model_dir, name), weights, bias, HEADS, version, vectorizer, metadata=metadata
+    )
+
+@pytest.fixture
+def model_settings(tmp_path, monkeypatch):
+    save_model(str(tmp_path))
+    monkeypatch.setattr(settings, 'model_cache_dir', str(tmp_path))
+    monkeypatch.setattr(settings, 'text_model_backends', {
+        'sentiment': 'hashed_linear:tiny',
+        'toxicity': 'hashed_linear:tiny',
+    })
+    return tmp_path
+
+class TestModelRegistry:
+    def test_defaults_to_lexicon(self):
+        """Test every component uses the lexicon unless configured otherwise."""
+        analyzer = TextAnalyzer()
+
+        info = analyzer.get_model_info()
+
+        assert info['type'] == 'rule_based'
+        assert {backend['backend'] for backend in info['backends'].values()} == {'lexicon'}
+        assert analyzer.models.version == analyzer.lexicon.version
+
+    @pytest.mark.parametrize("assignments", [
+        {'mood': 'lexicon'},
+        {'sentiment': 'onnx:big'},
+        {'stress': 'hashed_linear:tiny'},
+        {'toxicity': 'hashed_linear'},
+    ])
+    def test_invalid_assignments(self, assignments):
+        """Test unknown components, backends or unsupported pairings are rejected."""
+        with pytest.raises(ValueError):
+            ModelRegistry("/nonexistent", lambda: None, assignments)
+
+    def test_models_load_lazily_and_are_shared(self, model_settings):
+        """Test model files load on first use, once for all components naming them."""
+        analyzer = TextAnalyzer()
+        assert analyzer.get_model_info()['backends']['toxicity']['loaded'] is False
+
+        analyzer._analyze_text("what a day")
+
+        backends = analyzer.get_model_info()['backends']
+        assert backends['toxicity']['loaded'] is True
+        assert backends['toxicity']['version'] == "tiny@1"
+        assert backends['toxicity']['memory_mapped'] is True
+        assert analyzer.models.backend('sentiment') is analyzer.models.backend('toxicity')
+        assert backends['emotion']['backend'] == 'lexicon'
+
+    def test_missing_head_rejected(self, model_settings, monkeypatch):
+        """Test assigning a component the model has no head for fails on load."""
+        monkeypatch.setattr(settings, 'text_model_backends', {'emotion': 'hashed_linear:tiny'})
+        analyzer = TextAnalyzer()
+
+        with pytest.raises(ValueError):
+            analyzer._analyze_text("what a day")
+
+class TestHashedLinearBackend:
+    def test_predictions_follow_weights(self, model_settings):
+        """Test model-backed components keep the output schema and use the weights."""
+        analyzer = TextAnalyzer()
+
+        calm = analyzer._analyze_text("what a calm day")
+        harsh = analyzer._analyze_text("what an awful day")
+
+        assert set(harsh['sentiment']) == {'positive', 'negative', 'neutral'}
+        assert harsh['sentiment']['negative'] > calm['sentiment']['negative']
+        assert harsh['toxicity_score'] > 0.5 > calm['toxicity_score']
+        assert set(harsh['emotion']) == set(analyzer.emotion_keywords)
+
+    def test_model_version_is_part_of_cache_key(self, model_settings):
+        """Test swapping the model version invalidates cached results."""
+        cache = AnalysisCache()
+        asyncio.run(TextAnalyzer(cache=cache).analyze("what a day"))
+
+        save_model(str(model_settings), version="2")
+        asyncio.run(TextAnalyzer(cache=cache).analyze("what a day"))
+
+        assert cache.get_stats()['hits'] == 0
+
+    def test_save_publishes_whole_versions(self, model_settings):
+        """Test a saved model replaces arrays and manifest together, keeping the previous version."""
+        backend = ModelRegistry(str(model_settings), lambda: None, {'toxicity': 'hashed_linear:tiny'}).backend('toxicity')
+        save_model(str(model_settings), version="2", buckets=128)
+        save_model(str(model_settings), version="3", buckets=256)
+        reloaded = ModelRegistry(str(model_settings), lambda: None, {'toxicity': 'hashed_linear:tiny'}).backend('toxicity')
+
+        assert backend.version == "tiny@1"
+        assert reloaded.version == "tiny@3"
+        assert reloaded.vectorizer.buckets == 256
+        assert os.path.islink(model_settings / "tiny")
+        versions = [entry for entry in os.listdir(model_settings) if entry.startswith(".tiny.v")]
+        assert len(versions) == 2
+
+    def test_metadata_cannot_override_manifest(self, model_settings):
+        """Test caller metadata is kept without replacing the keys describing the weights."""
+        manifest = save_model(str(model_settings), version="2", buckets=128, metadata={
+            'version': "forged", 'buckets': 64, 'storage': 'dense', 'heads': {}, 'training': {'samples': 3}
+        })
+        backend = ModelRegistry(str(model_settings), lambda: None, {'toxicity': 'hashed_linear:tiny'}).backend('toxicity')
+
+        assert manifest['training'] == {'samples': 3}
+        assert (manifest['version'], manifest['buckets'], manifest['storage']) == ("2", 128, 'sparse')
+        assert backend.version == "tiny@2"
+        assert backend.predict(["awful"])[0]['toxicity'] > 0.5
+
+    def test_models_load_off_the_event_loop(self, model_settings, monkeypatch):
+        """Test the first cached analysis and the health check do not load or predict on the loop thread."""
+        from pipelines.nlp.models import HashedLinearBackend
+        threads = []
+        load = HashedLinearBackend.load
+        predict = HashedLinearBackend.predict
+
+        def recording_load(self):
+            threads.append(threading.current_thread())
+            return load(self)
+
+        def recording_predict(self, texts):
+            threads.append(threading.current_thread())
+            return predict(self, texts)
+
+        monkeypatch.setattr(HashedLinearBackend, 'load', recording_load)
+        monkeypatch.setattr(HashedLinearBackend, 'predict', recording_predict)
+        executor = AnalysisExecutor(mode='thread', max_workers=1)
+        executor.start()
+        analyzer = TextAnalyzer(cache=AnalysisCache(), executor=executor)
+        try:
+            asyncio.run(analyzer.analyze("what a day"))
+            assert asyncio.run(analyzer.health_check())
+        finally:
+            executor.shutdown()
+
+        assert threads
+        assert threading.main_thread() not in threads
+
+    def test_chunk_failures_are_logged(self):
+        """Test a failing batch match is logged before texts are retried one by one."""
+        analyzer = TextAnalyzer()
+        with patch.object(analyzer.lexicon, 'match_many', side_effect=RuntimeError("broken")), \
+                patch('pipelines.nlp.analyzer.logger') as logger:
+            outcomes = analyzer._analyze_chunk(["so tired", "exam stress"])
+
+        assert all(error is None for _, error in outcomes)
+        assert "broken" in logger.error.call_args[0][0]
+
+    def test_model_info_endpoint(self):
+        """Test /model-info reports the backend serving each component."""
+        response = client.get("/api/v1/model-info")
+
+        backends = response.json()["text_analyzer"]["models"]["backends"]
+        assert set(backends) == {'sentiment', 'emotion', 'toxicity', 'stress', 'safety'}
+        assert backends['sentiment']['backend'] == 'lexicon'
+        assert backends['sentiment']['version']
+
+class TestHashedNgramVectorizer:
+    def test_rows_are_normalized_and_batch_matches_single(self):
+        """Test each text hashes to an L2-normalized row, independent of its batch."""
+        vectorizer = HashedNgramVectorizer(buckets=1024)
+        texts = ["so stressed, exam tomorrow!", "", "great day great day"]
+
+        indptr, indices, values = vectorizer.transform(texts)
+
+        assert len(indptr) == len(texts) + 1
+        assert indptr[2] == indptr[1]
+        for row in (0, 2):
+            row_values = values[indptr[row]:indptr[row + 1]]
+            assert np.isclose(np.sum(row_values ** 2), 1.0)
+            _, single_indices, single_values = vectorizer.transform([texts[row]])
+            np.testing.assert_array_equal(single_indices, indices[indptr[row]:indptr[row + 1]])
+            np.testing.assert_allclose(single_values, row_values)
+
+    def test_punctuation_does_not_change_words(self):
+        """Test trailing punctuation hashes to the same features as the bare words."""
+        vectorizer = HashedNgramVectorizer(buckets=1024)
+
+        _, punctuated, _ = vectorizer.transform(["stressed, exam!"])
+        _, bare, _ = vectorizer.transform(["stressed exam"])
+
+        np.testing.assert_array_equal(punctuated, bare)
+
+    def test_char_ngrams_share_features_across_inflections(self):
+        """Test char n-grams link related word forms that whole words miss."""
+        words_only = HashedNgramVectorizer(buckets=2 ** 16, char_ngrams=None)
+        with_chars = HashedNgramVectorizer(buckets=2 ** 16)
+
+        def overlap(vectorizer):
+            _, first, _ = vectorizer.transform(["stressed"])
+            _, second, _ = vectorizer.transform(["stressful"])
+            return len(np.intersect1d(first, second))
+
+        assert overlap(words_only) == 0
+        assert overlap(with_chars) > 0
+
+class TestTraining:
+    def write_data(self, path, size=600):
+        rng = np.random.default_rng(0)
+        with open(path, 'w') as f:
+            for i in range(size):
+                sentiment = ['positive', 'negative', 'neutral'][i % 3]
+                words = list(rng.choice(['class', 'notes', 'bus', 'lunch', 'week'], 4))
+                words += {'positive': ['wonderful'], 'negative': ['awful'], 'neutral': []}[sentiment]
+                toxic = i % 5 == 0
+                if toxic:
+                    words.append('idiot')
+                rng.shuffle(words)
+                f.write(json.dumps({'text': ' '.join(words) + '!', 'sentiment': sentiment, 'toxicity': int(toxic)}) + '\n')
+
+    def test_trained_model_is_served(self, tmp_path, monkeypatch):
+        """Test the training command writes a sparse model the analyzer serves."""
+        data = tmp_path / "posts.jsonl"
+        self.write_data(str(data))
+
+        assert train.main([
+            str(data), '--name', 'trained', '--version', '7', '--model-dir', str(tmp_path),
+            '--buckets', '4096', '--epochs', '5', '--batch-size', '16', '--seed', '1'
+        ]) == 0
+
+        with open(tmp_path / "trained" / "manifest.json") as f:
+            manifest = json.load(f)
+        assert manifest['storage'] == 'sparse'
+        assert set(manifest['heads']) == {'sentiment', 'toxicity'}
+        assert manifest['training']['holdout_accuracy']['sentiment'] > 0.9
+
+        monkeypatch.setattr(settings, 'model_cache_dir', str(tmp_path))
+        monkeypatch.setattr(settings, 'text_model_backends', {
+            'sentiment': 'hashed_linear:trained',
+            'toxicity': 'hashed_linear:trained',
+        })
+        analyzer = TextAnalyzer()
+        texts = ["What a wonderful week!", "Awful, awful lunch", "You idiot, the bus again"]
+
+        batch = asyncio.run(analyzer.analyze_batch(texts))["results"]
+        singles = [analyzer._analyze_text(text) for text in texts]
+
+        assert analyzer.models.version.startswith("trained@7+")
+        assert [result['sentiment'] for result in batch] == [result['sentiment'] for result in singles]
+        assert max(batch[0]['sentiment'], key=batch[0]['sentiment'].get) == 'positive'
+        assert max(batch[1]['sentiment'], key=batch[1]['sentiment'].get) == 'negative'
+        assert batch[2]['toxicity_score'] > batch[0]['toxicity_score']
+
+if __name__ == "__main__":
+    pytest.main([__file__])
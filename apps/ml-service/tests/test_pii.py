@@ -0,0 +1,37 @@
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.pii import contains_pii, detect_pii, pii_categories
+
+class TestPiiDetection:
+    def test_detects_each_category(self):
+        """Test every PII category is reported with its offsets."""
+        text = "ssn 123-45-6789, card 4111 1111 1111 1111, call 555.123.4567 or a.b@example.com"
+
+        matches = detect_pii(text)
+
+        assert [match['category'] for match in matches] == [
+            'ssn', 'credit_card', 'phone', 'email'
+        ]
+        assert text[matches[0]['start']:matches[0]['end']] == "123-45-6789"
+        assert pii_categories(matches) == ['ssn', 'credit_card', 'phone', 'email']
+
+    def test_clean_text(self):
+        """Test ordinary text with numbers is not flagged."""
+        text = "Week 3 of term, 2 exams and 12 pages left"
+
+        assert detect_pii(text) == []
+        assert not contains_pii(text)
+
+    def test_matches_are_not_returned(self):
+        """Test detection results never include the matched values."""
+        matches = detect_pii("mail me: student@uni.edu")
+
+        assert matches == [{'category': 'email', 'start': 9, 'end': 24}]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
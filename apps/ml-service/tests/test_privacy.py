@@ -0,0 +1,307 @@
+import pytest
+import asyncio
+import contextvars
+import sys
+import os
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.privacy import (
+    PrivacyEngine, PrivacyBudget, PrivacyBudgetExceeded, EPSILON_SPENT_TOTAL,
+    open_budget, current_budget
+)
+from utils.privacy_accountant import PrivacyAccountant
+from fastapi import HTTPException
+from config import settings
+from main import app
+
+client = TestClient(app)
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def incrbyfloat(self, key, amount):
+        self.store[key] = float(self.store.get(key, 0.0)) + amount
+        return self.store[key]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incrbyfloat(self, key, amount):
+        self.commands.append(('incrbyfloat', key, amount))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append(('expire', key, seconds))
+        return self
+
+    async def execute(self):
+        results = []
+        for command, key, value in self.commands:
+            if command == 'incrbyfloat':
+                results.append(await self.redis.incrbyfloat(key, value))
+            else:
+                results.append(key in self.redis.store)
+        return results
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def counting_release():
+    """Build a release coroutine function that counts fresh answers."""
+    calls = []
+
+    async def release():
+        calls.append(1)
+        return {'score': len(calls) / 10}
+    return release, calls
+
+RESULT = {
+    'sentiment': {'positive': 0.5, 'negative': 0.2, 'neutral': 0.3},
+    'toxicity_score': 0.1,
+    'scores': [0.2, 0.4],
+    'stress_indicators': ['deadline'],
+    'flagged': True,
+}
+
+class TestPrivacyEngine:
+    def test_noises_numeric_leaves_only(self):
+        """Test every numeric leaf is noised and clamped, and nothing else changes."""
+        protected = PrivacyEngine(seed=1).privatize(RESULT, epsilon=1.0)
+
+        leaves = list(protected['sentiment'].values()) + [protected['toxicity_score']] + protected['scores']
+        assert all(0.0 <= value <= 1.0 for value in leaves)
+        assert leaves != [0.5, 0.2, 0.3, 0.1, 0.2, 0.4]
+        assert protected['stress_indicators'] == ['deadline']
+        assert protected['flagged'] is True
+        assert RESULT['sentiment']['positive'] == 0.5
+        assert RESULT['scores'] == [0.2, 0.4]
+
+    def test_seeded_engines_are_reproducible(self):
+        """Test engines with the same seed draw the same noise."""
+        assert PrivacyEngine(seed=7).privatize(RESULT) == PrivacyEngine(seed=7).privatize(RESULT)
+
+    def test_epsilon_applies_per_leaf(self):
+        """Test a leaf's noise does not depend on how many other leaves the result has."""
+        engine = PrivacyEngine(seed=3)
+        one_leaf = [engine.privatize({'a': 0.5}, epsilon=20.0)['a'] for _ in range(2000)]
+        many_leaves = [
+            engine.privatize({str(n): 0.5 for n in range(10)}, epsilon=20.0)['0'] for _ in range(2000)
+        ]
+
+        assert np.mean(np.abs(np.array(one_leaf) - 0.5)) < 0.1
+        assert np.mean(np.abs(np.array(many_leaves) - 0.5)) < 0.1
+
+    def test_default_distortion_is_bounded(self):
+        """Test text results at the default epsilon keep most scores off the clamp bounds."""
+        engine = PrivacyEngine(seed=5)
+        text_result = {
+            'sentiment': {'positive': 0.5, 'negative': 0.2, 'neutral': 0.3},
+            'emotion': {name: 0.1 for name in ('joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust')},
+            'toxicity_score': 0.1,
+        }
+        positive = np.array([
+            engine.privatize(text_result, settings.privacy_epsilon)['sentiment']['positive'] for _ in range(2000)
+        ])
+
+        # Laplace(1) noise leaves ~39% of 0.5 unclamped, and an error of ~0.39 on average
+        assert np.mean((positive > 0.0) & (positive < 1.0)) > 0.3
+        assert np.mean(np.abs(positive - 0.5)) < 0.42
+
+    def test_epsilon_is_split_across_leaves(self):
+        """Test a split release's noise scale grows with its number of leaves."""
+        engine = PrivacyEngine(seed=3, split_epsilon=True)
+        one_leaf = [engine.privatize({'a': 0.5}, epsilon=20.0)['a'] for _ in range(2000)]
+        many_leaves = [
+            engine.privatize({str(n): 0.5 for n in range(10)}, epsilon=20.0)['0'] for _ in range(2000)
+        ]
+
+        assert np.mean(np.abs(np.array(one_leaf) - 0.5)) < 0.1
+        assert np.mean(np.abs(np.array(many_leaves) - 0.5)) > 0.3
+
+    def test_batch_matches_item_shapes(self):
+        """Test batch noising keeps order, failed items and per-item structure."""
+        results = PrivacyEngine(seed=2).privatize_batch([RESULT, None, {'toxicity_score': 0.9}])
+
+        assert results[1] is None
+        assert set(results[0]) == set(RESULT)
+        assert 0.0 <= results[2]['toxicity_score'] <= 1.0
+
+class TestPrivacyBudget:
+    def test_releases_are_charged(self):
+        """Test releases spend the active budget and overspending is refused."""
+        def run():
+            budget = open_budget(1.0)
+            engine = PrivacyEngine(seed=4)
+            engine.privatize(RESULT, epsilon=0.75)
+            engine.privatize_batch([RESULT, RESULT], epsilon=0.25)
+
+            assert budget.spent == pytest.approx(1.0)
+            assert budget.releases == 2
+            with pytest.raises(PrivacyBudgetExceeded):
+                engine.privatize(RESULT, epsilon=0.1)
+
+        contextvars.copy_context().run(run)
+        assert current_budget() is None
+
+    def test_remaining(self):
+        """Test the remaining budget never goes negative."""
+        budget = PrivacyBudget(0.5)
+        budget.charge(0.5)
+
+        assert budget.remaining == 0.0
+
+    def test_request_spend_is_tracked(self):
+        """Test each API request spends its own configured budget."""
+        before = EPSILON_SPENT_TOTAL.get()
+
+        for _ in range(2):
+            response = client.post("/api/v1/analyze-text", json={"text": "Long day but it went fine"})
+            assert response.status_code == 200
+
+        assert EPSILON_SPENT_TOTAL.get() == pytest.approx(before + 2 * settings.privacy_epsilon)
+
+class TestPrivacyAccountant:
+    def test_cached_answers_after_exhaustion(self):
+        """Test an exhausted user gets the cached noised answer without a new release."""
+        accountant = PrivacyAccountant(user_budget=2.0, clock=Clock())
+        release, calls = counting_release()
+        key = accountant.make_key("text", "same post")
+
+        async def run():
+            return [await accountant.answer(TEST_USER_ID, key, 1.0, release) for _ in range(4)]
+
+        answers = asyncio.run(run())
+
+        assert len(calls) == 2
+        assert answers[2] == answers[3] == answers[1]
+        assert asyncio.run(accountant.get_spent(TEST_USER_ID)) == 2.0
+        assert accountant.get_stats()['cached_answers'] == 2
+
+    def test_new_query_refused_when_exhausted(self):
+        """Test unanswered queries get 429 until the budget window rolls over."""
+        clock = Clock(1000.0)
+        accountant = PrivacyAccountant(user_budget=1.0, window_seconds=3600, clock=clock)
+        release, calls = counting_release()
+
+        asyncio.run(accountant.answer(TEST_USER_ID, accountant.make_key("text", "a"), 1.0, release))
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(accountant.answer(TEST_USER_ID, accountant.make_key("text", "b"), 1.0, release))
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == str(3600 - 1000 + 1)
+
+        clock.now = 3600.0
+        asyncio.run(accountant.answer(TEST_USER_ID, accountant.make_key("text", "b"), 1.0, release))
+        assert len(calls) == 2
+
+    def test_anonymous_queries_answered_once(self):
+        """Test queries without a user ID are not capped and repeats get the first answer."""
+        accountant = PrivacyAccountant(user_budget=1.0, clock=Clock())
+        release, calls = counting_release()
+
+        answers = [
+            asyncio.run(accountant.answer(None, accountant.make_key("text", text), 1.0, release))
+            for text in ("a", "b", "c", "a")
+        ]
+
+        assert len(calls) == 3
+        assert answers[3] == answers[0]
+        assert accountant.get_stats()['anonymous_repeats'] == 1
+
+    def test_unaccounted_anonymous_policy(self):
+        """Test the unaccounted policy releases every anonymous query afresh."""
+        accountant = PrivacyAccountant(anonymous_policy='unaccounted', clock=Clock())
+        release, calls = counting_release()
+        key = accountant.make_key("text", "a")
+
+        for _ in range(3):
+            asyncio.run(accountant.answer(None, key, 1.0, release))
+
+        assert len(calls) == 3
+        with pytest.raises(ValueError):
+            PrivacyAccountant(anonymous_policy='shared')
+
+    def test_failed_release_refunded(self):
+        """Test an analysis that raises spends nothing and caches nothing."""
+        accountant = PrivacyAccountant(user_budget=1.0, clock=Clock())
+        key = accountant.make_key("text", "a")
+
+        async def failing_release():
+            raise RuntimeError("analysis failed")
+
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                asyncio.run(accountant.answer(TEST_USER_ID, key, 1.0, failing_release))
+
+        assert asyncio.run(accountant.get_spent(TEST_USER_ID)) == 0.0
+        assert accountant.get_stats()['refunded'] == 3
+        release, calls = counting_release()
+        asyncio.run(accountant.answer(TEST_USER_ID, key, 1.0, release))
+        assert len(calls) == 1
+
+    def test_failed_release_refunded_in_redis(self):
+        """Test the refund also reaches the shared Redis spend."""
+        redis = FakeRedis()
+        accountant = PrivacyAccountant(user_budget=1.0, redis_client=redis, clock=Clock())
+
+        async def failing_release():
+            raise RuntimeError("analysis failed")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(accountant.answer(TEST_USER_ID, accountant.make_key("text", "a"), 1.0, failing_release))
+
+        other = PrivacyAccountant(user_budget=1.0, redis_client=redis, clock=Clock())
+        assert asyncio.run(other.get_spent(TEST_USER_ID)) == 0.0
+
+    def test_redis_shares_budget_between_instances(self):
+        """Test spend and answers recorded by one instance apply to another."""
+        redis = FakeRedis()
+        first = PrivacyAccountant(user_budget=1.0, redis_client=redis, clock=Clock())
+        second = PrivacyAccountant(user_budget=1.0, redis_client=redis, clock=Clock())
+        release, calls = counting_release()
+        key = first.make_key("text", "a")
+
+        answer = asyncio.run(first.answer(TEST_USER_ID, key, 1.0, release))
+
+        assert asyncio.run(second.answer(TEST_USER_ID, key, 1.0, release)) == answer
+        assert asyncio.run(second.get_spent(TEST_USER_ID)) == 1.0
+        assert len(calls) == 1
+
+    def test_api_serves_cached_answer(self):
+        """Test repeated text queries stop re-running analysis once the budget is spent."""
+        from api import privacy_accountant
+        user_id = "00000000-0000-4000-8000-0000000000aa"
+        request_data = {"text": "Dashboard polling the same post", "user_id": user_id}
+        budget_releases = int(settings.privacy_user_budget / settings.privacy_epsilon)
+
+        responses = [client.post("/api/v1/analyze-text", json=request_data) for _ in range(budget_releases + 2)]
+
+        assert all(response.status_code == 200 for response in responses)
+        assert responses[-1].json()["sentiment"] == responses[budget_releases - 1].json()["sentiment"]
+        assert asyncio.run(privacy_accountant.get_spent(user_id)) == pytest.approx(settings.privacy_user_budget)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
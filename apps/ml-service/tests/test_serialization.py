@@ -0,0 +1,172 @@
+import pytest
+import json
+import sys
+import os
+import numpy as np
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.serialization import dumps, loads, FastJSONResponse, json_body_schema
+from utils.ndjson import encode_ndjson
+from datetime import datetime
+from pydantic import BaseModel
+from api import (
+    BehaviorEventBatch, TextAnalysisResponse, BatchTextAnalysisResponse, BehaviorAnalysisResponse,
+    BehaviorEventResponse, StressScoreResponse, AssessmentResponse
+)
+from main import app
+
+client = TestClient(app)
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+def nested_models(annotation):
+    """Models inside a field annotation, e.g. X in Optional[X] or List[Optional[X]]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return [annotation]
+    return [model for arg in getattr(annotation, '__args__', ()) for model in nested_models(arg)]
+
+def assert_matches_model(data, model):
+    """Assert data validates against a response model with exactly its fields, at every level."""
+    model.model_validate(data)
+    assert set(data) == set(model.model_fields)
+    for name, field in model.model_fields.items():
+        nested = nested_models(field.annotation)
+        values = data[name] if isinstance(data[name], list) else [data[name]]
+        for value in values:
+            if nested and value is not None:
+                assert_matches_model(value, nested[0])
+
+class TestEncoding:
+    def test_dumps_is_compact_json(self):
+        """Test values encode to compact UTF-8 JSON the standard decoder reads back."""
+        value = {"text": "café", "scores": [0.5, 1], "nested": {"ok": True, "none": None}}
+        encoded = dumps(value)
+        assert isinstance(encoded, bytes)
+        assert b" " not in encoded
+        assert json.loads(encoded) == value
+        assert loads(encoded) == value
+
+    def test_dumps_numpy_values(self):
+        """Test numpy scalars and arrays from the analyzers encode as plain numbers."""
+        encoded = dumps({"score": np.float64(0.25), "count": np.int64(3), "values": np.arange(3)})
+        assert json.loads(encoded) == {"score": 0.25, "count": 3, "values": [0, 1, 2]}
+
+    def test_loads_rejects_invalid_json(self):
+        """Test invalid JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            loads(b'{"text": ')
+
+    def test_response_renders_with_fast_encoder(self):
+        """Test FastJSONResponse bodies match the encoder output."""
+        response = FastJSONResponse({"status": "alive", "score": np.float64(1.5)})
+        assert response.body == b'{"status":"alive","score":1.5}'
+        assert response.media_type == "application/json"
+
+    def test_ndjson_lines(self):
+        """Test NDJSON records are encoded one compact line each."""
+        assert encode_ndjson([{"index": 0}, {"index": 1}]) == b'{"index":0}\n{"index":1}\n'
+
+class TestRequestBodies:
+    def test_body_schema_inlines_definitions(self):
+        """Test the documented request body has no unresolved local references."""
+        schema = json_body_schema(TypeAdapter(BehaviorEventBatch))
+        body = schema["content"]["application/json"]["schema"]
+        assert "$ref" not in json.dumps(body)
+        assert body["properties"]["events"]["items"]["required"] == ["user_id", "event_type", "timestamp"]
+
+    def test_events_validation_errors(self):
+        """Test invalid events are rejected with FastAPI's 422 error shape."""
+        response = client.post("/api/v1/behavior/events", json={
+            "events": [{"user_id": TEST_USER_ID, "event_type": "post", "timestamp": "2024-03-01T10:00:00", "duration_minutes": -1}]
+        })
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "events", 0, "duration_minutes"]
+
+    def test_invalid_json_body(self):
+        """Test a body that is not JSON is rejected with 422."""
+        response = client.post(
+            "/api/v1/analyze-text/batch",
+            content=b'{"texts": [',
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+
+    def test_events_batch_limit(self):
+        """Test event batches over the configured maximum are rejected."""
+        from config import settings
+        event = {"user_id": TEST_USER_ID, "event_type": "login", "timestamp": "2024-03-01T10:00:00"}
+        response = client.post(
+            "/api/v1/behavior/events",
+            json={"events": [event] * (settings.max_batch_events + 1)}
+        )
+        assert response.status_code == 422
+
+    def test_openapi_documents_batch_bodies(self):
+        """Test routes parsing their own bodies still document them."""
+        paths = client.get("/openapi.json").json()["paths"]
+        batch = paths["/api/v1/analyze-text/batch"]["post"]["requestBody"]
+        assert "texts" in batch["content"]["application/json"]["schema"]["properties"]
+        assert "requestBody" in paths["/api/v1/behavior/events"]["post"]
+
+class TestTrustedResponses:
+    @pytest.mark.parametrize("path, body, model", [
+        ("/api/v1/analyze-text", {"text": "Worried about my exam"}, TextAnalysisResponse),
+        (
+            "/api/v1/analyze-behavior",
+            {"user_id": TEST_USER_ID, "activity_data": {"posts_count": 2, "hourly_activity": {"1": 5}}},
+            BehaviorAnalysisResponse
+        ),
+        (
+            "/api/v1/behavior/events",
+            {"events": [{"user_id": TEST_USER_ID, "event_type": "post", "timestamp": datetime.now().isoformat()}]},
+            BehaviorEventResponse
+        ),
+        ("/api/v1/analyze-behavior/incremental", {"user_id": TEST_USER_ID}, BehaviorAnalysisResponse),
+        (
+            "/api/v1/stress-score",
+            {"user_id": TEST_USER_ID, "text_features": {"negative_sentiment": 0.6}},
+            StressScoreResponse
+        ),
+    ])
+    def test_route_responses_match_models(self, path, body, model):
+        """Test every route sends exactly the fields and types of its documented response model."""
+        response = client.post(path, json=body)
+
+        assert response.status_code == 200
+        assert_matches_model(response.json(), model)
+
+    def test_openapi_documents_response_models(self):
+        """Test routes encoding their own responses still document the response model."""
+        paths = client.get("/openapi.json").json()["paths"]
+        schema = paths["/api/v1/assess"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": "#/components/schemas/AssessmentResponse"}
+
+    def test_batch_response_matches_model(self):
+        """Test trusted analyzer output is encoded with exactly the documented fields."""
+        response = client.post("/api/v1/analyze-text/batch", json={"texts": ["A normal post", ""]})
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"results", "errors", "processing_time_ms"}
+        assert set(data["results"][0]) == {
+            "sentiment", "emotion", "toxicity_score", "stress_indicators", "safety_flags"
+        }
+        assert data["results"][1] is None
+        assert data["errors"] == [{"index": 1, "error": "Text cannot be empty"}]
+        assert_matches_model(data, BatchTextAnalysisResponse)
+
+    def test_assess_response_matches_model(self):
+        """Test nested assessment results match the documented response model."""
+        response = client.post("/api/v1/assess", json={"user_id": TEST_USER_ID, "text": "So stressed about exams"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["behavior_analysis"] is None
+        assert isinstance(data["text_analysis"]["toxicity_score"], float)
+        assert_matches_model(data, AssessmentResponse)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+import pytest
+import subprocess
+import signal
+import socket
+import sys
+import os
+import time
+import httpx
+
+# Add src to path
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from config import settings
+import serve
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="needs fork and /proc")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def child_pids(pid):
+    children = set()
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The parent pid follows the parenthesized command name
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        children.add(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return children
+
+def wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("Timed out waiting for the server")
+
+@pytest.fixture
+def server(tmp_path):
+    port = free_port()
+    env = dict(
+        os.environ, MODEL_CACHE_DIR=str(tmp_path), BEHAVIOR_STATE_SNAPSHOT_INTERVAL_SECONDS="0",
+        ENABLE_DIFFERENTIAL_PRIVACY="false", SERVER_PER_WORKER_BEHAVIOR_STATE="true"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--log-level", "warning"],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    def ready():
+        try:
+            return httpx.get(f"{base_url}/api/v1/health/ready").status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    try:
+        wait_for(ready)
+        yield process, base_url
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+class TestPreforkServer:
+    def test_workers_are_supervised(self, server):
+        """Test requests are served by forked workers, a dead worker is replaced and SIGTERM stops cleanly."""
+        process, base_url = server
+        workers = wait_for(lambda: child_pids(process.pid) if len(child_pids(process.pid)) == 2 else None)
+
+        response = httpx.post(f"{base_url}/api/v1/analyze-text", json={"text": "so stressed, exam!"})
+        assert response.status_code == 200
+        assert response.json()["stress_indicators"]
+
+        victim = min(workers)
+        os.kill(victim, signal.SIGKILL)
+        replaced = wait_for(
+            lambda: len(child_pids(process.pid)) == 2 and victim not in child_pids(process.pid)
+        )
+        assert replaced
+        wait_for(lambda: httpx.get(f"{base_url}/health").status_code == 200)
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
+
+class TestWorkerChecks:
+    def test_single_worker_always_allowed(self, monkeypatch):
+        """Test one worker needs no shared state."""
+        monkeypatch.setattr(settings, 'server_per_worker_behavior_state', False)
+        monkeypatch.setattr(settings, 'privacy_accountant_use_redis', False)
+        assert serve.multi_worker_problems(1) == []
+
+    def test_multiple_workers_need_shared_state(self, monkeypatch):
+        """Test several workers are refused while budgets and behavior state are per process."""
+        monkeypatch.setattr(settings, 'enable_differential_privacy', True)
+        monkeypatch.setattr(settings, 'privacy_accountant_use_redis', False)
+        monkeypatch.setattr(settings, 'server_per_worker_behavior_state', False)
+        assert len(serve.multi_worker_problems(2)) == 2
+        assert serve.main(["--workers", "2"]) == 2
+
+        monkeypatch.setattr(settings, 'privacy_accountant_use_redis', True)
+        monkeypatch.setattr(settings, 'server_per_worker_behavior_state', True)
+        assert serve.multi_worker_problems(2) == []
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,61 @@
+import pytest
+import subprocess
+import sys
+import os
+import json
+from fastapi.testclient import TestClient
+
+# Add src to path
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from config import settings
+from main import app
+from api import get_analyzer
+
+# Generous bound on `import main` in a fresh interpreter; FastAPI alone takes
+# a few hundred milliseconds, the service's own modules should add little
+IMPORT_BUDGET_SECONDS = 2.0
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'modules': sorted(name for name in sys.modules if name.startswith(('pipelines', 'uvicorn'))),
+}))
+"""
+
+class TestImportTime:
+    def test_import_is_cheap(self):
+        """Test importing the app defers pipelines and the server, within the time budget."""
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+
+        assert report['modules'] == []
+        assert report['seconds'] < IMPORT_BUDGET_SECONDS
+
+class TestLifespan:
+    def test_warm_up_runs_before_serving(self, monkeypatch):
+        """Test startup warms every analyzer and reports its timings."""
+        monkeypatch.setattr(settings, 'behavior_state_snapshot_interval_seconds', 0)
+        cache = get_analyzer("text_analyzer").cache
+        entries = cache.get_stats()['entries'] if cache is not None else 0
+
+        with TestClient(app) as client:
+            startup = app.state.startup
+            response = client.get("/api/v1/health/live")
+
+        assert response.status_code == 200
+        assert set(startup['warm_up']) == {'text_analyzer', 'behavior_analyzer', 'stress_scorer'}
+        assert startup['warm_up_ms'] >= sum(startup['warm_up'].values())
+        assert startup['import_ms'] > 0
+        if cache is not None:
+            assert cache.get_stats()['entries'] == entries
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,97 @@
+import pytest
+import asyncio
+import json
+import sys
+import os
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.ndjson import iter_ndjson
+from config import settings
+from main import app
+
+client = TestClient(app)
+
+async def byte_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+def decode_all(*chunks, max_line_bytes=64):
+    async def run():
+        return [item async for item in iter_ndjson(byte_chunks(*chunks), max_line_bytes)]
+    return asyncio.run(run())
+
+class TestNDJSONDecoding:
+    def test_lines_split_across_chunks(self):
+        """Test records are reassembled when lines span chunk boundaries."""
+        items = decode_all(b'{"text": "a"}\n{"te', b'xt": "b"}\n\n', b'{"text": "c"}')
+
+        assert items == [({'text': 'a'}, None), ({'text': 'b'}, None), ({'text': 'c'}, None)]
+
+    def test_invalid_and_oversized_lines(self):
+        """Test bad lines are reported in place without stopping the stream."""
+        items = decode_all(b'nope\n{"text": "' + b'x' * 100, b'x' * 100 + b'"}\n{"text": "ok"}\n')
+
+        assert items[0][0] is None and items[0][1].startswith("Invalid JSON")
+        assert items[1] == (None, "Line exceeds 64 bytes")
+        assert items[2] == ({'text': 'ok'}, None)
+        assert len(items) == 3
+
+    def test_many_lines_per_chunk(self):
+        """Test a chunk holding many lines yields each of them, carrying over the partial last one."""
+        body = b"".join(b'{"n": %d}\n' % n for n in range(1000))
+        items = decode_all(body[:-3], body[-3:])
+
+        assert [value['n'] for value, _ in items] == list(range(1000))
+
+class TestStreamingEndpoint:
+    def test_stream_results_in_order(self):
+        """Test every input line gets a result or error line, then a summary."""
+        lines = [json.dumps({"id": f"post-{n}", "text": f"Worried about exam number {n}"})
+                 for n in range(settings.batch_size * 2 + 5)]
+        lines.insert(4, json.dumps({"id": "bad"}))
+        lines.insert(6, json.dumps({"text": "x" * (settings.max_text_length + 1)}))
+
+        response = client.post(
+            "/api/v1/analyze-text/stream",
+            content="\n".join(lines),
+            headers={"content-type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        summary = records.pop()["summary"]
+        assert [record["index"] for record in records] == list(range(len(lines)))
+        assert records[0]["id"] == "post-0"
+        assert "stress_indicators" in records[0]["result"]
+        assert "error" in records[4] and "error" in records[6]
+        assert summary["total"] == len(lines)
+        assert summary["failed"] == 2
+
+    def test_repeated_stream_gets_first_answers(self, monkeypatch):
+        """Test a repeated anonymous stream re-serves its first noised results instead of fresh ones."""
+        from api import privacy_accountant
+        monkeypatch.setattr(privacy_accountant, "anonymous_policy", "answer_once")
+        lines = "\n".join(json.dumps({"text": f"Stream repeat post {n}"}) for n in range(settings.batch_size * 2))
+
+        first = client.post("/api/v1/analyze-text/stream", content=lines)
+        second = client.post("/api/v1/analyze-text/stream", content=lines)
+
+        assert first.status_code == second.status_code == 200
+        results = [[json.loads(line).get("result") for line in response.text.splitlines()[:-1]]
+                   for response in (first, second)]
+        assert results[0] == results[1]
+        assert all(result is not None for result in results[0])
+
+    def test_empty_stream(self):
+        """Test an empty body yields only the summary line."""
+        response = client.post("/api/v1/analyze-text/stream", content=b"")
+
+        assert response.status_code == 200
+        assert json.loads(response.text)["summary"]["total"] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
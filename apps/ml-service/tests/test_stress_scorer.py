@@ -0,0 +1,87 @@
+import pytest
+import asyncio
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pipelines.fusion.stress_scorer import StressScorer
+
+TEST_USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+TEXT_FEATURES = [
+    {
+        'sentiment': {'negative': 0.9, 'positive': 0.1},
+        'emotion': {'sadness': 0.4, 'fear': 0.3},
+        'stress_indicators': ['exam', 'deadline', 'tired'],
+        'safety_flags': ['crisis'],
+    },
+    None,
+    {
+        'sentiment': {'negative': 0.1},
+        'stress_indicators': [],
+        'safety_flags': [],
+    },
+]
+
+BEHAVIOR_FEATURES = [
+    {
+        'activity_score': 0.2,
+        'rhythm_changes': {'late_night_ratio': 0.45, 'consistency_score': 0.4},
+        'anomaly_flags': ['low_social_interaction'],
+        'engagement_trend': 'decreasing',
+    },
+    {
+        'activity_score': 0.7,
+        'rhythm_changes': {'late_night_ratio': 0.1},
+        'anomaly_flags': [],
+    },
+    None,
+]
+
+class TestStressScoreMany:
+    def setup_method(self):
+        self.scorer = StressScorer()
+
+    def test_matches_single_user_scoring(self):
+        """Test bulk scoring matches per-user scoring."""
+        features, confidence = self.scorer.build_feature_matrix(TEXT_FEATURES, BEHAVIOR_FEATURES)
+        records = self.scorer.to_records(self.scorer.score_many(features, confidence))
+
+        for text_features, behavior_features, record in zip(
+            TEXT_FEATURES, BEHAVIOR_FEATURES, records
+        ):
+            expected = asyncio.run(
+                self.scorer.calculate_score(TEST_USER_ID, text_features, behavior_features)
+            )
+            assert record == expected
+
+    def test_missing_features_are_masked(self):
+        """Test only weights of present features are used for normalization."""
+        features = np.full((2, len(self.scorer.feature_columns)), np.nan)
+        column = self.scorer.feature_columns.index('safety_flags')
+        features[0, column] = 1.0
+        features[1, :] = 0.0
+        features[1, column] = 1.0
+
+        results = self.scorer.score_many(features)
+
+        assert results['stress_score'][0] == pytest.approx(1 / (1 + np.exp(-2.5)))
+        assert results['stress_score'][0] > results['stress_score'][1]
+        assert results['factor_columns'][0].tolist() == [column, -1, -1, -1, -1]
+
+    def test_weight_updates_apply_to_bulk_scoring(self):
+        """Test updated weights are used by the weight vector."""
+        self.scorer.set_feature_weights({'late_night_activity': 0.5})
+
+        column = self.scorer.feature_columns.index('late_night_activity')
+        assert self.scorer.weight_vector[column] == 0.5
+
+        with pytest.raises(ValueError):
+            self.scorer.set_feature_weights({'unknown_feature': 1.0})
+
+if __name__ == "__main__":
+    pytest.main([__file__])